@@ -1,4 +1,4 @@
-﻿from datetime import datetime
+﻿from datetime import date, datetime
 
 from app.domain.entities import Worker, Pair, Survey
 from app.domain.repositories import (
@@ -8,10 +8,14 @@ from app.domain.repositories import (
     AnswerRepository,
     ShiftRepository,
 )
+from app.formatting import format_date, format_datetime, parse_date
+from app.infrastructure.db.unit_of_work import commit_current_unit
 from app.infrastructure.sheets.gateway import SheetsGateway
 
 
 class AdminSyncService:
+    EXPORT_BATCH_SIZE = 500
+
     def __init__(
         self,
         gateway: SheetsGateway,
@@ -28,10 +32,9 @@ class AdminSyncService:
         self.answers = answers
         self.shifts = shifts
 
-    async def sync_workers(self) -> int:
-        existing = {w.full_name: w for w in await self.workers.list_all()}
+    async def sync_workers(self) -> tuple[int, int]:
         rows = self.gateway.read_workers()
-        created = 0
+        workers: list[Worker] = []
 
         for row in rows:
             full_name = row[0].strip() if len(row) > 0 else ""
@@ -42,40 +45,33 @@ class AdminSyncService:
             speciality = row[3].strip() if len(row) > 3 else ""
             phone = row[4].strip() if len(row) > 4 else ""
 
-            worker = existing.get(full_name)
-            if worker:
-                if chat_id and not worker.chat_id:
-                    await self.workers.set_chat_id(worker.id, chat_id)
-                if file_id and not worker.file_id:
-                    await self.workers.set_file_id(worker.id, file_id)
-                continue
-
-            new_worker = Worker(
-                full_name=full_name,
-                file_id=file_id,
-                chat_id=chat_id,
-                speciality=speciality,
-                phone=phone,
+            workers.append(
+                Worker(
+                    id=None,
+                    full_name=full_name,
+                    file_id=file_id,
+                    chat_id=chat_id,
+                    speciality=speciality,
+                    phone=phone,
+                )
             )
-            await self.workers.add(new_worker)
-            created += 1
 
-        return created
+        return await self.workers.upsert_many(workers)
 
-    async def sync_pairs(self, today_str: str | None = None) -> int:
-        if not today_str:
-            today_str = datetime.now().strftime("%d.%m.%Y")
+    async def sync_pairs(self, today: date | None = None) -> int:
+        if not today:
+            today = date.today()
         rows = self.gateway.read_pairs()
         created = 0
         for row in rows:
-            if len(row) < 5 or row[4].strip() != today_str:
+            if len(row) < 5 or parse_date(row[4]) != today:
                 continue
             pair = Pair(
                 subject=row[0].strip(),
                 object=row[1].strip(),
                 survey=row[2].strip(),
                 weekday=row[3].strip(),
-                date=row[4].strip(),
+                date=today,
             )
             await self.pairs.add(pair)
             created += 1
@@ -83,8 +79,7 @@ class AdminSyncService:
 
     async def sync_surveys(self) -> int:
         rows = self.gateway.read_surveys()
-        await self.surveys.clear_all()
-        created = 0
+        surveys: list[Survey] = []
         for row in rows:
             id_value = row[0].strip() if row else ""
             if not id_value.isdigit():
@@ -103,22 +98,22 @@ class AdminSyncService:
                 question5=row[10].strip(),
                 question5_type=row[11].strip(),
             )
-            await self.surveys.add(survey)
-            created += 1
-        return created
+            surveys.append(survey)
+        await self.surveys.replace_all(surveys)
+        return len(surveys)
 
     async def sync_shifts(self) -> int:
         rows = self.gateway.read_shifts()
-        schedule: list[tuple[str, str, str]] = []
+        schedule: list[tuple[str, date, str]] = []
         for row in rows:
             if len(row) < 3:
                 continue
             doctor_name = row[0].strip()
-            date = row[1].strip()
+            shift_date = parse_date(row[1])
             shift_type = row[2].strip()
-            if not doctor_name or not date or not shift_type:
+            if not doctor_name or not shift_date or not shift_type:
                 continue
-            schedule.append((doctor_name, date, shift_type))
+            schedule.append((doctor_name, shift_date, shift_type))
         if schedule:
             await self.shifts.bulk_insert(schedule)
         return len(schedule)
@@ -130,7 +125,6 @@ class AdminSyncService:
         await self.sync_shifts()
 
     async def export_answers(self) -> None:
-        answers = await self.answers.list_all()
         headers = [
             "object",
             "subject",
@@ -149,17 +143,35 @@ class AdminSyncService:
             "answer5",
         ]
 
-        def serialize():
-            for ans in answers:
-                row = [getattr(ans, f, "") for f in headers]
-                yield ["" if cell is None else str(cell) for cell in row]
-
-        self.gateway.export_answers(headers, serialize())
-
-    async def export_shifts(self, date_str: str | None = None) -> None:
-        if not date_str:
-            date_str = datetime.now().strftime("%d.%m.%Y")
-        shifts = await self.shifts.list_by_date(date_str)
+        def to_cell(value) -> str:
+            if isinstance(value, datetime):
+                return format_datetime(value)
+            if isinstance(value, date):
+                return format_date(value)
+            return "" if value is None else str(value)
+
+        # At most one batch of rows is held; each goes to the staging sheet,
+        # which replaces the answers sheet once the stream is exhausted.
+        staging = self.gateway.start_answers_export(headers)
+        try:
+            batch: list[list[str]] = []
+            async for ans in self.answers.stream_all(batch_size=self.EXPORT_BATCH_SIZE):
+                batch.append([to_cell(getattr(ans, f, "")) for f in headers])
+                if len(batch) >= self.EXPORT_BATCH_SIZE:
+                    self.gateway.append_answers(staging, batch)
+                    batch = []
+            if batch:
+                self.gateway.append_answers(staging, batch)
+        except BaseException:
+            self.gateway.discard_answers_export(staging)
+            raise
+        self.gateway.finish_answers_export(staging)
+
+    async def export_shifts(self, day: date | None = None) -> None:
+        if not day:
+            day = date.today()
+        shifts = await self.shifts.list_by_date(day)
+        await commit_current_unit()
         headers = [
             "assistant_id",
             "assistant_name",
@@ -175,7 +187,7 @@ class AdminSyncService:
                     shift.assistant_id,
                     shift.assistant_name or "",
                     shift.doctor_name,
-                    shift.date,
+                    format_date(shift.date),
                     shift.type,
                     "Да" if shift.manual else "Нет",
                 ]
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable, Iterable, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+FAILED = "failed"
+
+
+@dataclass(slots=True, frozen=True)
+class Outcome:
+    key: Hashable
+    status: str
+    elapsed: float
+    error: str | None = None
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def fan_out(
+    items: Iterable[tuple[K, T]],
+    work: Callable[[K, T], Awaitable[str]],
+    concurrency: int,
+    logger: logging.Logger,
+    label: str,
+) -> list[Outcome]:
+    """Run ``work`` for every item, at most ``concurrency`` at a time.
+
+    ``work`` returns a short status ("sent", "skipped", ...); an exception
+    is logged and recorded as ``"failed"`` without stopping the others.
+    Logs one summary line with the counts per status, throughput and p95
+    latency, and returns the per-item outcomes.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(key: K, item: T) -> Outcome:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                status = await work(key, item)
+            except Exception as exc:
+                logger.error("%s failed for %s: %s", label, key, exc)
+                return Outcome(key, FAILED, time.perf_counter() - started, str(exc))
+            return Outcome(key, status, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    outcomes = list(await asyncio.gather(*(run(key, item) for key, item in items)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [outcome.elapsed for outcome in outcomes]
+    logger.info(
+        "%s: %s items in %.2fs (%.1f/s, concurrency %s), p95 %.0f ms, %s",
+        label,
+        len(outcomes),
+        elapsed,
+        len(outcomes) / elapsed if elapsed > 0 else 0.0,
+        concurrency,
+        percentile(latencies, 0.95) * 1000,
+        dict(Counter(outcome.status for outcome in outcomes)),
+    )
+    return outcomes
@@ -1,3 +1,4 @@
+from app.application.use_cases.instrument_catalog import InstrumentCatalog
 from app.domain.entities import Cabinet, Instrument
 from app.domain.repositories import (
     CabinetRepository,
@@ -12,55 +13,77 @@ class InstrumentAdminService:
         cabinets: CabinetRepository,
         instruments: InstrumentRepository,
         moves: InstrumentMoveRepository,
+        catalog: InstrumentCatalog,
     ):
         self.cabinets = cabinets
         self.instruments = instruments
         self.moves = moves
+        self.catalog = catalog
 
     async def list_cabinets(self, include_archived: bool = False):
-        return list(await self.cabinets.list_all(include_archived=include_archived))
+        return await self.catalog.list_cabinets(include_archived=include_archived)
 
     async def get_cabinet(self, cabinet_id: int):
-        return await self.cabinets.get_by_id(cabinet_id)
+        return await self.catalog.get_cabinet(cabinet_id)
 
     async def add_cabinet(self, name: str) -> None:
         cabinet = Cabinet(id=None, name=name, is_active=True)
-        await self.cabinets.add(cabinet)
+        self.catalog.put_cabinet(await self.cabinets.add(cabinet))
 
     async def rename_cabinet(self, cabinet_id: int, name: str) -> bool:
-        return await self.cabinets.update_name(cabinet_id, name)
+        updated = await self.cabinets.update_name(cabinet_id, name)
+        if updated:
+            self.catalog.update_cabinet(cabinet_id, name=name)
+        return updated
 
     async def set_cabinet_active(self, cabinet_id: int, is_active: bool) -> bool:
-        return await self.cabinets.set_active(cabinet_id, is_active)
+        updated = await self.cabinets.set_active(cabinet_id, is_active)
+        if updated:
+            self.catalog.update_cabinet(cabinet_id, is_active=is_active)
+        return updated
 
     async def delete_cabinet(self, cabinet_id: int) -> bool:
         has_items = await self.cabinets.has_instruments(cabinet_id)
         if has_items:
             return False
-        return await self.cabinets.delete(cabinet_id)
+        deleted = await self.cabinets.delete(cabinet_id)
+        if deleted:
+            self.catalog.remove_cabinet(cabinet_id)
+        return deleted
 
     async def list_instruments(self, cabinet_id: int, include_archived: bool = False):
-        return list(
-            await self.instruments.list_by_cabinet(
-                cabinet_id, include_archived=include_archived
-            )
-        )
+        return await self.catalog.list_instruments(cabinet_id, include_archived=include_archived)
 
     async def get_instrument(self, instrument_id: int):
-        return await self.instruments.get_by_id(instrument_id)
+        return await self.catalog.get_instrument(instrument_id)
 
     async def add_instrument(self, cabinet_id: int, name: str) -> None:
         instrument = Instrument(id=None, name=name, cabinet_id=cabinet_id, is_active=True)
-        await self.instruments.add(instrument)
+        self.catalog.put_instrument(await self.instruments.add(instrument))
 
     async def rename_instrument(self, instrument_id: int, name: str) -> bool:
-        return await self.instruments.update_name(instrument_id, name)
+        updated = await self.instruments.update_name(instrument_id, name)
+        if updated:
+            self.catalog.update_instrument(instrument_id, name=name)
+        return updated
 
     async def set_instrument_active(self, instrument_id: int, is_active: bool) -> bool:
-        return await self.instruments.set_active(instrument_id, is_active)
+        updated = await self.instruments.set_active(instrument_id, is_active)
+        if updated:
+            self.catalog.update_instrument(instrument_id, is_active=is_active)
+        return updated
 
     async def delete_instrument(self, instrument_id: int) -> bool:
-        return await self.instruments.delete(instrument_id)
+        deleted = await self.instruments.delete(instrument_id)
+        if deleted:
+            self.catalog.remove_instrument(instrument_id)
+        return deleted
+
+    async def cabinet_names(self) -> dict[int, str]:
+        return await self.catalog.cabinet_names()
+
+    async def instrument_names(self) -> dict[int, str]:
+        return await self.catalog.instrument_names()
 
     async def list_recent_moves(self, limit: int = 20):
         return list(await self.moves.list_recent(limit=limit))
@@ -0,0 +1,173 @@
+from dataclasses import dataclass, replace
+
+from app.domain.entities import Cabinet, Instrument
+from app.domain.repositories import CabinetRepository, InstrumentRepository
+from app.infrastructure.cache.backend import CacheBackend
+from app.infrastructure.cache.versioned import VersionedCache
+
+
+STERILIZATION_CABINET_NAME = "Стерилизационная"
+
+
+def _sort_key(item: Cabinet | Instrument) -> str:
+    return (item.name or "").casefold()
+
+
+def _is_sterilization(cabinet: Cabinet) -> bool:
+    return (
+        cabinet.is_active
+        and bool(cabinet.name)
+        and cabinet.name.strip().casefold() == STERILIZATION_CABINET_NAME.casefold()
+    )
+
+
+@dataclass(slots=True)
+class _Snapshot:
+    cabinets: dict[int, Cabinet]
+    instruments: dict[int, Instrument]
+    by_cabinet: dict[int, dict[int, Instrument]]
+    sterilization_id: int | None = None
+
+    def resolve_sterilization(self) -> None:
+        candidates = sorted(filter(_is_sterilization, self.cabinets.values()), key=_sort_key)
+        self.sterilization_id = candidates[0].id if candidates else None
+
+    def put_instrument(self, instrument: Instrument) -> None:
+        previous = self.instruments.get(instrument.id)
+        if previous is not None and previous.cabinet_id != instrument.cabinet_id:
+            self.by_cabinet.get(previous.cabinet_id, {}).pop(instrument.id, None)
+        self.instruments[instrument.id] = instrument
+        self.by_cabinet.setdefault(instrument.cabinet_id, {})[instrument.id] = instrument
+
+
+class InstrumentCatalog(VersionedCache):
+    """In-memory copy of all cabinets and instruments.
+
+    Loaded with two queries on first use and then patched in place by the
+    admin and transfer services after each successful write, so lookups and
+    name maps never go to the database.
+    """
+
+    def __init__(
+        self,
+        cabinets: CabinetRepository,
+        instruments: InstrumentRepository,
+        backend: CacheBackend | None = None,
+    ):
+        self.cabinets = cabinets
+        self.instruments = instruments
+        self._snapshot: _Snapshot | None = None
+        self._init_versioned(backend, "instruments")
+
+    async def list_cabinets(self, include_archived: bool = False) -> list[Cabinet]:
+        snapshot = await self._load()
+        cabinets = [
+            cabinet
+            for cabinet in snapshot.cabinets.values()
+            if include_archived or cabinet.is_active
+        ]
+        return sorted(cabinets, key=_sort_key)
+
+    async def get_cabinet(self, cabinet_id: int) -> Cabinet | None:
+        return (await self._load()).cabinets.get(cabinet_id)
+
+    async def get_sterilization_cabinet(self) -> Cabinet | None:
+        snapshot = await self._load()
+        if snapshot.sterilization_id is None:
+            return None
+        return snapshot.cabinets.get(snapshot.sterilization_id)
+
+    async def list_instruments(
+        self, cabinet_id: int, include_archived: bool = False
+    ) -> list[Instrument]:
+        snapshot = await self._load()
+        instruments = [
+            instrument
+            for instrument in snapshot.by_cabinet.get(cabinet_id, {}).values()
+            if include_archived or instrument.is_active
+        ]
+        return sorted(instruments, key=_sort_key)
+
+    async def get_instrument(self, instrument_id: int) -> Instrument | None:
+        return (await self._load()).instruments.get(instrument_id)
+
+    async def cabinet_names(self) -> dict[int, str]:
+        return {cabinet.id: cabinet.name for cabinet in (await self._load()).cabinets.values()}
+
+    async def instrument_names(self) -> dict[int, str]:
+        return {
+            instrument.id: instrument.name
+            for instrument in (await self._load()).instruments.values()
+        }
+
+    # --- incremental updates, called after the database write succeeded ---
+    def put_cabinet(self, cabinet: Cabinet) -> None:
+        snapshot = self._changed()
+        if snapshot is None:
+            return
+        snapshot.cabinets[cabinet.id] = cabinet
+        snapshot.resolve_sterilization()
+
+    def update_cabinet(self, cabinet_id: int, **changes) -> None:
+        snapshot = self._changed()
+        if snapshot is None or cabinet_id not in snapshot.cabinets:
+            return
+        snapshot.cabinets[cabinet_id] = replace(snapshot.cabinets[cabinet_id], **changes)
+        snapshot.resolve_sterilization()
+
+    def remove_cabinet(self, cabinet_id: int) -> None:
+        snapshot = self._changed()
+        if snapshot is None:
+            return
+        snapshot.cabinets.pop(cabinet_id, None)
+        snapshot.resolve_sterilization()
+
+    def put_instrument(self, instrument: Instrument) -> None:
+        snapshot = self._changed()
+        if snapshot is None:
+            return
+        snapshot.put_instrument(instrument)
+
+    def update_instrument(self, instrument_id: int, **changes) -> None:
+        snapshot = self._changed()
+        if snapshot is None or instrument_id not in snapshot.instruments:
+            return
+        snapshot.put_instrument(replace(snapshot.instruments[instrument_id], **changes))
+
+    def remove_instrument(self, instrument_id: int) -> None:
+        snapshot = self._changed()
+        if snapshot is None:
+            return
+        instrument = snapshot.instruments.pop(instrument_id, None)
+        if instrument is not None:
+            snapshot.by_cabinet.get(instrument.cabinet_id, {}).pop(instrument_id, None)
+
+    def _clear(self) -> None:
+        self._snapshot = None
+
+    def _changed(self) -> _Snapshot | None:
+        self._written()
+        return self._snapshot
+
+    async def _load(self) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            self.stats.hits += 1
+            return snapshot
+        return await self._load_once(lambda: self._snapshot, self._load_snapshot, self._keep)
+
+    async def _load_snapshot(self) -> _Snapshot:
+        cabinets = await self.cabinets.list_all(include_archived=True)
+        instruments = await self.instruments.list_all(include_archived=True)
+        snapshot = _Snapshot(
+            cabinets={cabinet.id: cabinet for cabinet in cabinets},
+            instruments={},
+            by_cabinet={},
+        )
+        for instrument in instruments:
+            snapshot.put_instrument(instrument)
+        snapshot.resolve_sterilization()
+        return snapshot
+
+    def _keep(self, snapshot: _Snapshot) -> None:
+        self._snapshot = snapshot
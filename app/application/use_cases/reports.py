@@ -1,4 +1,4 @@
-﻿from datetime import datetime, timedelta
+﻿from datetime import date, datetime, timedelta
 from collections import defaultdict
 from zoneinfo import ZoneInfo
 
@@ -10,6 +10,7 @@ from app.domain.repositories import (
     AnswerRepository,
     ShiftRepository,
 )
+from app.infrastructure.send_limiter import bulk_sends
 from app.logger import setup_logger
 
 
@@ -29,33 +30,31 @@ class ReportsService:
 
     async def send_monthly_reports(self, bot: Bot) -> None:
         self.logger.info("Starting monthly reports generation")
-        now = datetime.now(ZoneInfo("Europe/Moscow"))
+        today = datetime.now(ZoneInfo("Europe/Moscow")).date()
 
         workers = list(await self.workers.list_all())
-        answers = list(await self.answers.list_all())
-        shifts = list(await self.shifts.list_all())
+        shifts = list(await self.shifts.list_assigned_since(today - timedelta(days=30)))
 
-        surveys_by_name = await self._collect_survey_cache(answers)
-        answers_by_object = self._group_answers_by_object(answers)
-        shifts_by_assistant = self._group_shifts_last_month(shifts, now)
+        scores_by_object = await self._collect_scores(
+            {worker.full_name for worker in workers}, today
+        )
+        shifts_by_assistant = self._group_shifts_by_assistant(shifts)
 
         sent_count = 0
         skipped_count = 0
 
         for worker in workers:
-            worker_answers = answers_by_object.get(worker.full_name, [])
+            worker_scores = scores_by_object.get(worker.full_name)
             worker_shifts = shifts_by_assistant.get(worker.id)
 
-            if not worker_answers and not worker_shifts:
+            if not worker_scores and not worker_shifts:
                 skipped_count += 1
                 self.logger.debug(
                     "Skip report: no data for %s", worker.full_name
                 )
                 continue
 
-            results, open_answers = self._calculate_scores_for_worker(
-                worker_answers, surveys_by_name, now
-            )
+            results, open_answers = worker_scores or self._new_scores()
 
             try:
                 messages = self._format_report_text(
@@ -84,89 +83,91 @@ class ReportsService:
         )
 
     # --- helpers ---
-    async def _collect_survey_cache(self, all_answers):
-        survey_names = set(ans.survey for ans in all_answers)
-        surveys_by_name = {}
-        for name in survey_names:
-            surveys_by_name[name] = await self.surveys.get_by_name(name)
-        return surveys_by_name
-
-    def _group_answers_by_object(self, all_answers):
-        grouped = defaultdict(list)
-        for ans in all_answers:
-            grouped[ans.object].append(ans)
-        return grouped
-
-    def _group_shifts_last_month(self, all_shifts, now: datetime):
-        one_month_ago = now - timedelta(days=30)
-        result = defaultdict(lambda: defaultdict(int))
-        for shift in all_shifts:
-            if shift.assistant_id is None:
-                continue
-            shift_date = self._parse_russian_date(shift.date)
-            if not shift_date or shift_date < one_month_ago:
+    async def _collect_scores(self, objects: set[str], today: date):
+        """Fold every answer about the given workers into per-worker score totals.
+
+        Answers are streamed, so memory depends on the number of workers and
+        questions rather than on the length of the answer history.
+        """
+        surveys_by_name = {survey.speciality: survey for survey in await self.surveys.list_all()}
+        scores_by_object = {}
+        # "All time" has no lower bound; undated answers are never scored.
+        async for ans in self.answers.stream_between(date.min, today, objects=objects):
+            survey = surveys_by_name.get(ans.survey)
+            if not survey:
                 continue
+            scores = scores_by_object.get(ans.object)
+            if scores is None:
+                scores = scores_by_object[ans.object] = self._new_scores()
+            self._add_answer_scores(scores, ans, survey, today)
+        return scores_by_object
+
+    def _group_shifts_by_assistant(self, shifts):
+        result = defaultdict(lambda: defaultdict(int))
+        for shift in shifts:
             result[shift.assistant_id][shift.doctor_name] += 1
         return result
 
-    def _calculate_scores_for_worker(self, answers, surveys_by_name, now: datetime):
-        one_month_ago = now - timedelta(days=30)
-        six_months_ago = now - timedelta(days=180)
-
+    def _new_scores(self):
+        # Each question keeps [count, total] instead of every score.
         results = {
-            "Month": defaultdict(lambda: defaultdict(list)),
-            "Half-year": defaultdict(lambda: defaultdict(list)),
-            "All time": defaultdict(lambda: defaultdict(list)),
+            "Month": defaultdict(lambda: defaultdict(lambda: [0, 0])),
+            "Half-year": defaultdict(lambda: defaultdict(lambda: [0, 0])),
+            "All time": defaultdict(lambda: defaultdict(lambda: [0, 0])),
         }
-
         open_answers = defaultdict(list)
+        return results, open_answers
 
-        for ans in answers:
-            survey = surveys_by_name.get(ans.survey)
-            if not survey:
-                continue
-
-            survey_date = self._parse_russian_date(ans.survey_date)
-            if not survey_date:
-                continue
-
-            for i in range(1, 5 + 1):
-                question_text = getattr(survey, f"question{i}", f"Question {i}").split("\n")[0]
-                q_type = getattr(survey, f"question{i}_type")
-
-                raw_answer = getattr(ans, f"answer{i}")
-                if q_type == "int":
-                    try:
-                        score = int(raw_answer)
-                        if not (1 <= score <= 5):
-                            continue
-                    except (ValueError, TypeError):
-                        continue
+    def _add_answer_scores(self, scores, ans, survey, today: date) -> None:
+        results, open_answers = scores
+        one_month_ago = today - timedelta(days=30)
+        six_months_ago = today - timedelta(days=180)
 
-                    if survey_date >= one_month_ago:
-                        results["Month"][survey.speciality][question_text].append(score)
-                    if survey_date >= six_months_ago:
-                        results["Half-year"][survey.speciality][question_text].append(score)
-                    results["All time"][survey.speciality][question_text].append(score)
+        survey_date = ans.survey_date
+        if not survey_date:
+            return
 
-                elif q_type == "str" and survey_date >= one_month_ago:
-                    if raw_answer and str(raw_answer).strip():
-                        open_answers[survey.speciality].append(
-                            (question_text, str(raw_answer).strip())
-                        )
+        for i in range(1, 5 + 1):
+            question_text = getattr(survey, f"question{i}", f"Question {i}").split("\n")[0]
+            q_type = getattr(survey, f"question{i}_type")
 
-        return results, open_answers
+            raw_answer = getattr(ans, f"answer{i}")
+            if q_type == "int":
+                try:
+                    score = int(raw_answer)
+                    if not (1 <= score <= 5):
+                        continue
+                except (ValueError, TypeError):
+                    continue
+
+                periods = ["All time"]
+                if survey_date >= six_months_ago:
+                    periods.append("Half-year")
+                if survey_date >= one_month_ago:
+                    periods.append("Month")
+                for period in periods:
+                    totals = results[period][survey.speciality][question_text]
+                    totals[0] += 1
+                    totals[1] += score
+
+            elif q_type == "str" and survey_date >= one_month_ago:
+                if raw_answer and str(raw_answer).strip():
+                    open_answers[survey.speciality].append(
+                        (question_text, str(raw_answer).strip())
+                    )
 
     def _format_report_text(self, results, open_answers, shifts_info=None):
         messages = []
         period_values_seen = set()
 
         for period_name, surveys in results.items():
+            # Periods are nested, so equal (count, total) per question means
+            # the same set of answers as a longer period already shown.
             serialized = str(
                 sorted(
-                    (survey, question, sorted(scores))
+                    (survey, question, count, total)
                     for survey, questions in surveys.items()
-                    for question, scores in questions.items()
+                    for question, (count, total) in questions.items()
                 )
             )
 
@@ -183,9 +184,9 @@ class ReportsService:
 
             for survey_title, questions in surveys.items():
                 text += f"— Survey: {survey_title}\n"
-                for question, scores in questions.items():
-                    avg = round(sum(scores) / len(scores), 2)
-                    text += f"• {question}\n {avg} / 5 ({len(scores)} answers)\n\n"
+                for question, (count, total) in questions.items():
+                    avg = round(total / count, 2)
+                    text += f"• {question}\n {avg} / 5 ({count} answers)\n\n"
 
             if period_name == "Month" and open_answers:
                 text += "— Open answers:\n"
@@ -210,12 +211,6 @@ class ReportsService:
 
         return messages
 
-    def _parse_russian_date(self, date_str: str):
-        try:
-            return datetime.strptime(date_str, "%d.%m.%Y").replace(tzinfo=ZoneInfo("Europe/Moscow"))
-        except Exception:
-            return None
-
     def _split_message(self, text: str, max_len: int = 4096):
         lines = text.split("\n")
         chunks = []
@@ -231,5 +226,7 @@ class ReportsService:
         return chunks
 
     async def _safe_send_long_message(self, bot: Bot, chat_id: str, text: str, parse_mode: str = "Markdown"):
-        for part in self._split_message(text):
-            await bot.send_message(chat_id=chat_id, text=part, parse_mode=parse_mode)
\ No newline at end of file
+        # Paced by the bot's send limiter, behind replies to users.
+        with bulk_sends():
+            for part in self._split_message(text):
+                await bot.send_message(chat_id=chat_id, text=part, parse_mode=parse_mode)
\ No newline at end of file
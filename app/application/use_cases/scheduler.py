@@ -1,58 +1,198 @@
-﻿from collections import defaultdict
+﻿import asyncio
+from collections import defaultdict
 from datetime import datetime
 
 from aiogram import Bot, Dispatcher
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter, TelegramServerError
 
-from app.domain.entities import Pair
-from app.application.use_cases.survey_flow import SurveyFlowService
+from app.domain.entities import OutboxEntry, Pair, Survey, Worker
+from app.domain.repositories import SurveyOutboxRepository
+from app.application.use_cases.fan_out import fan_out
+from app.application.use_cases.survey_flow import QueuedPair, SurveyFlowService
 from app.handlers.survey_handlers import start_pair_survey
+from app.infrastructure.db.unit_of_work import unit_of_work
+from app.infrastructure.send_limiter import bulk_sends
 from app.logger import setup_logger
 
 
+CLAIM_BATCH_SIZE = 100
+# How long a claimed entry stays invisible to other dispatchers.
+CLAIM_LEASE = 300.0
+MAX_RETRY_DELAY = 3600.0
+# Only these can succeed later; a blocked bot or an unknown chat cannot.
+RETRYABLE_ERRORS = (
+    TelegramRetryAfter,
+    TelegramNetworkError,
+    TelegramServerError,
+    OSError,
+    asyncio.TimeoutError,
+)
+
+
 class SurveyScheduler:
-    def __init__(self, survey_flow: SurveyFlowService):
+    def __init__(
+        self,
+        survey_flow: SurveyFlowService,
+        outbox: SurveyOutboxRepository,
+        concurrency: int = 10,
+        max_attempts: int = 6,
+        retry_delay: float = 30.0,
+    ):
         self.survey_flow = survey_flow
+        self.outbox = outbox
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
         self.logger = setup_logger("surveys", "surveys.log")
 
     async def send_surveys(self, bot: Bot, dp: Dispatcher) -> None:
         self.logger.info("📤 Запуск рассылки опросов")
-        await self.survey_flow.reset_incomplete()
 
-        today = datetime.now().strftime("%d.%m.%Y")
-        pairs = await self.survey_flow.get_ready_pairs_for_today(today)
+        # The pairs are marked and their sends queued in one transaction: a
+        # crash leaves either nothing or entries dispatch_pending picks up.
+        async with unit_of_work(join=False):
+            await self.survey_flow.reset_incomplete()
 
-        by_user: dict[str, list[Pair]] = defaultdict(list)
-        for p in pairs:
-            by_user[p.subject].append(p)
+            today = datetime.now().date()
+            pairs = await self.survey_flow.get_ready_pairs_for_today(today)
 
-        for subject, user_pairs in by_user.items():
-            try:
-                worker = await self.survey_flow.get_worker(subject)
-            except Exception as exc:
-                self.logger.error("get_worker_by_fullname: %s. subject: %s.", exc, subject)
-                continue
+            by_user: dict[str, list[Pair]] = defaultdict(list)
+            for p in pairs:
+                by_user[p.subject].append(p)
+            pair_ids = [user_pairs[0].id for user_pairs in by_user.values()]
 
-            if not worker or not worker.chat_id:
-                self.logger.warning("Не найден chat_id для %s", subject)
-                continue
+            await self.survey_flow.mark_pairs_status(pair_ids, "in_progress")
+            await self.outbox.enqueue(pair_ids)
 
-            if any(p.status == "in_progress" for p in user_pairs):
-                self.logger.warning("У %s уже есть незавершённый опрос", subject)
-                continue
+            # The rest wait in memory, photos attached, for the handoff after
+            # each finished survey.
+            later = {subject: user_pairs[1:] for subject, user_pairs in by_user.items()}
+            colleagues = await self.survey_flow.get_workers(
+                {pair.object for user_pairs in later.values() for pair in user_pairs}
+            )
 
-            pair = user_pairs[0]
+        queues: dict[str, list[QueuedPair]] = defaultdict(list)
+        for subject, user_pairs in later.items():
+            for pair in user_pairs:
+                colleague = colleagues.get(pair.object)
+                queues[subject].append(QueuedPair(pair, colleague.file_id if colleague else None))
+        self.survey_flow.ready_pairs.replace(queues)
+        self.logger.info(
+            "В очередь рассылки поставлено опросов: %s, ждут следующими: %s",
+            len(pair_ids),
+            len(self.survey_flow.ready_pairs),
+        )
+        await self.dispatch_pending(bot, dp)
 
+    async def dispatch_pending(self, bot: Bot, dp: Dispatcher) -> None:
+        """Send every due outbox entry; also runs on a timer to pick up retries."""
+        while True:
+            async with unit_of_work(join=False):
+                entries = await self.outbox.claim_due(CLAIM_BATCH_SIZE, CLAIM_LEASE)
+            if not entries:
+                return
+            await self._dispatch(bot, dp, entries)
+
+    async def _dispatch(self, bot: Bot, dp: Dispatcher, entries: list[OutboxEntry]) -> None:
+        # Everything the sends need is loaded up front: the pairs, one query
+        # for the subjects and the colleagues they rate, one for the surveys.
+        pairs = await self.survey_flow.get_pairs(entry.pair_id for entry in entries)
+        workers = await self.survey_flow.get_workers(
+            {pair.subject for pair in pairs.values()} | {pair.object for pair in pairs.values()}
+        )
+        surveys = await self.survey_flow.get_surveys({pair.survey for pair in pairs.values()})
+
+        async def deliver(entry_id: int, entry: OutboxEntry) -> str:
+            pair = pairs.get(entry.pair_id)
             try:
-                await self.survey_flow.mark_pair_status(pair.id, "in_progress")
-                file_id = await self.survey_flow.get_worker_file_id(pair.object)
-                await start_pair_survey(
-                    bot,
-                    int(worker.chat_id),
-                    pair,
-                    self.survey_flow,
-                    dp=dp,
-                    file_id=file_id,
-                )
-                self.logger.info("Отправлен опрос для %s от %s, id: %s", pair.subject, pair.date, pair.id)
+                # Each send gets its own connection and transaction.
+                async with unit_of_work(join=False):
+                    return await self._deliver(bot, dp, entry, pair, workers, surveys)
             except Exception as exc:
-                self.logger.error("Failed to start pair survey: %s. id: %s", exc, pair.id)
+                async with unit_of_work(join=False):
+                    return await self._retry_or_give_up(entry, exc)
+
+        # Paced by the bot's send limiter, behind replies to users.
+        with bulk_sends():
+            await fan_out(
+                ((entry.id, entry) for entry in entries),
+                deliver,
+                concurrency=self.concurrency,
+                logger=self.logger,
+                label="Рассылка опросов",
+            )
+
+    async def _deliver(
+        self,
+        bot: Bot,
+        dp: Dispatcher,
+        entry: OutboxEntry,
+        pair: Pair | None,
+        workers: dict[str, Worker],
+        surveys: dict[str, Survey],
+    ) -> str:
+        # Finished or reset since it was queued: nothing left to send.
+        if pair is None or pair.status != "in_progress":
+            await self.outbox.mark_done(entry.id, "cancelled")
+            return "cancelled"
+
+        worker = workers.get(pair.subject)
+        if not worker or not worker.chat_id:
+            self.logger.warning("Не найден chat_id для %s", pair.subject)
+            await self._give_up(entry, "no chat_id")
+            return "no_chat_id"
+
+        survey = surveys.get(pair.survey)
+        if survey is None:
+            self.logger.warning("Не найден опрос %s для пары %s", pair.survey, pair.id)
+            await self._give_up(entry, f"no survey {pair.survey!r}")
+            return "no_survey"
+
+        colleague = workers.get(pair.object)
+        await start_pair_survey(
+            bot,
+            int(worker.chat_id),
+            pair,
+            self.survey_flow,
+            dp=dp,
+            file_id=colleague.file_id if colleague else None,
+            survey=survey,
+        )
+        await self.outbox.mark_done(entry.id, "sent")
+        self.logger.info("Отправлен опрос для %s от %s, id: %s", pair.subject, pair.date, pair.id)
+        return "sent"
+
+    async def _retry_or_give_up(self, entry: OutboxEntry, exc: Exception) -> str:
+        error = f"{type(exc).__name__}: {exc}"
+        if not isinstance(exc, RETRYABLE_ERRORS):
+            self.logger.error("Опрос для пары %s не отправлен: %s", entry.pair_id, error)
+            await self._give_up(entry, error)
+            return "failed"
+
+        if entry.attempts >= self.max_attempts:
+            self.logger.error(
+                "Опрос для пары %s не отправлен за %s попыток: %s",
+                entry.pair_id,
+                entry.attempts,
+                error,
+            )
+            await self._give_up(entry, error)
+            return "failed"
+
+        delay = min(self.retry_delay * 2 ** (entry.attempts - 1), MAX_RETRY_DELAY)
+        if isinstance(exc, TelegramRetryAfter):
+            delay = max(delay, exc.retry_after)
+        self.logger.warning(
+            "Опрос для пары %s не отправлен (попытка %s), повтор через %.0f с: %s",
+            entry.pair_id,
+            entry.attempts,
+            delay,
+            error,
+        )
+        await self.outbox.retry_later(entry.id, error, delay)
+        return "retrying"
+
+    async def _give_up(self, entry: OutboxEntry, error: str) -> None:
+        # The pair goes back to "ready", so the next run queues it again.
+        await self.outbox.mark_done(entry.id, "failed", error)
+        await self.survey_flow.mark_pair_status(entry.pair_id, "ready")
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date
 
 from app.domain.repositories import WorkerRepository, ShiftRepository
 
@@ -9,12 +9,11 @@ class ShiftAdminService:
         self.shifts = shifts
 
     @staticmethod
-    def _today_str() -> str:
-        return datetime.now().strftime("%d.%m.%Y")
+    def _today() -> date:
+        return date.today()
 
     async def list_today_shifts(self):
-        date_str = self._today_str()
-        shifts = list(await self.shifts.list_by_date(date_str))
+        shifts = list(await self.shifts.list_by_date(self._today()))
         order = {"morning": 0, "evening": 1}
         shifts.sort(
             key=lambda s: (
@@ -35,7 +34,7 @@ class ShiftAdminService:
         return await self.shifts.get_by_id(shift_id)
 
     async def create_shift_today(self, doctor_name: str, shift_type: str) -> bool:
-        date_str = self._today_str()
+        today = self._today()
         existing = [
             s
             for s in await self.list_today_shifts()
@@ -43,12 +42,12 @@ class ShiftAdminService:
         ]
         if existing:
             return False
-        return await self.shifts.add_slot(doctor_name, date_str, shift_type)
+        return await self.shifts.add_slot(doctor_name, today, shift_type)
 
     async def delete_shift_today(self, shift_id: int) -> bool:
         shift = await self.shifts.get_by_id(shift_id)
         if not shift:
             return False
-        if shift.date != self._today_str():
+        if shift.date != self._today():
             return False
         return await self.shifts.delete_by_id(shift_id)
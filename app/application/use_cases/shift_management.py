@@ -1,5 +1,6 @@
-from datetime import datetime
+import datetime as dt
 
+from app.domain.entities import Shift
 from app.domain.repositories import WorkerRepository, ShiftRepository
 
 
@@ -25,16 +26,24 @@ class ShiftService:
     async def list_all_doctors(self):
         return await self.workers.list_all()
 
-    async def get_current_shift(self, worker_id: int, date: str, shift_type: str):
+    async def get_current_shift(self, worker_id: int, date: dt.date, shift_type: str):
         return await self.shifts.get_for_assistant(worker_id, date, shift_type)
 
-    async def list_free_shifts(self, date: str, shift_type: str):
+    async def list_free_shifts(self, date: dt.date, shift_type: str):
         return await self.shifts.list_free(date, shift_type)
 
-    async def add_shift_by_id(self, worker_id: int, worker_name: str, shift_id: int) -> bool:
-        return await self.shifts.add_by_id(worker_id, worker_name, shift_id)
+    async def add_shift_by_id(
+        self,
+        worker_id: int,
+        worker_name: str,
+        shift_id: int,
+        date: dt.date,
+        shift_type: str,
+    ) -> Shift | None:
+        """Book the shift if it is free and in the given window, in one statement."""
+        return await self.shifts.add_by_id(worker_id, worker_name, shift_id, date, shift_type)
 
-    async def remove_shift(self, assistant_id: int, date: str, shift_type: str) -> None:
+    async def remove_shift(self, assistant_id: int, date: dt.date, shift_type: str) -> None:
         await self.shifts.remove_assistant(assistant_id, date, shift_type)
 
     async def add_manual_shift(
@@ -43,17 +52,13 @@ class ShiftService:
         assistant_name: str,
         doctor_name: str,
         shift_type: str,
-        date: str,
+        date: dt.date,
     ) -> bool:
         return await self.shifts.add_manual(
             assistant_id, assistant_name, doctor_name, shift_type, date
         )
 
-    async def get_shift_by_id(self, shift_id: int):
-        return await self.shifts.get_by_id(shift_id)
-
-    def guess_shift_type_from_now(self) -> tuple[str | None, str]:
-        now = datetime.now()
+    def guess_shift_type_from_now(self) -> tuple[str | None, dt.date]:
+        now = dt.datetime.now()
         shift_type = detect_shift_type(now.hour)
-        date_str = now.strftime("%d.%m.%Y")
-        return shift_type, date_str
+        return shift_type, now.date()
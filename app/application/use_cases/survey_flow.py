@@ -1,12 +1,53 @@
-from datetime import datetime
+import datetime as dt
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
+from typing import Iterable, Mapping, Sequence
 
-from app.domain.entities import Answer, Pair
+from app.domain.entities import Answer, Pair, Survey, Worker
 from app.domain.repositories import (
     WorkerRepository,
     PairRepository,
     SurveyRepository,
     AnswerRepository,
 )
+from app.infrastructure.db.unit_of_work import current_unit_of_work
+
+
+@dataclass(slots=True, frozen=True)
+class QueuedPair:
+    pair: Pair
+    file_id: str | None
+
+
+class ReadyPairQueues:
+    """Each subject's remaining ready pairs for the day, in survey order.
+
+    Built by the daily dispatch with the colleague's photo already looked
+    up, so handing a subject their next survey needs no reads. A subject
+    whose queue ran out, or who was not in the dispatch, is not queued.
+    """
+
+    def __init__(self):
+        self._queues: dict[str, deque[QueuedPair]] = {}
+
+    def replace(self, queues: Mapping[str, Sequence[QueuedPair]]) -> None:
+        self._queues = {subject: deque(queued) for subject, queued in queues.items() if queued}
+
+    def pop(self, subject: str) -> QueuedPair | None:
+        queue = self._queues.get(subject)
+        if not queue:
+            return None
+        queued = queue.popleft()
+        if not queue:
+            del self._queues[subject]
+        return queued
+
+    def push_front(self, subject: str, queued: QueuedPair) -> None:
+        self._queues.setdefault(subject, deque()).appendleft(queued)
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
 
 
 class SurveyFlowService:
@@ -21,8 +62,9 @@ class SurveyFlowService:
         self.pairs = pairs
         self.surveys = surveys
         self.answers = answers
+        self.ready_pairs = ReadyPairQueues()
 
-    async def get_ready_pairs_for_today(self, today: str) -> list[Pair]:
+    async def get_ready_pairs_for_today(self, today: dt.date) -> list[Pair]:
         return list(await self.pairs.list_ready_by_date(today))
 
     async def reset_incomplete(self) -> None:
@@ -31,12 +73,44 @@ class SurveyFlowService:
     async def mark_pair_status(self, pair_id: int, status: str) -> None:
         await self.pairs.update_status(pair_id, status)
 
+    async def mark_pairs_status(self, pair_ids: list[int], status: str) -> None:
+        await self.pairs.update_status_many(pair_ids, status)
+
+    async def get_pair(self, pair_id: int) -> Pair | None:
+        return await self.pairs.get_by_id(pair_id)
+
+    async def get_pairs(self, pair_ids: Iterable[int]) -> dict[int, Pair]:
+        return await self.pairs.get_many_by_ids(pair_ids)
+
     async def get_next_ready_pair(self, subject: str) -> Pair | None:
         return await self.pairs.next_ready_for_subject(subject)
 
+    async def take_next_pair(self, subject: str) -> QueuedPair | None:
+        """Mark the subject's next ready pair in progress and return it.
+
+        Served from ``ready_pairs`` when the subject is queued; a queued pair
+        that is no longer ready (reset or taken elsewhere) is skipped. Falls
+        back to the database once the queue is gone.
+        """
+        uow = current_unit_of_work()
+        while (queued := self.ready_pairs.pop(subject)) is not None:
+            if uow is not None:
+                # A claim that rolls back leaves the pair ready: queue it again.
+                uow.call_on_rollback(partial(self.ready_pairs.push_front, subject, queued))
+            if await self.pairs.claim_ready(queued.pair.id):
+                return queued
+
+        while (pair := await self.pairs.next_ready_for_subject(subject)) is not None:
+            if await self.pairs.claim_ready(pair.id):
+                return QueuedPair(pair, await self.get_worker_file_id(pair.object))
+        return None
+
     async def get_worker(self, full_name: str):
         return await self.workers.get_by_fullname(full_name)
 
+    async def get_workers(self, full_names: Iterable[str]) -> dict[str, Worker]:
+        return await self.workers.get_many_by_fullnames(full_names)
+
     async def get_worker_file_id(self, name: str) -> str | None:
         worker = await self.workers.get_by_fullname(name)
         if worker and worker.file_id:
@@ -46,8 +120,14 @@ class SurveyFlowService:
     async def get_survey(self, name: str):
         return await self.surveys.get_by_name(name)
 
+    async def get_surveys(self, names: Iterable[str]) -> dict[str, Survey]:
+        return await self.surveys.get_many_by_names(names)
+
+    async def get_survey_by_id(self, survey_id: int) -> Survey | None:
+        return await self.surveys.get_by_id(survey_id)
+
     async def save_answers(self, pair: Pair, survey, answers: list[str]) -> None:
-        now = datetime.now()
+        now = dt.datetime.now().astimezone()
         a1, a2, a3, a4, a5 = answers
 
         new_answer = Answer(
@@ -55,7 +135,7 @@ class SurveyFlowService:
             object=pair.object,
             survey=pair.survey,
             survey_date=pair.date,
-            completed_at=str(now),
+            completed_at=now,
             question1=survey.question1,
             answer1=a1,
             question2=survey.question2,
@@ -5,7 +5,9 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from dotenv import load_dotenv
 
 from app.container import build_container
+from app.infrastructure.db.fsm_storage import PostgresStorage
 from app.infrastructure.db.models import async_main
+from app.infrastructure.db.unit_of_work import run_in_unit_of_work
 from app.handlers.register_handlers import create_register_router
 from app.handlers.survey_handlers import create_survey_router
 from app.handlers.admin_handlers import create_admin_router
@@ -15,6 +17,7 @@ from app.handlers.moves_handlers import create_moves_router
 from app.handlers.instrument_transfer_handlers import create_instrument_transfer_router
 from app.handlers.admin_panel_handlers import create_admin_panel_router
 from app.logger import setup_logger
+from app.middlewares import CommitBeforeRequestMiddleware, UnitOfWorkMiddleware
 
 
 async def main():
@@ -25,32 +28,61 @@ async def main():
     logger = setup_logger("bot", "bot.log")
 
     bot = Bot(token=settings.bot.token)
-    dp = Dispatcher()
+    bot.session.middleware(CommitBeforeRequestMiddleware())
+    bot.session.middleware(container.send_limiter)
+    # The FSM middleware is registered by hand so that it runs inside the
+    # update's unit of work: state reads share the update's connection.
+    dp = Dispatcher(storage=container.fsm_storage, disable_fsm=True)
 
     await async_main()
+    await container.cache_backend.start()
 
-    dp.include_router(create_admin_router(container.admin_sync))
+    dp.update.outer_middleware(UnitOfWorkMiddleware())
+    dp.update.outer_middleware(dp.fsm)
+
+    dp.include_router(
+        create_admin_router(container.admin_sync, container.cache_stats, container.fsm_states)
+    )
     dp.include_router(create_register_router(container.registration))
     dp.include_router(create_survey_router(container.survey_flow))
-    dp.include_router(create_shift_router(container.shift_service))
-    dp.include_router(create_shift_admin_router(container.shift_admin, container.admin_access))
+    dp.include_router(create_shift_router(container.shift_service, container.keyboards))
+    dp.include_router(
+        create_shift_admin_router(container.shift_admin, container.admin_access, container.keyboards)
+    )
     dp.include_router(create_moves_router(container.instrument_admin))
-    dp.include_router(create_instrument_transfer_router(container.instrument_transfer))
     dp.include_router(
-        create_admin_panel_router(container.instrument_admin, container.admin_access)
+        create_instrument_transfer_router(container.instrument_transfer, container.keyboards)
+    )
+    dp.include_router(
+        create_admin_panel_router(
+            container.instrument_admin, container.admin_access, container.keyboards
+        )
     )
 
     scheduler = AsyncIOScheduler()
     # scheduler.add_job(container.admin_sync.sync_pairs, "cron", hour=19, minute=50)
-    scheduler.add_job(container.admin_sync.sync_shifts, "cron", hour=6, minute=0)
+    scheduler.add_job(run_in_unit_of_work(container.admin_sync.sync_shifts), "cron", hour=6, minute=0)
     # scheduler.add_job(container.scheduler.send_surveys, "cron", hour=20, minute=0, args=[bot, dp])
+    scheduler.add_job(
+        container.scheduler.dispatch_pending,
+        "interval",
+        seconds=settings.survey.outbox_poll_interval,
+        args=[bot, dp],
+    )
     # scheduler.add_job(container.admin_sync.export_answers, "cron", day_of_week="sun", hour=23, minute=0)
-    scheduler.add_job(container.admin_sync.export_shifts, "cron", hour=23, minute=5)
+    scheduler.add_job(run_in_unit_of_work(container.admin_sync.export_shifts), "cron", hour=23, minute=5)
+    if isinstance(container.fsm_storage, PostgresStorage):
+        scheduler.add_job(container.fsm_storage.delete_expired, "interval", hours=1)
+    scheduler.add_job(container.fsm_states.sweep, "interval", minutes=10)
     # scheduler.add_job(container.reports.send_monthly_reports, "cron", day=1, hour=16, minute=38, args=[bot])
     scheduler.start()
     logger.info("Scheduler started with jobs: %s", scheduler.get_jobs())
 
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await container.cache_backend.close()
+        await container.engine.dispose()
 
 
 if __name__ == "__main__":
@@ -10,6 +10,11 @@ class BotSettings:
     token: str
     report_chat_id: str | None
     admin_chat_ids: list[str]
+    send_rate: float = 30.0
+    chat_send_rate: float = 1.0
+    group_sends_per_minute: float = 20.0
+    chat_send_burst: int = 3
+    send_retries: int = 3
 
 
 @dataclass
@@ -19,6 +24,20 @@ class DbSettings:
     name: str
     user: str
     password: str
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100
+    command_timeout: float | None = None
+
+    @property
+    def url(self) -> str:
+        return (
+            f"postgresql+asyncpg://{self.user}:{self.password}"
+            f"@{self.host}:{self.port}/{self.name}"
+        )
 
 
 @dataclass
@@ -34,14 +53,60 @@ class SheetsSettings:
     answers_table: str
 
 
+@dataclass
+class CacheSettings:
+    admin_ttl: float = 60.0
+    unknown_chat_ids: int = 1024
+    backend: str = "memory"
+    redis_url: str = "redis://localhost:6379/0"
+    redis_timeout: float = 1.0
+
+
+@dataclass
+class FsmSettings:
+    storage: str = "postgres"
+    ttl: float = 86_400.0
+    redis_url: str = "redis://localhost:6379/0"
+    idle_timeout: float = 86_400.0
+    max_states: int = 10_000
+
+
+@dataclass
+class SurveySettings:
+    dispatch_concurrency: int = 10
+    send_attempts: int = 6
+    retry_delay: float = 30.0
+    outbox_poll_interval: float = 30.0
+
+
 @dataclass
 class Settings:
     bot: BotSettings
     db: DbSettings
     sheets: SheetsSettings
+    cache: CacheSettings
+    fsm: FsmSettings
+    survey: SurveySettings
     log_dir: Path
 
 
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name, "").strip()
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float | None) -> float | None:
+    value = os.getenv(name, "").strip()
+    return float(value) if value else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name, "").strip().lower()
+    if not value:
+        return default
+    return value in {"1", "true", "yes", "on"}
+
+
 def load_settings() -> Settings:
     load_dotenv()
 
@@ -67,6 +132,36 @@ def load_settings() -> Settings:
         name=os.getenv("DB_NAME", ""),
         user=os.getenv("DB_USER", ""),
         password=os.getenv("DB_PASSWORD", ""),
+        pool_size=_env_int("DB_POOL_SIZE", 5),
+        max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+        pool_timeout=_env_float("DB_POOL_TIMEOUT", 30.0),
+        pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+        pool_pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+        statement_cache_size=_env_int("DB_STATEMENT_CACHE_SIZE", 100),
+        command_timeout=_env_float("DB_COMMAND_TIMEOUT", None),
+    )
+
+    cache = CacheSettings(
+        admin_ttl=_env_float("CACHE_ADMIN_TTL", 60.0),
+        unknown_chat_ids=_env_int("CACHE_UNKNOWN_CHAT_IDS", 1024),
+        backend=os.getenv("CACHE_BACKEND", "memory").strip().lower() or "memory",
+        redis_url=os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"),
+        redis_timeout=_env_float("CACHE_REDIS_TIMEOUT", 1.0),
+    )
+
+    fsm = FsmSettings(
+        storage=os.getenv("FSM_STORAGE", "postgres").strip().lower() or "postgres",
+        ttl=_env_float("FSM_TTL", 86_400.0),
+        redis_url=os.getenv("FSM_REDIS_URL", cache.redis_url),
+        idle_timeout=_env_float("FSM_IDLE_TIMEOUT", 86_400.0),
+        max_states=_env_int("FSM_MAX_STATES", 10_000),
+    )
+
+    survey = SurveySettings(
+        dispatch_concurrency=_env_int("SURVEY_DISPATCH_CONCURRENCY", 10),
+        send_attempts=_env_int("SURVEY_SEND_ATTEMPTS", 6),
+        retry_delay=_env_float("SURVEY_RETRY_DELAY", 30.0),
+        outbox_poll_interval=_env_float("SURVEY_OUTBOX_POLL_INTERVAL", 30.0),
     )
 
     bot = BotSettings(
@@ -77,11 +172,19 @@ def load_settings() -> Settings:
             for item in os.getenv("ADMIN_CHAT_IDS", "").replace(";", ",").split(",")
             if item.strip()
         ],
+        send_rate=_env_float("SEND_RATE", 30.0),
+        chat_send_rate=_env_float("SEND_CHAT_RATE", 1.0),
+        group_sends_per_minute=_env_float("SEND_GROUP_PER_MINUTE", 20.0),
+        chat_send_burst=_env_int("SEND_CHAT_BURST", 3),
+        send_retries=_env_int("SEND_RETRIES", 3),
     )
 
     return Settings(
         bot=bot,
         db=db,
         sheets=sheets,
+        cache=cache,
+        fsm=fsm,
+        survey=survey,
         log_dir=log_dir,
     )
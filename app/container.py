@@ -1,4 +1,15 @@
 from app.config import load_settings
+from app.infrastructure.cache.backend import create_cache_backend
+from app.infrastructure.db.cached_repositories import (
+    CachedAdminRepository,
+    CachedShiftRepository,
+    CachedSurveyRepository,
+    CachedWorkerRepository,
+)
+from app.infrastructure.db.engine import init_engine
+from app.infrastructure.db.fsm_storage import create_fsm_storage
+from app.infrastructure.fsm_lifecycle import StateLifecycle
+from app.infrastructure.send_limiter import SendLimiter
 from app.infrastructure.db.repositories import (
     SqlAlchemyAdminRepository,
     SqlAlchemyWorkerRepository,
@@ -6,6 +17,7 @@ from app.infrastructure.db.repositories import (
     SqlAlchemySurveyRepository,
     SqlAlchemyAnswerRepository,
     SqlAlchemyShiftRepository,
+    SqlAlchemySurveyOutboxRepository,
     SqlAlchemyCabinetRepository,
     SqlAlchemyInstrumentRepository,
     SqlAlchemyInstrumentMoveRepository,
@@ -16,11 +28,13 @@ from app.application.use_cases.registration import RegistrationService
 from app.application.use_cases.survey_flow import SurveyFlowService
 from app.application.use_cases.shift_management import ShiftService
 from app.application.use_cases.shift_admin import ShiftAdminService
+from app.application.use_cases.instrument_catalog import InstrumentCatalog
 from app.application.use_cases.instrument_transfer import InstrumentTransferService
 from app.application.use_cases.instrument_admin import InstrumentAdminService
 from app.application.use_cases.admin_sync import AdminSyncService
 from app.application.use_cases.reports import ReportsService
 from app.application.use_cases.scheduler import SurveyScheduler
+from app.presentation.keyboard_cache import KeyboardCache
 
 
 class Container:
@@ -28,16 +42,52 @@ class Container:
         self.settings = load_settings()
 
         # Infrastructure
-        self.admin_repo = SqlAlchemyAdminRepository()
-        self.worker_repo = SqlAlchemyWorkerRepository()
+        self.engine = init_engine(self.settings.db)
+        self.cache_backend = create_cache_backend(self.settings.cache)
+        self.fsm_storage = create_fsm_storage(self.settings.fsm)
+        self.fsm_states = StateLifecycle(
+            self.fsm_storage,
+            idle_timeout=self.settings.fsm.idle_timeout,
+            max_states=self.settings.fsm.max_states,
+        )
+        self.send_limiter = SendLimiter(
+            rate=self.settings.bot.send_rate,
+            chat_rate=self.settings.bot.chat_send_rate,
+            group_rate_per_minute=self.settings.bot.group_sends_per_minute,
+            chat_burst=self.settings.bot.chat_send_burst,
+            max_retries=self.settings.bot.send_retries,
+        )
+        self.admin_repo = CachedAdminRepository(
+            SqlAlchemyAdminRepository(),
+            ttl=self.settings.cache.admin_ttl,
+            backend=self.cache_backend,
+        )
+        self.worker_repo = CachedWorkerRepository(
+            SqlAlchemyWorkerRepository(),
+            max_unknown_chat_ids=self.settings.cache.unknown_chat_ids,
+            backend=self.cache_backend,
+        )
         self.pair_repo = SqlAlchemyPairRepository()
-        self.survey_repo = SqlAlchemySurveyRepository()
+        self.survey_outbox_repo = SqlAlchemySurveyOutboxRepository()
+        self.survey_repo = CachedSurveyRepository(
+            SqlAlchemySurveyRepository(), backend=self.cache_backend
+        )
         self.answer_repo = SqlAlchemyAnswerRepository()
-        self.shift_repo = SqlAlchemyShiftRepository()
+        self.shift_repo = CachedShiftRepository(
+            SqlAlchemyShiftRepository(), backend=self.cache_backend
+        )
         self.cabinet_repo = SqlAlchemyCabinetRepository()
         self.instrument_repo = SqlAlchemyInstrumentRepository()
         self.instrument_move_repo = SqlAlchemyInstrumentMoveRepository()
 
+        self.cache_stats = {
+            "admins": self.admin_repo.stats,
+            "workers": self.worker_repo.stats,
+            "unknown_chats": self.worker_repo.unknown_chat_stats,
+            "surveys": self.survey_repo.stats,
+            "shifts": self.shift_repo.stats,
+        }
+
         self.sheets_gateway = SheetsGateway(self.settings.sheets)
 
         # Application layer
@@ -50,15 +100,20 @@ class Container:
         )
         self.shift_service = ShiftService(self.worker_repo, self.shift_repo)
         self.shift_admin = ShiftAdminService(self.worker_repo, self.shift_repo)
+        self.instrument_catalog = InstrumentCatalog(
+            self.cabinet_repo, self.instrument_repo, backend=self.cache_backend
+        )
         self.instrument_transfer = InstrumentTransferService(
             self.cabinet_repo,
             self.instrument_repo,
             self.instrument_move_repo,
+            self.instrument_catalog,
         )
         self.instrument_admin = InstrumentAdminService(
             self.cabinet_repo,
             self.instrument_repo,
             self.instrument_move_repo,
+            self.instrument_catalog,
         )
         self.admin_access = AdminAccessService(
             self.admin_repo,
@@ -79,7 +134,24 @@ class Container:
             self.answer_repo,
             self.shift_repo,
         )
-        self.scheduler = SurveyScheduler(self.survey_flow)
+        self.scheduler = SurveyScheduler(
+            self.survey_flow,
+            self.survey_outbox_repo,
+            concurrency=self.settings.survey.dispatch_concurrency,
+            max_attempts=self.settings.survey.send_attempts,
+            retry_delay=self.settings.survey.retry_delay,
+        )
+
+        # Presentation
+        self.keyboards = KeyboardCache(
+            {
+                "workers": lambda: self.worker_repo.version,
+                "admins": lambda: self.admin_repo.version,
+                "instruments": lambda: self.instrument_catalog.version,
+            }
+        )
+        self.cache_stats["instruments"] = self.instrument_catalog.stats
+        self.cache_stats["keyboards"] = self.keyboards.stats
 
 
 def build_container() -> Container:
@@ -1,7 +1,8 @@
+import datetime as dt
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Worker:
     id: int | None
     full_name: str
@@ -11,25 +12,25 @@ class Worker:
     phone: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AdminUser:
     id: int | None
     chat_id: str
     added_at: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Pair:
     id: int | None
     subject: str
     object: str
     survey: str
     weekday: str
-    date: str
+    date: dt.date
     status: str = "ready"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Survey:
     id: int | None
     speciality: str
@@ -45,14 +46,14 @@ class Survey:
     question5_type: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Answer:
     id: int | None
     subject: str
     object: str
     survey: str
-    survey_date: str
-    completed_at: str
+    survey_date: dt.date
+    completed_at: dt.datetime
     question1: str
     answer1: str
     question2: str
@@ -65,25 +66,25 @@ class Answer:
     answer5: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Shift:
     id: int | None
     assistant_id: int | None
     doctor_name: str
-    date: str
+    date: dt.date
     type: str
     assistant_name: str | None = None
     manual: bool = False
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Cabinet:
     id: int | None
     name: str
     is_active: bool = True
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Instrument:
     id: int | None
     name: str
@@ -91,7 +92,7 @@ class Instrument:
     is_active: bool = True
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class InstrumentMove:
     id: int | None
     instrument_id: int
@@ -100,4 +101,14 @@ class InstrumentMove:
     before_photo_id: str | None
     after_photo_id: str | None
     moved_by_chat_id: str | None
-    moved_at: str
+    moved_at: dt.datetime
+
+
+@dataclass(slots=True, frozen=True)
+class OutboxEntry:
+    id: int | None
+    pair_id: int
+    status: str
+    attempts: int
+    next_attempt_at: dt.datetime
+    last_error: str | None = None
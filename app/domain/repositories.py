@@ -1,4 +1,5 @@
-from typing import Protocol, Sequence
+import datetime as dt
+from typing import AsyncIterator, Iterable, Protocol, Sequence
 
 from app.domain.entities import (
     AdminUser,
@@ -10,6 +11,7 @@ from app.domain.entities import (
     Cabinet,
     Instrument,
     InstrumentMove,
+    OutboxEntry,
 )
 
 
@@ -17,12 +19,14 @@ class AdminRepository(Protocol):
     async def list_all(self) -> Sequence[AdminUser]: ...
     async def get_by_chat_id(self, chat_id: str) -> AdminUser | None: ...
     async def exists(self, chat_id: str) -> bool: ...
+    async def list_chat_ids(self) -> set[str]: ...
     async def add(self, admin: AdminUser) -> bool: ...
     async def delete_by_chat_id(self, chat_id: str) -> bool: ...
 
 
 class WorkerRepository(Protocol):
     async def get_by_fullname(self, full_name: str) -> Worker | None: ...
+    async def get_many_by_fullnames(self, full_names: Iterable[str]) -> dict[str, Worker]: ...
     async def get_by_chat_id(self, chat_id: int) -> Worker | None: ...
     async def get_by_id(self, worker_id: int) -> Worker | None: ...
     async def list_all(self) -> Sequence[Worker]: ...
@@ -30,47 +34,74 @@ class WorkerRepository(Protocol):
     async def add(self, worker: Worker) -> None: ...
     async def set_chat_id(self, worker_id: int, chat_id: str) -> bool: ...
     async def set_file_id(self, worker_id: int, file_id: str) -> None: ...
+    async def upsert_many(self, workers: Sequence[Worker]) -> tuple[int, int]: ...
 
 
 class SurveyRepository(Protocol):
     async def get_by_name(self, name: str) -> Survey | None: ...
+    async def get_by_id(self, survey_id: int) -> Survey | None: ...
+    async def get_many_by_names(self, names: Iterable[str]) -> dict[str, Survey]: ...
+    async def list_all(self) -> Sequence[Survey]: ...
     async def clear_all(self) -> None: ...
     async def add(self, survey: Survey) -> None: ...
+    async def replace_all(self, surveys: Sequence[Survey]) -> None: ...
 
 
 class PairRepository(Protocol):
-    async def list_ready_by_date(self, date: str) -> Sequence[Pair]: ...
+    async def get_by_id(self, pair_id: int) -> Pair | None: ...
+    async def get_many_by_ids(self, pair_ids: Iterable[int]) -> dict[int, Pair]: ...
+    async def list_ready_by_date(self, date: dt.date) -> Sequence[Pair]: ...
     async def next_ready_for_subject(self, subject: str) -> Pair | None: ...
     async def update_status(self, pair_id: int, status: str) -> None: ...
+    async def update_status_many(self, pair_ids: Sequence[int], status: str) -> None: ...
+    async def claim_ready(self, pair_id: int) -> bool: ...
     async def reset_incomplete(self) -> None: ...
     async def add(self, pair: Pair) -> None: ...
     async def clear_all(self) -> None: ...
 
 
+class SurveyOutboxRepository(Protocol):
+    async def enqueue(self, pair_ids: Sequence[int]) -> None: ...
+    async def claim_due(self, limit: int, lease: float) -> list[OutboxEntry]: ...
+    async def mark_done(self, entry_id: int, status: str, error: str | None = None) -> None: ...
+    async def retry_later(self, entry_id: int, error: str, delay: float) -> None: ...
+
+
 class AnswerRepository(Protocol):
     async def save(self, answer: Answer) -> None: ...
-    async def list_all(self) -> Sequence[Answer]: ...
+    def stream_all(self, batch_size: int = 500) -> AsyncIterator[Answer]: ...
+    def stream_between(
+        self,
+        start: dt.date,
+        end: dt.date,
+        objects: Iterable[str] | None = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Answer]: ...
+    def stream_for_object(self, object_name: str, batch_size: int = 500) -> AsyncIterator[Answer]: ...
 
 
 class ShiftRepository(Protocol):
     async def clear_all(self) -> None: ...
-    async def bulk_insert(self, records: list[tuple[str, str, str]]) -> None: ...
-    async def list_free(self, date: str, shift_type: str) -> list[tuple[int, str]]: ...
+    async def bulk_insert(self, records: list[tuple[str, dt.date, str]]) -> None: ...
+    async def list_free(self, date: dt.date, shift_type: str) -> list[tuple[int, str]]: ...
     async def get_by_id(self, shift_id: int) -> Shift | None: ...
-    async def get_for_assistant(self, assistant_id: int, date: str, shift_type: str) -> Shift | None: ...
-    async def remove_assistant(self, assistant_id: int, date: str, shift_type: str) -> None: ...
-    async def add_by_id(self, assistant_id: int, assistant_name: str, shift_id: int) -> bool: ...
-    async def add_manual(self, assistant_id: int, assistant_name: str, doctor_name: str, shift_type: str, date: str) -> bool: ...
-    async def add_slot(self, doctor_name: str, date: str, shift_type: str) -> bool: ...
+    async def get_for_assistant(self, assistant_id: int, date: dt.date, shift_type: str) -> Shift | None: ...
+    async def remove_assistant(self, assistant_id: int, date: dt.date, shift_type: str) -> None: ...
+    async def add_by_id(
+        self, assistant_id: int, assistant_name: str, shift_id: int, date: dt.date, shift_type: str
+    ) -> Shift | None: ...
+    async def add_manual(self, assistant_id: int, assistant_name: str, doctor_name: str, shift_type: str, date: dt.date) -> bool: ...
+    async def add_slot(self, doctor_name: str, date: dt.date, shift_type: str) -> bool: ...
     async def delete_by_id(self, shift_id: int) -> bool: ...
-    async def list_by_date(self, date: str) -> Sequence[Shift]: ...
+    async def list_by_date(self, date: dt.date) -> Sequence[Shift]: ...
+    async def list_assigned_since(self, since: dt.date) -> Sequence[Shift]: ...
     async def list_all(self) -> Sequence[Shift]: ...
 
 
 class CabinetRepository(Protocol):
     async def list_all(self, include_archived: bool = False) -> Sequence[Cabinet]: ...
     async def get_by_id(self, cabinet_id: int) -> Cabinet | None: ...
-    async def add(self, cabinet: Cabinet) -> None: ...
+    async def add(self, cabinet: Cabinet) -> Cabinet: ...
     async def update_name(self, cabinet_id: int, name: str) -> bool: ...
     async def set_active(self, cabinet_id: int, is_active: bool) -> bool: ...
     async def delete(self, cabinet_id: int) -> bool: ...
@@ -81,9 +112,10 @@ class InstrumentRepository(Protocol):
     async def list_by_cabinet(
         self, cabinet_id: int, include_archived: bool = False
     ) -> Sequence[Instrument]: ...
+    async def list_all(self, include_archived: bool = False) -> Sequence[Instrument]: ...
     async def get_by_id(self, instrument_id: int) -> Instrument | None: ...
     async def update_cabinet(self, instrument_id: int, cabinet_id: int) -> bool: ...
-    async def add(self, instrument: Instrument) -> None: ...
+    async def add(self, instrument: Instrument) -> Instrument: ...
     async def update_name(self, instrument_id: int, name: str) -> bool: ...
     async def set_active(self, instrument_id: int, is_active: bool) -> bool: ...
     async def delete(self, instrument_id: int) -> bool: ...
@@ -91,6 +123,7 @@ class InstrumentRepository(Protocol):
 
 class InstrumentMoveRepository(Protocol):
     async def add(self, move: InstrumentMove) -> None: ...
+    async def transfer(self, move: InstrumentMove, sterilization_name: str) -> bool: ...
     async def list_recent(self, limit: int = 20) -> Sequence[InstrumentMove]: ...
     async def get_last_for_instrument(self, instrument_id: int) -> InstrumentMove | None: ...
     async def get_by_id(self, move_id: int) -> InstrumentMove | None: ...
@@ -0,0 +1,26 @@
+from datetime import date, datetime
+
+
+DATE_FORMAT = "%d.%m.%Y"
+DATETIME_FORMAT = "%d.%m.%Y %H:%M:%S"
+
+
+def format_date(value: date | None) -> str:
+    if value is None:
+        return ""
+    return value.strftime(DATE_FORMAT)
+
+
+def format_datetime(value: datetime | None) -> str:
+    if value is None:
+        return ""
+    if value.tzinfo is not None:
+        value = value.astimezone()
+    return value.strftime(DATETIME_FORMAT)
+
+
+def parse_date(value: str) -> date | None:
+    try:
+        return datetime.strptime(value.strip(), DATE_FORMAT).date()
+    except (AttributeError, ValueError):
+        return None
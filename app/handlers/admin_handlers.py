@@ -1,13 +1,20 @@
-﻿from datetime import datetime
+﻿from datetime import date
+from typing import Mapping
 
 from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message
 
 from app.application.use_cases.admin_sync import AdminSyncService
+from app.infrastructure.cache.versioned import CacheStats
+from app.infrastructure.fsm_lifecycle import StateLifecycle
 
 
-def create_admin_router(admin: AdminSyncService) -> Router:
+def create_admin_router(
+    admin: AdminSyncService,
+    cache_stats: Mapping[str, CacheStats],
+    fsm_states: StateLifecycle,
+) -> Router:
     router = Router()
 
     @router.message(Command("upd"))
@@ -19,8 +26,10 @@ def create_admin_router(admin: AdminSyncService) -> Router:
     @router.message(Command("upd_workers"))
     async def update_workers(message: Message):
         msg = await message.answer("Обновляем список сотрудников...")
-        created = await admin.sync_workers()
-        await msg.edit_text(f"Сотрудники обновлены. Добавлено новых: {created}")
+        created, updated = await admin.sync_workers()
+        await msg.edit_text(
+            f"Сотрудники обновлены. Добавлено новых: {created}, обновлено: {updated}"
+        )
 
     @router.message(Command("upd_pairs"))
     async def update_pairs(message: Message):
@@ -49,8 +58,25 @@ def create_admin_router(admin: AdminSyncService) -> Router:
     @router.message(Command("exp_shifts"))
     async def export_shifts(message: Message):
         msg = await message.answer("Готовим выгрузку смен...")
-        today_str = datetime.now().strftime("%d.%m.%Y")
-        await admin.export_shifts(today_str)
+        await admin.export_shifts(date.today())
         await msg.edit_text("Отчёт по сменам обновлён")
 
+    @router.message(Command("metrics"))
+    async def show_metrics(message: Message):
+        lines = ["Кэши (попадания / промахи / сбросы, доля попаданий):"]
+        for name, stats in cache_stats.items():
+            lines.append(
+                f"{name}: {stats.hits} / {stats.misses} / {stats.invalidations}, "
+                f"{stats.hit_ratio:.0%}"
+            )
+        counts = await fsm_states.counts()
+        if counts is None:
+            lines.append("\nДиалоги в процессе: нет данных для этого FSM_STORAGE")
+            counts = {}
+        else:
+            lines.append(f"\nДиалоги в процессе: {sum(counts.values())}")
+        for group, count in sorted(counts.items()):
+            lines.append(f"{group}: {count} (сброшено по простою: {fsm_states.evicted[group]})")
+        await message.answer("\n".join(lines))
+
     return router
\ No newline at end of file
@@ -9,6 +9,7 @@ from app.application.use_cases.admin_access import AdminAccessService
 from app.application.use_cases.instrument_admin import InstrumentAdminService
 from app.domain.entities import Cabinet, Instrument, Worker
 from app.logger import setup_logger
+from app.presentation.keyboard_cache import KeyboardCache
 
 
 logger = setup_logger("admin_panel", "admin_panel.log")
@@ -26,6 +27,7 @@ class InstrumentAdminState(StatesGroup):
 def create_admin_panel_router(
     admin_service: InstrumentAdminService,
     admin_access: AdminAccessService,
+    keyboards: KeyboardCache,
 ) -> Router:
     router = Router()
 
@@ -222,27 +224,59 @@ def create_admin_panel_router(
             return False
         return True
 
-    async def render_cabinet_list(callback: CallbackQuery, view: str):
+    async def list_cabinets_in_view(view: str) -> list[Cabinet]:
         cabinets = await admin_service.list_cabinets(include_archived=True)
         if view == "archived":
-            cabinets = [c for c in cabinets if not c.is_active]
-        else:
-            cabinets = [c for c in cabinets if c.is_active]
+            return [c for c in cabinets if not c.is_active]
+        return [c for c in cabinets if c.is_active]
+
+    async def list_instruments_in_view(cabinet_id: int, view: str) -> list[Instrument]:
+        instruments = await admin_service.list_instruments(
+            cabinet_id, include_archived=True
+        )
+        if view == "archived":
+            return [item for item in instruments if not item.is_active]
+        return [item for item in instruments if item.is_active]
+
+    async def cabinet_list_keyboard(view: str):
+        async def build():
+            return build_cabinet_list_keyboard(await list_cabinets_in_view(view), view=view)
+
+        return await keyboards.get_or_build(
+            "admin_cabinet_list", build, depends_on=("instruments",), view=view
+        )
+
+    async def cabinet_select_keyboard(view: str):
+        async def build():
+            return build_cabinet_select_keyboard(await list_cabinets_in_view(view), view=view)
+
+        return await keyboards.get_or_build(
+            "admin_cabinet_select", build, depends_on=("instruments",), view=view
+        )
+
+    async def instrument_list_keyboard(cabinet_id: int, view: str):
+        async def build():
+            instruments = await list_instruments_in_view(cabinet_id, view)
+            return build_instrument_list_keyboard(instruments, cabinet_id=cabinet_id, view=view)
+
+        return await keyboards.get_or_build(
+            "admin_instrument_list",
+            build,
+            depends_on=("instruments",),
+            view=f"{cabinet_id}:{view}",
+        )
+
+    async def render_cabinet_list(callback: CallbackQuery, view: str):
         text = "🏢 Кабинеты (архив)" if view == "archived" else "🏢 Кабинеты"
         await callback.message.edit_text(
             text,
-            reply_markup=build_cabinet_list_keyboard(cabinets, view=view),
+            reply_markup=await cabinet_list_keyboard(view),
         )
 
     async def render_instrument_cabinets(callback: CallbackQuery, view: str):
-        cabinets = await admin_service.list_cabinets(include_archived=True)
-        if view == "archived":
-            cabinets = [c for c in cabinets if not c.is_active]
-        else:
-            cabinets = [c for c in cabinets if c.is_active]
         await callback.message.edit_text(
             "🏢 Выберите кабинет:",
-            reply_markup=build_cabinet_select_keyboard(cabinets, view=view),
+            reply_markup=await cabinet_select_keyboard(view),
         )
 
     async def render_instrument_list(callback: CallbackQuery, cabinet_id: int, view: str):
@@ -250,21 +284,12 @@ def create_admin_panel_router(
         if not cabinet:
             await callback.answer("⛔ Кабинет не найден", show_alert=True)
             return
-        instruments = await admin_service.list_instruments(
-            cabinet_id, include_archived=True
-        )
-        if view == "archived":
-            instruments = [item for item in instruments if not item.is_active]
-        else:
-            instruments = [item for item in instruments if item.is_active]
         header = f"🧰 Инструменты в кабинете: {cabinet.name}"
         if view == "archived":
             header += " (🗄️ архив)"
         await callback.message.edit_text(
             header,
-            reply_markup=build_instrument_list_keyboard(
-                instruments, cabinet_id=cabinet_id, view=view
-            ),
+            reply_markup=await instrument_list_keyboard(cabinet_id, view),
         )
 
     async def format_admin_entry(chat_id: str) -> str:
@@ -297,23 +322,33 @@ def create_admin_panel_router(
         else:
             await target.answer(text, reply_markup=build_admins_menu())
 
+    async def admin_add_workers_keyboard(page: int):
+        async def build():
+            workers = await admin_access.list_registered_workers()
+            admin_ids = {admin.chat_id for admin in await admin_access.list_admins()}
+            admin_ids.update(admin_access.list_super_admins())
+            available = [worker for worker in workers if worker.chat_id not in admin_ids]
+            if not available:
+                return None
+            available.sort(key=lambda w: (w.full_name or "").strip().casefold())
+            max_page = (len(available) - 1) // PER_PAGE
+            return build_admin_add_workers_keyboard(available, max(0, min(page, max_page)))
+
+        return await keyboards.get_or_build(
+            "admin_add_workers", build, depends_on=("workers", "admins"), page=page
+        )
+
     async def render_admin_add_workers(callback: CallbackQuery, page: int):
-        workers = await admin_access.list_registered_workers()
-        admin_ids = {admin.chat_id for admin in await admin_access.list_admins()}
-        admin_ids.update(admin_access.list_super_admins())
-        available = [worker for worker in workers if worker.chat_id not in admin_ids]
-        available.sort(key=lambda w: (w.full_name or "").strip().casefold())
-        if not available:
+        markup = await admin_add_workers_keyboard(page)
+        if markup is None:
             await callback.message.edit_text(
                 "ℹ️ Нет доступных сотрудников для добавления.",
                 reply_markup=build_admin_add_menu(),
             )
             return
-        max_page = (len(available) - 1) // PER_PAGE
-        page = max(0, min(page, max_page))
         await callback.message.edit_text(
             "👤 Выберите сотрудника для добавления в админы:",
-            reply_markup=build_admin_add_workers_keyboard(available, page),
+            reply_markup=markup,
         )
 
 
@@ -659,16 +694,10 @@ def create_admin_panel_router(
             return
         await admin_service.add_instrument(cabinet_id, name)
         await state.clear()
-        instruments = await admin_service.list_instruments(
-            cabinet_id, include_archived=True
-        )
-        instruments = [item for item in instruments if item.is_active]
         await message.answer("✅ Инструмент добавлен.")
         await message.answer(
             "🧰 Инструменты:",
-            reply_markup=build_instrument_list_keyboard(
-                instruments, cabinet_id=cabinet_id, view="active"
-            ),
+            reply_markup=await instrument_list_keyboard(cabinet_id, "active"),
         )
 
     @router.callback_query(F.data.startswith("instrument_rename:"))
@@ -704,18 +733,9 @@ def create_admin_panel_router(
         await admin_service.rename_instrument(instrument_id, name)
         await state.clear()
         await message.answer("✅ Название обновлено.")
-        instruments = await admin_service.list_instruments(
-            cabinet_id, include_archived=True
-        )
-        if view == "archived":
-            instruments = [item for item in instruments if not item.is_active]
-        else:
-            instruments = [item for item in instruments if item.is_active]
         await message.answer(
             "🧰 Инструменты:",
-            reply_markup=build_instrument_list_keyboard(
-                instruments, cabinet_id=cabinet_id, view=view
-            ),
+            reply_markup=await instrument_list_keyboard(cabinet_id, view),
         )
 
     @router.callback_query(F.data.startswith("instrument_archive:"))
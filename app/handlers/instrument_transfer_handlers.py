@@ -7,6 +7,7 @@ from aiogram.types import Message, CallbackQuery
 from app.application.use_cases.instrument_transfer import InstrumentTransferService
 import app.keyboards as kb
 from app.logger import setup_logger
+from app.presentation.keyboard_cache import KeyboardCache
 
 
 logger = setup_logger("instrument_transfer", "instrument_transfer.log")
@@ -20,20 +21,43 @@ class InstrumentTransferState(StatesGroup):
 
 def create_instrument_transfer_router(
     transfer_service: InstrumentTransferService,
+    keyboards: KeyboardCache,
 ) -> Router:
     router = Router()
 
+    async def source_cabinets_keyboard():
+        async def build():
+            cabinets = await transfer_service.list_cabinets()
+            if not cabinets:
+                return None
+            return kb.build_cabinet_keyboard(cabinets, prefix="src_cabinet")
+
+        return await keyboards.get_or_build(
+            "transfer_source_cabinets", build, depends_on=("instruments",)
+        )
+
+    async def instruments_keyboard(cabinet_id: int):
+        async def build():
+            instruments = await transfer_service.list_instruments(cabinet_id)
+            if not instruments:
+                return None
+            return kb.build_instrument_keyboard(instruments)
+
+        return await keyboards.get_or_build(
+            "transfer_instruments", build, depends_on=("instruments",), view=str(cabinet_id)
+        )
+
     @router.message(Command("move_instrument"))
     async def start_transfer(message: Message, state: FSMContext):
         await state.clear()
-        cabinets = await transfer_service.list_cabinets()
-        if not cabinets:
+        markup = await source_cabinets_keyboard()
+        if markup is None:
             await message.answer("Список кабинетов пуст. Обратитесь к администратору.")
             return
 
         await message.answer(
             "Выберите кабинет, в котором сейчас находится инструмент:",
-            reply_markup=kb.build_cabinet_keyboard(cabinets, prefix="src_cabinet"),
+            reply_markup=markup,
         )
 
     @router.callback_query(F.data.startswith("src_cabinet:"))
@@ -48,12 +72,11 @@ def create_instrument_transfer_router(
             await callback.answer("Кабинет не найден", show_alert=True)
             return
 
-        instruments = await transfer_service.list_instruments(cabinet_id)
-        if not instruments:
-            cabinets = await transfer_service.list_cabinets()
+        markup = await instruments_keyboard(cabinet_id)
+        if markup is None:
             await callback.message.edit_text(
                 f"В кабинете «{cabinet.name}» нет инструментов. Выберите другой кабинет:",
-                reply_markup=kb.build_cabinet_keyboard(cabinets, prefix="src_cabinet"),
+                reply_markup=await source_cabinets_keyboard(),
             )
             await callback.answer()
             return
@@ -64,7 +87,7 @@ def create_instrument_transfer_router(
         )
         await callback.message.edit_text(
             f"Кабинет: {cabinet.name}\nВыберите инструмент:",
-            reply_markup=kb.build_instrument_keyboard(instruments),
+            reply_markup=markup,
         )
         await callback.answer()
 
@@ -5,6 +5,7 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from app.application.use_cases.instrument_admin import InstrumentAdminService
 from app.domain.entities import InstrumentMove
+from app.formatting import format_datetime
 from app.logger import setup_logger
 
 
@@ -32,15 +33,8 @@ def create_moves_router(moves_service: InstrumentAdminService) -> Router:
 
     async def render_moves(target: Message | CallbackQuery):
         moves = await moves_service.list_recent_moves(limit=10)
-        cabinets = await moves_service.list_cabinets(include_archived=True)
-        cabinet_map = {c.id: c.name for c in cabinets}
-
-        instruments = []
-        for cabinet in cabinets:
-            instruments.extend(
-                await moves_service.list_instruments(cabinet.id, include_archived=True)
-            )
-        instrument_map = {i.id: i.name for i in instruments}
+        cabinet_map = await moves_service.cabinet_names()
+        instrument_map = await moves_service.instrument_names()
 
         if not moves:
             text = "📦 Перемещений пока нет."
@@ -51,7 +45,7 @@ def create_moves_router(moves_service: InstrumentAdminService) -> Router:
                 from_name = cabinet_map.get(move.from_cabinet_id, f"#{move.from_cabinet_id}")
                 to_name = cabinet_map.get(move.to_cabinet_id, f"#{move.to_cabinet_id}")
                 blocks.append(
-                    f"#{move.id} 🕒 {move.moved_at} — {inst_name}\n"
+                    f"#{move.id} 🕒 {format_datetime(move.moved_at)} — {inst_name}\n"
                     f"{from_name} ➡️ {to_name}"
                 )
             text = "📦 Последние перемещения:\n" + "\n\n".join(blocks)
@@ -6,6 +6,7 @@ from app.application.use_cases.admin_access import AdminAccessService
 from app.application.use_cases.shift_admin import ShiftAdminService
 from app.domain.entities import Shift, Worker
 from app.logger import setup_logger
+from app.presentation.keyboard_cache import KeyboardCache
 
 
 logger = setup_logger("shift_admin", "shift_admin.log")
@@ -16,6 +17,7 @@ PER_PAGE = 10
 def create_shift_admin_router(
     shift_admin: ShiftAdminService,
     admin_access: AdminAccessService,
+    keyboards: KeyboardCache,
 ) -> Router:
     router = Router()
 
@@ -88,6 +90,18 @@ def create_shift_admin_router(
         builder.row(*back_builder.buttons)
         return builder.as_markup()
 
+    async def doctors_keyboard(shift_type: str, page: int):
+        async def build():
+            workers = await shift_admin.list_workers()
+            if not workers:
+                return None
+            workers.sort(key=lambda w: w.full_name)
+            return build_doctors_keyboard(workers, shift_type, page)
+
+        return await keyboards.get_or_build(
+            "admin_shift_doctors", build, depends_on=("workers",), page=page, view=shift_type
+        )
+
     def build_delete_confirm_keyboard(shift_id: int):
         builder = InlineKeyboardBuilder()
         builder.button(
@@ -147,18 +161,14 @@ def create_shift_admin_router(
         if not await require_admin(callback):
             return
         _, shift_type = callback.data.split(":", 1)
-        workers = await shift_admin.list_workers()
-        if not workers:
+        markup = await doctors_keyboard(shift_type, page=0)
+        if markup is None:
             await callback.message.edit_text(
                 "⚠️ Список сотрудников пуст.", reply_markup=build_create_type_keyboard()
             )
             await callback.answer()
             return
-        workers.sort(key=lambda w: w.full_name)
-        await callback.message.edit_text(
-            "👩‍⚕️ Выберите доктора:",
-            reply_markup=build_doctors_keyboard(workers, shift_type, page=0),
-        )
+        await callback.message.edit_text("👩‍⚕️ Выберите доктора:", reply_markup=markup)
         await callback.answer()
 
     @router.callback_query(F.data.startswith("admin_shift_doctors:"))
@@ -166,12 +176,8 @@ def create_shift_admin_router(
         if not await require_admin(callback):
             return
         _, shift_type, page_str = callback.data.split(":")
-        workers = await shift_admin.list_workers()
-        workers.sort(key=lambda w: w.full_name)
         await callback.message.edit_reply_markup(
-            reply_markup=build_doctors_keyboard(
-                workers, shift_type, page=int(page_str)
-            )
+            reply_markup=await doctors_keyboard(shift_type, page=int(page_str))
         )
         await callback.answer()
 
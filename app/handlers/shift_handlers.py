@@ -13,13 +13,23 @@ from app.keyboards import (
     SelectDoctor,
 )
 from app.logger import setup_logger
+from app.presentation.keyboard_cache import KeyboardCache
 
 logger = setup_logger("shift", "shift.log")
 
 
-def create_shift_router(shift_service: ShiftService) -> Router:
+def create_shift_router(shift_service: ShiftService, keyboards: KeyboardCache) -> Router:
     router = Router()
 
+    async def doctors_keyboard(page: int):
+        async def build():
+            workers = await shift_service.list_all_doctors()
+            return build_all_doctors_keyboard(workers, page=page)
+
+        return await keyboards.get_or_build(
+            "all_doctors", build, depends_on=("workers",), page=page
+        )
+
     @router.message(Command("shift"))
     async def show_doctors(message: Message):
         now = datetime.now()
@@ -28,13 +38,13 @@ def create_shift_router(shift_service: ShiftService) -> Router:
             await message.answer("Записываться на смену можно с 08:00 до 20:00")
             return
 
-        date_str = now.strftime("%d.%m.%Y")
+        today = now.date()
         worker = await shift_service.get_worker(message.from_user.id)
         if not worker:
             await message.answer("Мы не нашли вас в базе, сначала зарегистрируйтесь")
             return
 
-        current_shift = await shift_service.get_current_shift(worker.id, date_str, shift_type)
+        current_shift = await shift_service.get_current_shift(worker.id, today, shift_type)
         if current_shift:
             await message.answer(
                 f"У вас уже есть смена с {current_shift.doctor_name}",
@@ -42,7 +52,7 @@ def create_shift_router(shift_service: ShiftService) -> Router:
             )
             return
 
-        free_shifts = await shift_service.list_free_shifts(date_str, shift_type)
+        free_shifts = await shift_service.list_free_shifts(today, shift_type)
         if not free_shifts:
             await message.answer("Свободных смен не осталось")
             return
@@ -67,25 +77,22 @@ def create_shift_router(shift_service: ShiftService) -> Router:
             await callback.answer("Мы не нашли вас в базе", show_alert=True)
             return
 
-        date_str = now.strftime("%d.%m.%Y")
-        shift = await shift_service.get_shift_by_id(shift_id)
-        if not shift or shift.date != date_str or shift.type != shift_type:
-            await callback.answer("Эта смена недоступна", show_alert=True)
-            return
-
-        success = await shift_service.add_shift_by_id(
+        shift = await shift_service.add_shift_by_id(
             worker.id,
             worker.full_name,
             shift_id,
+            now.date(),
+            shift_type,
         )
-        if success:
+        if shift:
             readable = "Утренняя" if shift_type == "morning" else "Вечерняя"
             await callback.message.edit_text(
                 f"Готово ✔ {readable} смена у {shift.doctor_name} закреплена за вами"
             )
         else:
             await callback.message.edit_text(
-                "Не удалось записаться на смену. Скорее всего, её уже заняли."
+                "Не удалось записаться на смену. Скорее всего, её уже заняли "
+                "или она не на текущую смену."
             )
         await callback.answer()
 
@@ -93,16 +100,16 @@ def create_shift_router(shift_service: ShiftService) -> Router:
     async def cancel_shift(callback: CallbackQuery):
         shift_type = callback.data.split(":", 1)[1]
         now = datetime.now()
-        date_str = now.strftime("%d.%m.%Y")
+        today = now.date()
         worker = await shift_service.get_worker(callback.from_user.id)
         if worker:
-            await shift_service.remove_shift(worker.id, date_str, shift_type)
+            await shift_service.remove_shift(worker.id, today, shift_type)
             await callback.message.edit_text("Смена отменена")
         await callback.answer()
 
     @router.message(Command("shift_any"))
     async def manual_shift(message: Message):
-        shift_type, date_str = shift_service.guess_shift_type_from_now()
+        shift_type, today = shift_service.guess_shift_type_from_now()
         if not shift_type:
             await message.answer("Записываться на смену можно с 08:00 до 20:00")
             return
@@ -112,7 +119,7 @@ def create_shift_router(shift_service: ShiftService) -> Router:
             await message.answer("Мы не нашли вас в базе, сначала зарегистрируйтесь")
             return
 
-        current_shift = await shift_service.get_current_shift(worker.id, date_str, shift_type)
+        current_shift = await shift_service.get_current_shift(worker.id, today, shift_type)
         if current_shift:
             await message.answer(
                 f"У вас уже есть смена с {current_shift.doctor_name}",
@@ -120,23 +127,21 @@ def create_shift_router(shift_service: ShiftService) -> Router:
             )
             return
 
-        workers = await shift_service.list_all_doctors()
         await message.answer(
             "Выберите доктора:",
-            reply_markup=build_all_doctors_keyboard(workers, page=0),
+            reply_markup=await doctors_keyboard(page=0),
         )
 
     @router.callback_query(DoctorsPage.filter())
     async def doctors_paginate(cb: CallbackQuery, callback_data: DoctorsPage):
-        workers = await shift_service.list_all_doctors()
         await cb.message.edit_reply_markup(
-            reply_markup=build_all_doctors_keyboard(workers, page=callback_data.page)
+            reply_markup=await doctors_keyboard(page=callback_data.page)
         )
         await cb.answer()
 
     @router.callback_query(SelectDoctor.filter())
     async def doctor_selected(cb: CallbackQuery, callback_data: SelectDoctor):
-        shift_type, date_str = shift_service.guess_shift_type_from_now()
+        shift_type, today = shift_service.guess_shift_type_from_now()
         if not shift_type:
             await cb.answer("Записываться на смену можно с 08:00 до 20:00", show_alert=True)
             return
@@ -156,7 +161,7 @@ def create_shift_router(shift_service: ShiftService) -> Router:
             worker.full_name,
             doctor.full_name,
             shift_type,
-            date_str,
+            today,
         )
 
         if success:
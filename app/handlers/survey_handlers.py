@@ -7,7 +7,9 @@ from aiogram.fsm.state import State, StatesGroup
 from aiogram.filters import StateFilter
 
 from app.application.use_cases.survey_flow import SurveyFlowService
-from app.domain.entities import Pair
+from app.domain.entities import Pair, Survey
+from app.formatting import format_date
+from app.infrastructure.db.unit_of_work import savepoint
 from app.keyboards import build_int_keyboard
 from app.logger import setup_logger
 
@@ -26,9 +28,10 @@ async def start_pair_survey(
     state: FSMContext | None = None,
     dp: Dispatcher | None = None,
     file_id: str | None = None,
+    survey: Survey | None = None,
 ) -> None:
     intro = (
-        f"{pair.date} с вами работает: {pair.object}.\n"
+        f"{format_date(pair.date)} с вами работает: {pair.object}.\n"
         f"Пожалуйста, оцените коллегу: {pair.survey}"
     )
     if file_id:
@@ -39,20 +42,33 @@ async def start_pair_survey(
     if state is None:
         state = dp.fsm.get_context(bot, chat_id, chat_id)
 
-    survey = await survey_service.get_survey(pair.survey)
-    await state.update_data(survey=survey, pair=pair, answers=[])
+    # Only identifiers go into the FSM storage; the survey is looked up in
+    # the survey cache on every question.
+    if survey is None:
+        survey = await survey_service.get_survey(pair.survey)
+    await state.update_data(pair_id=pair.id, survey_id=survey.id, answers=[])
 
     await ask_next_question(
         bot=bot,
         user_id=chat_id,
         question_index=1,
         state=state,
+        survey_service=survey_service,
+        survey=survey,
     )
 
 
-async def ask_next_question(bot, user_id: int, question_index: int, state: FSMContext) -> None:
-    data = await state.get_data()
-    survey = data.get("survey")
+async def ask_next_question(
+    bot,
+    user_id: int,
+    question_index: int,
+    state: FSMContext,
+    survey_service: SurveyFlowService,
+    survey: Survey | None = None,
+) -> None:
+    if survey is None:
+        data = await state.get_data()
+        survey = await survey_service.get_survey_by_id(data.get("survey_id"))
 
     q_text = getattr(survey, f"question{question_index}")
     q_type = getattr(survey, f"question{question_index}_type")
@@ -80,8 +96,9 @@ def create_survey_router(survey_service: SurveyFlowService) -> Router:
             return
 
         data = await state.get_data()
-        answers: list = data.get("answers")
-        if idx > 1 and len(answers) == 0:
+        answers: list | None = data.get("answers")
+        # Expired sessions come back from the FSM storage empty.
+        if answers is None or (idx > 1 and len(answers) == 0):
             await callback.message.edit_text(text="Время для ответа истекло", reply_markup=None)
             return
 
@@ -90,13 +107,10 @@ def create_survey_router(survey_service: SurveyFlowService) -> Router:
 
         await callback.answer(f"Вы выбрали: {rate}")
 
-        pair = data.get("pair")
-        subject = pair.subject
-
         user = callback.from_user
         logger.info(
-            "User %s (id=%s, username=%s) answered via callback_data='%s'",
-            subject,
+            "Pair %s: user id=%s, username=%s answered via callback_data='%s'",
+            data.get("pair_id"),
             user.id,
             user.username,
             callback.data,
@@ -108,7 +122,11 @@ def create_survey_router(survey_service: SurveyFlowService) -> Router:
         await callback.message.edit_text(text=text, reply_markup=None)
 
         await ask_next_question(
-            bot=callback.bot, user_id=callback.from_user.id, question_index=idx + 1, state=state
+            bot=callback.bot,
+            user_id=callback.from_user.id,
+            question_index=idx + 1,
+            state=state,
+            survey_service=survey_service,
         )
 
     @router.message(StateFilter(SurveyState.answers))
@@ -120,44 +138,51 @@ def create_survey_router(survey_service: SurveyFlowService) -> Router:
 
         idx = len(answers)
 
-        pair: Pair = data.get("pair")
-        subject: str = pair.subject
+        pair_id: int = data.get("pair_id")
         user = message.from_user
         logger.info(
-            "User %s (id=%s, username=%s) answered '%s' to question %s. pair id: %s",
-            subject,
+            "User id=%s, username=%s answered '%s' to question %s. pair id: %s",
             user.id,
             user.username,
             message.text,
             idx,
-            pair.id,
+            pair_id,
         )
 
         if idx < 5:
             await ask_next_question(
-                bot=message.bot, user_id=message.from_user.id, question_index=idx + 1, state=state
+                bot=message.bot,
+                user_id=message.from_user.id,
+                question_index=idx + 1,
+                state=state,
+                survey_service=survey_service,
             )
         else:
-            survey = data.get("survey")
+            pair = await survey_service.get_pair(pair_id)
+            survey = await survey_service.get_survey_by_id(data.get("survey_id"))
             try:
-                await survey_service.save_answers(pair, survey, data.get("answers"))
-                await survey_service.mark_pair_status(pair.id, "done")
+                # A failed write must not abort the update's transaction:
+                # the state and the next pair below still use it.
+                async with savepoint():
+                    await survey_service.save_answers(pair, survey, data.get("answers"))
+                    await survey_service.mark_pair_status(pair_id, "done")
             except Exception as exc:
-                logger.error("Failed to save answers for pair %s: %s", pair.id, exc)
+                logger.error("Failed to save answers for pair %s: %s", pair_id, exc)
 
             await state.clear()
 
-            next_pair = await survey_service.get_next_ready_pair(pair.subject)
-            if next_pair:
-                await survey_service.mark_pair_status(next_pair.id, "in_progress")
-                file_id = await survey_service.get_worker_file_id(next_pair.object)
+            if pair is None:
+                return
+
+            next_up = await survey_service.take_next_pair(pair.subject)
+            if next_up:
                 await start_pair_survey(
                     message.bot,
                     message.from_user.id,
-                    next_pair,
+                    next_up.pair,
                     survey_service,
                     state=state,
-                    file_id=file_id,
+                    file_id=next_up.file_id,
                 )
             else:
                 await message.answer("Спасибо! На сегодня опросы закончились.")
@@ -0,0 +1 @@
+# Cache backends package marker.
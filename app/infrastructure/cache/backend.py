@@ -0,0 +1,94 @@
+import asyncio
+from typing import Callable, Protocol
+
+from app.config import CacheSettings
+from app.infrastructure.db.unit_of_work import current_unit_of_work
+from app.logger import setup_logger
+
+
+logger = setup_logger("cache", "cache.log")
+
+# Passed to invalidation callbacks when messages may have been missed.
+ALL_NAMESPACES = "*"
+
+
+class CacheBackend(Protocol):
+    """Invalidation messages between bot replicas; backends store no values.
+
+    Every cache in the bot (workers, surveys, admins, the free-shift board,
+    the instrument catalog) is small, read on nearly every update and kept
+    as ready entities, so it lives in the process that uses it: a hit costs
+    no round trip and no decoding, which a shared key/value store would
+    add back. Each cache bounds itself (the unknown-chat-id LRU, the admin
+    TTL, whole-table reloads). What replicas must share is only which
+    namespace changed, and that is all a backend carries.
+    """
+
+    async def start(self) -> None: ...
+    async def close(self) -> None: ...
+    async def invalidate(self, namespace: str) -> None:
+        """Tell the other replicas that ``namespace`` changed."""
+        ...
+    def subscribe(self, namespace: str, callback: Callable[[], None]) -> None:
+        """Run ``callback`` when another replica invalidates ``namespace``."""
+        ...
+
+
+class ReplicaInvalidation:
+    """Keeps one in-process cache coherent across bot replicas.
+
+    ``drop`` runs whenever another replica writes to the namespace;
+    ``announce`` tells the others about a local write once it is committed.
+    Without a backend both are no-ops.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | None,
+        namespace: str,
+        drop: Callable[[], None],
+    ):
+        self.backend = backend
+        self.namespace = namespace
+        if backend is not None:
+            backend.subscribe(namespace, drop)
+        self._pending: set[asyncio.Task] = set()
+
+    def announce(self) -> None:
+        if self.backend is None:
+            return
+        uow = current_unit_of_work()
+        if uow is not None:
+            uow.call_on_commit(self._publish_later)
+            return
+        # Outside a unit the repository has already committed.
+        self._spawn_publish()
+
+    async def _publish_later(self) -> None:
+        # Units commit before every reply; a slow backend must not hold it.
+        self._spawn_publish()
+
+    def _spawn_publish(self) -> None:
+        task = asyncio.get_running_loop().create_task(self._publish())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _publish(self) -> None:
+        try:
+            await self.backend.invalidate(self.namespace)
+        except Exception:
+            # The write is committed; a lost message only delays the others
+            # until their own reload.
+            logger.exception("Failed to announce %s invalidation", self.namespace)
+
+
+def create_cache_backend(settings: CacheSettings) -> CacheBackend:
+    if settings.backend == "memory":
+        from app.infrastructure.cache.memory import InMemoryCacheBackend
+
+        return InMemoryCacheBackend()
+    if settings.backend == "redis":
+        from app.infrastructure.cache.redis_backend import RedisCacheBackend
+
+        return RedisCacheBackend(settings.redis_url, timeout=settings.redis_timeout)
+    raise ValueError(f"Unknown CACHE_BACKEND: {settings.backend!r}")
@@ -0,0 +1,22 @@
+from typing import Callable
+
+
+class InMemoryCacheBackend:
+    """Backend for a single replica: there is nobody to notify.
+
+    The in-process caching is done by the caches themselves (see
+    ``CacheBackend``); ``invalidate`` does nothing and subscribers are never
+    called.
+    """
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def invalidate(self, namespace: str) -> None:
+        pass
+
+    def subscribe(self, namespace: str, callback: Callable[[], None]) -> None:
+        pass
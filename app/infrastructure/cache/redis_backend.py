@@ -0,0 +1,115 @@
+import asyncio
+import uuid
+from collections import defaultdict
+from typing import Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.infrastructure.cache.backend import ALL_NAMESPACES
+from app.logger import setup_logger
+
+
+logger = setup_logger("cache", "cache.log")
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+MAX_RECONNECT_DELAY = 30.0
+HEALTH_CHECK_INTERVAL = 30
+
+
+class RedisCacheBackend:
+    """Invalidation messages through any server speaking the Redis protocol.
+
+    Nothing is stored on the server. Invalidations are published on
+    ``INVALIDATION_CHANNEL`` as ``"<sender>:<namespace>"``; every replica
+    but the sender runs the namespace's subscribers. After the subscription
+    is lost, all subscribers run, since messages may have been missed
+    meanwhile.
+
+    Publishing gives up after ``timeout`` seconds, and a failed publish is
+    logged and dropped by ``ReplicaInvalidation``, so a hung server never
+    stalls a commit. The subscription has its own connection without a read
+    timeout (it is idle between messages) and is health-checked instead.
+    """
+
+    def __init__(self, url: str, channel: str = INVALIDATION_CHANNEL, timeout: float = 1.0):
+        self.url = url
+        self.channel = channel
+        self.instance_id = uuid.uuid4().hex
+        self._redis = Redis.from_url(
+            url,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+            health_check_interval=HEALTH_CHECK_INTERVAL,
+        )
+        self._pubsub_redis = Redis.from_url(
+            url,
+            socket_connect_timeout=timeout,
+            health_check_interval=HEALTH_CHECK_INTERVAL,
+        )
+        self._subscribers: dict[str, list[Callable[[], None]]] = defaultdict(list)
+        self._listener: asyncio.Task | None = None
+        self._subscribed = asyncio.Event()
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+            await self._subscribed.wait()
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self._redis.aclose()
+        await self._pubsub_redis.aclose()
+
+    async def invalidate(self, namespace: str) -> None:
+        await self._redis.publish(self.channel, f"{self.instance_id}:{namespace}")
+
+    def subscribe(self, namespace: str, callback: Callable[[], None]) -> None:
+        self._subscribers[namespace].append(callback)
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        reconnect = False
+        while True:
+            try:
+                async with self._pubsub_redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self._subscribed.set()
+                    if reconnect:
+                        self._notify(ALL_NAMESPACES)
+                    delay = 1.0
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._receive(message["data"].decode())
+                reconnect = True
+            except (RedisError, OSError) as exc:
+                logger.warning(
+                    "Cache invalidation channel lost (%s), retrying in %.0fs", exc, delay
+                )
+                # Let start() return; local caches still work meanwhile.
+                self._subscribed.set()
+                reconnect = True
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _receive(self, message: str) -> None:
+        sender, _, namespace = message.partition(":")
+        if sender != self.instance_id:
+            self._notify(namespace)
+
+    def _notify(self, namespace: str) -> None:
+        if namespace == ALL_NAMESPACES:
+            callbacks = [callback for group in self._subscribers.values() for callback in group]
+        else:
+            callbacks = self._subscribers.get(namespace, [])
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Cache invalidation callback for %s failed", namespace)
@@ -0,0 +1,100 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+from app.infrastructure.cache.backend import CacheBackend, ReplicaInvalidation
+from app.infrastructure.db.unit_of_work import current_unit_of_work
+
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class VersionedCache:
+    """Write and load bookkeeping shared by the in-process caches.
+
+    Every write bumps ``version``; a load that started before the bump is
+    returned to its caller but not kept. Misses load under one lock, so a
+    cold cache costs one query however many updates arrive at once. If the
+    unit of work that wrote is rolled back, the cache is dropped again, and
+    once it commits the other replicas are told to drop theirs.
+
+    Subclasses call ``_init_versioned`` from ``__init__`` and implement
+    ``_clear``, which forgets the cached values.
+    """
+
+    stats: CacheStats
+    _version: int
+    _lock: asyncio.Lock
+    _replicas: ReplicaInvalidation
+
+    def _init_versioned(
+        self,
+        backend: CacheBackend | None,
+        namespace: str,
+        drop_remote: Callable[[], None] | None = None,
+    ) -> None:
+        self.stats = CacheStats()
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self._replicas = ReplicaInvalidation(backend, namespace, drop_remote or self._drop)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        self._clear()
+        self._written()
+
+    def _clear(self) -> None:
+        raise NotImplementedError
+
+    def _drop(self) -> None:
+        self._clear()
+        self._version += 1
+
+    def _written(self) -> None:
+        """Record a local write; the caller patches or clears the values."""
+        # A load still in flight may predate this write; it must not be kept.
+        self._version += 1
+        self.stats.invalidations += 1
+        uow = current_unit_of_work()
+        if uow is not None:
+            # A reload inside the unit sees its uncommitted writes; drop that
+            # copy again if they are rolled back.
+            uow.call_on_rollback(self._drop)
+        self._replicas.announce()
+
+    async def _load_once(
+        self,
+        cached: Callable[[], T | None],
+        load: Callable[[], Awaitable[T]],
+        keep: Callable[[T], None],
+    ) -> T:
+        """Load on a miss unless a concurrent miss already did.
+
+        ``cached`` returns the current value or ``None``; ``keep`` stores a
+        fresh one and is skipped if a write happened during ``load``.
+        """
+        self.stats.misses += 1
+        async with self._lock:
+            value = cached()
+            if value is not None:
+                return value
+            version = self._version
+            value = await load()
+            if version == self._version:
+                keep(value)
+            return value
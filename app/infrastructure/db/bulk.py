@@ -0,0 +1,49 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.logger import setup_logger
+
+
+logger = setup_logger("db_bulk", "db.log")
+
+
+def supports_copy(conn: AsyncConnection) -> bool:
+    return conn.dialect.driver == "asyncpg"
+
+
+async def copy_records(
+    conn: AsyncConnection,
+    table: Table,
+    columns: Sequence[str],
+    records: Sequence[tuple],
+) -> None:
+    # The asyncpg adapter only sends BEGIN with the first statement; run one so
+    # COPY joins the surrounding transaction instead of autocommitting.
+    await conn.exec_driver_sql("SELECT 1")
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        table.name,
+        records=records,
+        columns=list(columns),
+        schema_name=table.schema,
+    )
+
+
+@contextmanager
+def report_throughput(table: str, method: str, rows: int) -> Iterator[None]:
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed > 0 else float(rows)
+    logger.info(
+        "Bulk load %s via %s: %s rows in %.3fs (%.0f rows/s)",
+        table,
+        method,
+        rows,
+        elapsed,
+        rate,
+    )
@@ -0,0 +1,469 @@
+import datetime as dt
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from app.domain.entities import AdminUser, Shift, Survey, Worker
+from app.domain.repositories import (
+    AdminRepository,
+    ShiftRepository,
+    SurveyRepository,
+    WorkerRepository,
+)
+from app.infrastructure.cache.backend import CacheBackend
+from app.infrastructure.cache.versioned import CacheStats, VersionedCache
+from app.logger import setup_logger
+
+
+logger = setup_logger("cache", "cache.log")
+
+
+@dataclass(slots=True, frozen=True)
+class _WorkerDirectory:
+    workers: tuple[Worker, ...]
+    by_id: dict[int, Worker]
+    by_chat_id: dict[str, Worker]
+    by_full_name: dict[str, Worker]
+
+    @classmethod
+    def build(cls, workers: Sequence[Worker]) -> "_WorkerDirectory":
+        return cls(
+            workers=tuple(workers),
+            by_id={worker.id: worker for worker in workers},
+            by_chat_id={worker.chat_id: worker for worker in workers if worker.chat_id},
+            by_full_name={worker.full_name: worker for worker in workers},
+        )
+
+
+class CachedWorkerRepository(VersionedCache, WorkerRepository):
+    """Serves worker lookups from an in-process copy of the whole table.
+
+    The table is small and changes only through the write methods below, so
+    the copy is loaded with one query and dropped on every write; the next
+    read reloads it.
+
+    Chat ids that matched no worker are also remembered in a bounded LRU, so
+    unregistered users pressing buttons are rejected without reloading the
+    table after a write. ``set_chat_id`` forgets the id it registers; ``add``
+    and ``upsert_many`` may fill chat ids too and forget them all.
+    """
+
+    def __init__(
+        self,
+        inner: WorkerRepository,
+        max_unknown_chat_ids: int = 1024,
+        backend: CacheBackend | None = None,
+    ):
+        self.inner = inner
+        self.max_unknown_chat_ids = max_unknown_chat_ids
+        self.unknown_chat_stats = CacheStats()
+        self._directory: _WorkerDirectory | None = None
+        self._unknown_chat_ids: OrderedDict[str, None] = OrderedDict()
+        self._init_versioned(backend, "workers", self._drop_remote)
+
+    async def get_by_fullname(self, full_name: str) -> Worker | None:
+        return (await self._load()).by_full_name.get(full_name)
+
+    async def get_many_by_fullnames(self, full_names: Iterable[str]) -> dict[str, Worker]:
+        by_full_name = (await self._load()).by_full_name
+        return {name: by_full_name[name] for name in set(full_names) if name in by_full_name}
+
+    async def get_by_chat_id(self, chat_id: int) -> Worker | None:
+        key = str(chat_id)
+        if key in self._unknown_chat_ids:
+            self._unknown_chat_ids.move_to_end(key)
+            self.unknown_chat_stats.hits += 1
+            return None
+
+        version = self._version
+        worker = (await self._load()).by_chat_id.get(key)
+        # A registration that landed during the lookup must not be shadowed.
+        if worker is None and version == self._version:
+            self._remember_unknown(key)
+        return worker
+
+    async def get_by_id(self, worker_id: int) -> Worker | None:
+        return (await self._load()).by_id.get(worker_id)
+
+    async def list_all(self) -> Sequence[Worker]:
+        return list((await self._load()).workers)
+
+    async def list_unregistered(self) -> Sequence[Worker]:
+        return [worker for worker in (await self._load()).workers if not worker.chat_id]
+
+    async def add(self, worker: Worker) -> None:
+        try:
+            await self.inner.add(worker)
+        finally:
+            self.invalidate()
+            self._forget_unknown()
+
+    async def set_chat_id(self, worker_id: int, chat_id: str) -> bool:
+        try:
+            updated = await self.inner.set_chat_id(worker_id, chat_id)
+        finally:
+            self.invalidate()
+        if updated:
+            self._forget_unknown(str(chat_id))
+        return updated
+
+    async def set_file_id(self, worker_id: int, file_id: str) -> None:
+        try:
+            await self.inner.set_file_id(worker_id, file_id)
+        finally:
+            self.invalidate()
+
+    async def upsert_many(self, workers: Sequence[Worker]) -> tuple[int, int]:
+        try:
+            return await self.inner.upsert_many(workers)
+        finally:
+            self.invalidate()
+            self._forget_unknown()
+
+    def _clear(self) -> None:
+        self._directory = None
+
+    def _drop_remote(self) -> None:
+        # Another replica may have registered any of the unknown chat ids.
+        self._drop()
+        self._forget_unknown()
+
+    def _remember_unknown(self, chat_id: str) -> None:
+        self.unknown_chat_stats.misses += 1
+        self._unknown_chat_ids[chat_id] = None
+        while len(self._unknown_chat_ids) > self.max_unknown_chat_ids:
+            self._unknown_chat_ids.popitem(last=False)
+
+    def _forget_unknown(self, chat_id: str | None = None) -> None:
+        if chat_id is None:
+            self.unknown_chat_stats.invalidations += len(self._unknown_chat_ids)
+            self._unknown_chat_ids.clear()
+        elif chat_id in self._unknown_chat_ids:
+            del self._unknown_chat_ids[chat_id]
+            self.unknown_chat_stats.invalidations += 1
+
+    async def _load(self) -> _WorkerDirectory:
+        directory = self._directory
+        if directory is not None:
+            self.stats.hits += 1
+            return directory
+
+        return await self._load_once(
+            lambda: self._directory, self._load_directory, self._keep_directory
+        )
+
+    async def _load_directory(self) -> _WorkerDirectory:
+        directory = _WorkerDirectory.build(await self.inner.list_all())
+        logger.info(
+            "Worker cache loaded %s workers (hits=%s, misses=%s, ratio=%.2f)",
+            len(directory.workers),
+            self.stats.hits,
+            self.stats.misses,
+            self.stats.hit_ratio,
+        )
+        return directory
+
+    def _keep_directory(self, directory: _WorkerDirectory) -> None:
+        self._directory = directory
+
+
+@dataclass(slots=True, frozen=True)
+class _SurveyCatalog:
+    version: int
+    by_name: dict[str, Survey]
+    by_id: dict[int, Survey]
+
+    @classmethod
+    def build(cls, version: int, surveys: Iterable[Survey]) -> "_SurveyCatalog":
+        by_name = {survey.speciality: survey for survey in surveys}
+        return cls(
+            version=version,
+            by_name=by_name,
+            by_id={survey.id: survey for survey in by_name.values()},
+        )
+
+
+class CachedSurveyRepository(VersionedCache, SurveyRepository):
+    """Serves survey definitions from a versioned in-process catalog.
+
+    Surveys only change through ``replace_all`` (``sync_surveys``). The
+    catalog is loaded once and, after a replace, swapped for a new version in
+    a single assignment, so readers see either the old or the new set, never
+    a half-written one.
+    """
+
+    def __init__(self, inner: SurveyRepository, backend: CacheBackend | None = None):
+        self.inner = inner
+        self._catalog: _SurveyCatalog | None = None
+        self._init_versioned(backend, "surveys")
+
+    async def get_by_name(self, name: str) -> Survey | None:
+        return (await self._load()).by_name.get(name)
+
+    async def get_by_id(self, survey_id: int) -> Survey | None:
+        return (await self._load()).by_id.get(survey_id)
+
+    async def get_many_by_names(self, names: Iterable[str]) -> dict[str, Survey]:
+        by_name = (await self._load()).by_name
+        return {name: by_name[name] for name in set(names) if name in by_name}
+
+    async def list_all(self) -> Sequence[Survey]:
+        return list((await self._load()).by_name.values())
+
+    async def clear_all(self) -> None:
+        try:
+            await self.inner.clear_all()
+        finally:
+            self.invalidate()
+
+    async def add(self, survey: Survey) -> None:
+        try:
+            await self.inner.add(survey)
+        finally:
+            self.invalidate()
+
+    async def replace_all(self, surveys: Sequence[Survey]) -> None:
+        try:
+            await self.inner.replace_all(surveys)
+        except BaseException:
+            self.invalidate()
+            raise
+        self._written()
+        self._catalog = _SurveyCatalog.build(self._version, surveys)
+        logger.info("Survey cache swapped to version %s (%s surveys)", self._version, len(surveys))
+
+    def _clear(self) -> None:
+        self._catalog = None
+
+    async def _load(self) -> _SurveyCatalog:
+        catalog = self._catalog
+        if catalog is not None:
+            self.stats.hits += 1
+            return catalog
+
+        return await self._load_once(lambda: self._catalog, self._load_catalog, self._keep_catalog)
+
+    async def _load_catalog(self) -> _SurveyCatalog:
+        version = self._version
+        surveys = await self.inner.list_all()
+        logger.info("Survey cache loaded %s surveys (version %s)", len(surveys), version)
+        return _SurveyCatalog.build(version, surveys)
+
+    def _keep_catalog(self, catalog: _SurveyCatalog) -> None:
+        self._catalog = catalog
+
+
+class CachedAdminRepository(VersionedCache, AdminRepository):
+    """Answers ``exists`` from a set of admin chat ids reloaded every ``ttl`` seconds.
+
+    ``is_admin`` runs on every admin callback, so the whole (tiny) table is
+    loaded in one query. ``add`` and ``delete_by_chat_id`` drop the set
+    immediately; the TTL only bounds staleness from other processes.
+    """
+
+    def __init__(self, inner: AdminRepository, ttl: float, backend: CacheBackend | None = None):
+        self.inner = inner
+        self.ttl = ttl
+        self._chat_ids: frozenset[str] | None = None
+        self._expires_at = 0.0
+        self._init_versioned(backend, "admins")
+
+    async def list_all(self) -> Sequence[AdminUser]:
+        return await self.inner.list_all()
+
+    async def get_by_chat_id(self, chat_id: str) -> AdminUser | None:
+        return await self.inner.get_by_chat_id(chat_id)
+
+    async def exists(self, chat_id: str) -> bool:
+        return str(chat_id) in await self._load()
+
+    async def list_chat_ids(self) -> set[str]:
+        return set(await self._load())
+
+    async def add(self, admin: AdminUser) -> bool:
+        try:
+            return await self.inner.add(admin)
+        finally:
+            self.invalidate()
+
+    async def delete_by_chat_id(self, chat_id: str) -> bool:
+        try:
+            return await self.inner.delete_by_chat_id(chat_id)
+        finally:
+            self.invalidate()
+
+    def _clear(self) -> None:
+        self._chat_ids = None
+
+    async def _load(self) -> frozenset[str]:
+        chat_ids = self._fresh_chat_ids()
+        if chat_ids is not None:
+            self.stats.hits += 1
+            return chat_ids
+        return await self._load_once(
+            self._fresh_chat_ids, self._load_chat_ids, self._keep_chat_ids
+        )
+
+    def _fresh_chat_ids(self) -> frozenset[str] | None:
+        if time.monotonic() < self._expires_at:
+            return self._chat_ids
+        return None
+
+    async def _load_chat_ids(self) -> frozenset[str]:
+        return frozenset(await self.inner.list_chat_ids())
+
+    def _keep_chat_ids(self, chat_ids: frozenset[str]) -> None:
+        self._chat_ids = chat_ids
+        self._expires_at = time.monotonic() + self.ttl
+
+
+BoardKey = tuple[dt.date, str]
+
+
+class CachedShiftRepository(VersionedCache, ShiftRepository):
+    """Keeps the free shifts of each (date, type) in memory for ``list_free``.
+
+    Everybody opens ``/shift`` at 08:00 and 14:00, so a board is loaded with
+    one query per shift window and then kept current by the write methods
+    below. The database stays authoritative: ``add_by_id`` still books with a
+    conditional UPDATE, the board only decides what is offered. A board is
+    changed without awaiting, so readers never see a half-applied write.
+    """
+
+    def __init__(self, inner: ShiftRepository, backend: CacheBackend | None = None):
+        self.inner = inner
+        self._boards: dict[BoardKey, dict[int, str]] = {}
+        self._init_versioned(backend, "shifts")
+
+    async def list_free(self, date: dt.date, shift_type: str) -> list[tuple[int, str]]:
+        board = self._boards.get((date, shift_type))
+        if board is not None:
+            self.stats.hits += 1
+        else:
+            board = await self._load((date, shift_type))
+        return list(board.items())
+
+    async def get_by_id(self, shift_id: int) -> Shift | None:
+        return await self.inner.get_by_id(shift_id)
+
+    async def get_for_assistant(
+        self, assistant_id: int, date: dt.date, shift_type: str
+    ) -> Shift | None:
+        return await self.inner.get_for_assistant(assistant_id, date, shift_type)
+
+    async def list_by_date(self, date: dt.date) -> Sequence[Shift]:
+        return await self.inner.list_by_date(date)
+
+    async def list_assigned_since(self, since: dt.date) -> Sequence[Shift]:
+        return await self.inner.list_assigned_since(since)
+
+    async def list_all(self) -> Sequence[Shift]:
+        return await self.inner.list_all()
+
+    async def clear_all(self) -> None:
+        try:
+            await self.inner.clear_all()
+        finally:
+            self.invalidate()
+
+    async def bulk_insert(self, records: list[tuple[str, dt.date, str]]) -> None:
+        try:
+            await self.inner.bulk_insert(records)
+        finally:
+            self.invalidate()
+
+    async def add_by_id(
+        self,
+        assistant_id: int,
+        assistant_name: str,
+        shift_id: int,
+        date: dt.date,
+        shift_type: str,
+    ) -> Shift | None:
+        try:
+            booked = await self.inner.add_by_id(
+                assistant_id, assistant_name, shift_id, date, shift_type
+            )
+        except BaseException:
+            self.invalidate()
+            raise
+        key = self._changed(shift_id)
+        if key is not None:
+            if booked:
+                del self._boards[key][shift_id]
+            else:
+                # Taken elsewhere, not in this window, or the assistant
+                # already has a shift: reload.
+                del self._boards[key]
+        return booked
+
+    async def add_manual(
+        self,
+        assistant_id: int,
+        assistant_name: str,
+        doctor_name: str,
+        shift_type: str,
+        date: dt.date,
+    ) -> bool:
+        # Inserts an already booked shift; no board offers it.
+        return await self.inner.add_manual(
+            assistant_id, assistant_name, doctor_name, shift_type, date
+        )
+
+    async def remove_assistant(self, assistant_id: int, date: dt.date, shift_type: str) -> None:
+        try:
+            await self.inner.remove_assistant(assistant_id, date, shift_type)
+        finally:
+            # The freed shift's id is not known here; reload that board.
+            self._changed()
+            self._boards.pop((date, shift_type), None)
+
+    async def add_slot(self, doctor_name: str, date: dt.date, shift_type: str) -> bool:
+        try:
+            added = await self.inner.add_slot(doctor_name, date, shift_type)
+        finally:
+            self._changed()
+            self._boards.pop((date, shift_type), None)
+        return added
+
+    async def delete_by_id(self, shift_id: int) -> bool:
+        try:
+            deleted = await self.inner.delete_by_id(shift_id)
+        except BaseException:
+            self.invalidate()
+            raise
+        key = self._changed(shift_id)
+        if deleted and key is not None:
+            del self._boards[key][shift_id]
+        return deleted
+
+    def _clear(self) -> None:
+        self._boards = {}
+
+    def _changed(self, shift_id: int | None = None) -> BoardKey | None:
+        """Record a write and return the key of the board offering ``shift_id``."""
+        self._written()
+        for key, board in self._boards.items():
+            if shift_id in board:
+                return key
+        return None
+
+    async def _load(self, key: BoardKey) -> dict[int, str]:
+        return await self._load_once(
+            lambda: self._boards.get(key),
+            lambda: self._load_board(key),
+            lambda board: self._keep_board(key, board),
+        )
+
+    async def _load_board(self, key: BoardKey) -> dict[int, str]:
+        board = dict(await self.inner.list_free(*key))
+        logger.info("Shift board %s %s loaded with %s free shifts", key[0], key[1], len(board))
+        return board
+
+    def _keep_board(self, key: BoardKey, board: dict[int, str]) -> None:
+        # Boards of earlier days are no longer offered.
+        self._boards = {
+            other: value for other, value in self._boards.items() if other[0] >= key[0]
+        }
+        self._boards[key] = board
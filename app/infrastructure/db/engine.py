@@ -0,0 +1,41 @@
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.config import DbSettings
+
+
+async_session = async_sessionmaker()
+
+_engine: AsyncEngine | None = None
+
+
+def build_engine(settings: DbSettings) -> AsyncEngine:
+    connect_args: dict = {"statement_cache_size": settings.statement_cache_size}
+    if settings.command_timeout:
+        connect_args["command_timeout"] = settings.command_timeout
+        # Let Postgres cancel runaway statements too, not only the client.
+        connect_args["server_settings"] = {
+            "statement_timeout": str(int(settings.command_timeout * 1000)),
+        }
+
+    return create_async_engine(
+        settings.url,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle,
+        pool_pre_ping=settings.pool_pre_ping,
+        connect_args=connect_args,
+    )
+
+
+def init_engine(settings: DbSettings) -> AsyncEngine:
+    global _engine
+    _engine = build_engine(settings)
+    async_session.configure(bind=_engine)
+    return _engine
+
+
+def get_engine() -> AsyncEngine:
+    if _engine is None:
+        raise RuntimeError("Database engine is not initialised (call init_engine first)")
+    return _engine
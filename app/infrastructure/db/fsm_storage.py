@@ -0,0 +1,156 @@
+import datetime as dt
+from typing import Any, Mapping
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from sqlalchemy import case, delete, func, null, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import FsmSettings
+from app.infrastructure.db.models import FsmState as FsmStateModel
+from app.infrastructure.db.unit_of_work import session_scope
+from app.logger import setup_logger
+
+
+logger = setup_logger("fsm", "fsm.log")
+
+
+class PostgresStorage(BaseStorage):
+    """aiogram FSM storage backed by the ``fsm_states`` table.
+
+    One row per storage key holds the state name and the JSON data. Every
+    write pushes ``expires_at`` ``ttl`` seconds ahead; expired rows read as
+    empty and are removed by ``delete_expired``. A row whose state and data
+    are both cleared is deleted right away. Handlers keep only small
+    identifiers in the data, so rows stay a few dozen bytes. ``updated_at``
+    is the last write from any replica; ``delete_idle`` clears conversations
+    by it.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = dt.timedelta(seconds=ttl)
+        self.key_builder = DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        value = state.state if isinstance(state, State) else state
+        await self._write(key, state=value)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        row = await self._read(key)
+        return row.state if row is not None else None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self._write(key, data=dict(data) or None)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        row = await self._read(key)
+        return dict(row.data or {}) if row is not None else {}
+
+    async def close(self) -> None:
+        pass
+
+    async def delete_expired(self) -> int:
+        async with session_scope() as session:
+            result = await session.execute(
+                delete(FsmStateModel).where(FsmStateModel.expires_at <= _now())
+            )
+            await session.commit()
+        if result.rowcount:
+            logger.info("Deleted %s expired FSM states", result.rowcount)
+        return result.rowcount
+
+    async def delete_idle(self, idle_timeout: float, max_states: int) -> list[str | None]:
+        """Delete rows not written for ``idle_timeout`` seconds, then the
+        least recently written beyond ``max_states``; return their states."""
+        idle = delete(FsmStateModel).where(
+            FsmStateModel.updated_at < _now() - dt.timedelta(seconds=idle_timeout)
+        )
+        newest = (
+            select(FsmStateModel.key)
+            .order_by(FsmStateModel.updated_at.desc())
+            .offset(max_states)
+        )
+        over_cap = delete(FsmStateModel).where(FsmStateModel.key.in_(newest))
+        async with session_scope() as session:
+            deleted = []
+            for stmt in (idle, over_cap):
+                result = await session.execute(stmt.returning(FsmStateModel.state))
+                deleted.extend(result.scalars())
+            await session.commit()
+        return deleted
+
+    async def state_counts(self) -> dict[str | None, int]:
+        async with session_scope() as session:
+            result = await session.execute(
+                select(FsmStateModel.state, func.count())
+                .where(FsmStateModel.expires_at > _now())
+                .group_by(FsmStateModel.state)
+            )
+            return dict(result.all())
+
+    async def _read(self, key: StorageKey):
+        async with session_scope() as session:
+            result = await session.execute(
+                select(FsmStateModel.state, FsmStateModel.data).where(
+                    FsmStateModel.key == self.key_builder.build(key),
+                    FsmStateModel.expires_at > _now(),
+                )
+            )
+            return result.one_or_none()
+
+    async def _write(self, key: StorageKey, **values: Any) -> None:
+        now = _now()
+        storage_key = self.key_builder.build(key)
+        stmt = pg_insert(FsmStateModel).values(
+            key=storage_key,
+            chat_id=key.chat_id,
+            updated_at=now,
+            expires_at=now + self.ttl,
+            **values,
+        )
+        # An expired row counts as absent, so the column not written here
+        # starts empty instead of being revived.
+        (written,) = values
+        kept = "data" if written == "state" else "state"
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FsmStateModel.key],
+            set_={
+                written: stmt.excluded[written],
+                kept: case(
+                    (FsmStateModel.expires_at <= now, null()),
+                    else_=FsmStateModel.__table__.c[kept],
+                ),
+                "updated_at": stmt.excluded.updated_at,
+                "expires_at": stmt.excluded.expires_at,
+            },
+        )
+        async with session_scope() as session:
+            await session.execute(stmt)
+            if values[written] is None:
+                await session.execute(
+                    delete(FsmStateModel).where(
+                        FsmStateModel.key == storage_key,
+                        FsmStateModel.state.is_(None),
+                        FsmStateModel.data.is_(None),
+                    )
+                )
+            await session.commit()
+
+
+def _now() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+def create_fsm_storage(settings: FsmSettings) -> BaseStorage:
+    if settings.storage == "postgres":
+        return PostgresStorage(ttl=settings.ttl)
+    if settings.storage == "redis":
+        from aiogram.fsm.storage.redis import RedisStorage
+
+        # Redis has no sweep: a key expires once idle for the shorter of the two.
+        ttl = int(min(settings.ttl, settings.idle_timeout))
+        return RedisStorage.from_url(settings.redis_url, state_ttl=ttl, data_ttl=ttl)
+    if settings.storage == "memory":
+        return MemoryStorage()
+    raise ValueError(f"Unknown FSM_STORAGE: {settings.storage!r}")
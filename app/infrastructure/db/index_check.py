@@ -0,0 +1,106 @@
+"""Fails when a hot repository query cannot be served by an index.
+
+Run against a migrated database: ``python -m app.infrastructure.db.index_check``.
+Every probe below calls a real repository method; the SQL it emits is captured
+and re-planned with sequential scans disabled. A plan that still contains a
+``Seq Scan`` means no index supports that query.
+"""
+
+import asyncio
+import sys
+from datetime import date
+from typing import Awaitable, Callable
+
+from sqlalchemy import event
+
+from app.config import load_settings
+from app.infrastructure.db.engine import get_engine, init_engine
+from app.infrastructure.db.repositories import (
+    SqlAlchemyAdminRepository,
+    SqlAlchemyCabinetRepository,
+    SqlAlchemyInstrumentMoveRepository,
+    SqlAlchemyInstrumentRepository,
+    SqlAlchemyPairRepository,
+    SqlAlchemyShiftRepository,
+    SqlAlchemySurveyRepository,
+    SqlAlchemyWorkerRepository,
+)
+from app.infrastructure.db.unit_of_work import unit_of_work
+
+
+admins = SqlAlchemyAdminRepository()
+workers = SqlAlchemyWorkerRepository()
+surveys = SqlAlchemySurveyRepository()
+pairs = SqlAlchemyPairRepository()
+shifts = SqlAlchemyShiftRepository()
+cabinets = SqlAlchemyCabinetRepository()
+instruments = SqlAlchemyInstrumentRepository()
+moves = SqlAlchemyInstrumentMoveRepository()
+
+DAY = date(2000, 1, 1)
+
+PROBES: dict[str, Callable[[], Awaitable[object]]] = {
+    "admins.exists": lambda: admins.exists("0"),
+    "workers.get_by_chat_id": lambda: workers.get_by_chat_id(0),
+    "workers.get_by_fullname": lambda: workers.get_by_fullname(""),
+    "workers.get_by_id": lambda: workers.get_by_id(0),
+    "surveys.get_by_name": lambda: surveys.get_by_name(""),
+    "pairs.list_ready_by_date": lambda: pairs.list_ready_by_date(DAY),
+    "pairs.next_ready_for_subject": lambda: pairs.next_ready_for_subject(""),
+    "shifts.list_free": lambda: shifts.list_free(DAY, "morning"),
+    "shifts.get_for_assistant": lambda: shifts.get_for_assistant(0, DAY, "morning"),
+    "shifts.list_by_date": lambda: shifts.list_by_date(DAY),
+    "shifts.list_assigned_since": lambda: shifts.list_assigned_since(DAY),
+    "cabinets.has_instruments": lambda: cabinets.has_instruments(0),
+    "instruments.list_by_cabinet": lambda: instruments.list_by_cabinet(0),
+    "moves.get_last_for_instrument": lambda: moves.get_last_for_instrument(0),
+}
+
+
+async def find_unindexed_queries() -> dict[str, list[str]]:
+    failures: dict[str, list[str]] = {}
+    async with unit_of_work() as uow:
+        conn = await uow.connection()
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+        for name, probe in PROBES.items():
+            captured: list[tuple[str, object]] = []
+
+            def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+                captured.append((statement, parameters))
+
+            event.listen(get_engine().sync_engine, "before_cursor_execute", capture)
+            try:
+                await probe()
+            finally:
+                event.remove(get_engine().sync_engine, "before_cursor_execute", capture)
+
+            for statement, parameters in captured:
+                result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                plan = [row[0] for row in result.all()]
+                if any("Seq Scan" in line for line in plan):
+                    failures.setdefault(name, []).extend(plan)
+
+        await uow.rollback()
+    return failures
+
+
+async def main() -> int:
+    init_engine(load_settings().db)
+    try:
+        failures = await find_unindexed_queries()
+    finally:
+        await get_engine().dispose()
+
+    for name, plan in failures.items():
+        print(f"{name}: no supporting index")
+        for line in plan:
+            print(f"    {line}")
+    if failures:
+        return 1
+    print(f"All {len(PROBES)} repository lookups are index-backed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,9 +1,13 @@
+from dataclasses import fields
+from typing import Any, Sequence, TypeVar
+
 from app.domain.entities import (
     AdminUser as AdminUserEntity,
     Answer as AnswerEntity,
     Cabinet as CabinetEntity,
     Instrument as InstrumentEntity,
     InstrumentMove as InstrumentMoveEntity,
+    OutboxEntry as OutboxEntryEntity,
     Pair as PairEntity,
     Shift as ShiftEntity,
     Survey as SurveyEntity,
@@ -18,18 +22,41 @@ from app.infrastructure.db.models import (
     Pair as PairModel,
     Shift as ShiftModel,
     Survey as SurveyModel,
+    SurveyOutbox as SurveyOutboxModel,
     Worker as WorkerModel,
 )
 
 
-def to_admin_entity(model: AdminUserModel | None) -> AdminUserEntity | None:
-    if model is None:
+E = TypeVar("E")
+
+
+def entity_columns(model: type, entity: type) -> tuple[Any, ...]:
+    """Model columns in the entity's field order, for ``select(*columns)``."""
+    return tuple(getattr(model, field.name) for field in fields(entity))
+
+
+ADMIN_COLUMNS = entity_columns(AdminUserModel, AdminUserEntity)
+WORKER_COLUMNS = entity_columns(WorkerModel, WorkerEntity)
+PAIR_COLUMNS = entity_columns(PairModel, PairEntity)
+SURVEY_COLUMNS = entity_columns(SurveyModel, SurveyEntity)
+ANSWER_COLUMNS = entity_columns(AnswerModel, AnswerEntity)
+SHIFT_COLUMNS = entity_columns(ShiftModel, ShiftEntity)
+CABINET_COLUMNS = entity_columns(CabinetModel, CabinetEntity)
+INSTRUMENT_COLUMNS = entity_columns(InstrumentModel, InstrumentEntity)
+INSTRUMENT_MOVE_COLUMNS = entity_columns(InstrumentMoveModel, InstrumentMoveEntity)
+OUTBOX_COLUMNS = entity_columns(SurveyOutboxModel, OutboxEntryEntity)
+
+
+def row_to_entity(entity: type[E], row: Sequence[Any] | None) -> E | None:
+    # Rows from select(*<ENTITY>_COLUMNS) line up with the entity's fields,
+    # so read-only queries skip ORM instance hydration entirely.
+    if row is None:
         return None
-    return AdminUserEntity(
-        id=model.id,
-        chat_id=model.chat_id,
-        added_at=model.added_at,
-    )
+    return entity(*row)
+
+
+def rows_to_entities(entity: type[E], rows) -> list[E]:
+    return [entity(*row) for row in rows]
 
 
 def from_admin_entity(entity: AdminUserEntity) -> AdminUserModel:
@@ -40,19 +67,6 @@ def from_admin_entity(entity: AdminUserEntity) -> AdminUserModel:
     )
 
 
-def to_worker_entity(model: WorkerModel | None) -> WorkerEntity | None:
-    if model is None:
-        return None
-    return WorkerEntity(
-        id=model.id,
-        full_name=model.full_name,
-        file_id=model.file_id,
-        chat_id=model.chat_id,
-        speciality=model.speciality,
-        phone=model.phone,
-    )
-
-
 def from_worker_entity(entity: WorkerEntity) -> WorkerModel:
     return WorkerModel(
         id=entity.id,
@@ -64,20 +78,6 @@ def from_worker_entity(entity: WorkerEntity) -> WorkerModel:
     )
 
 
-def to_pair_entity(model: PairModel | None) -> PairEntity | None:
-    if model is None:
-        return None
-    return PairEntity(
-        id=model.id,
-        subject=model.subject,
-        object=model.object,
-        survey=model.survey,
-        weekday=model.weekday,
-        date=model.date,
-        status=model.status,
-    )
-
-
 def from_pair_entity(entity: PairEntity) -> PairModel:
     return PairModel(
         id=entity.id,
@@ -90,25 +90,6 @@ def from_pair_entity(entity: PairEntity) -> PairModel:
     )
 
 
-def to_survey_entity(model: SurveyModel | None) -> SurveyEntity | None:
-    if model is None:
-        return None
-    return SurveyEntity(
-        id=model.id,
-        speciality=model.speciality,
-        question1=model.question1,
-        question1_type=model.question1_type,
-        question2=model.question2,
-        question2_type=model.question2_type,
-        question3=model.question3,
-        question3_type=model.question3_type,
-        question4=model.question4,
-        question4_type=model.question4_type,
-        question5=model.question5,
-        question5_type=model.question5_type,
-    )
-
-
 def from_survey_entity(entity: SurveyEntity) -> SurveyModel:
     return SurveyModel(
         id=entity.id,
@@ -126,29 +107,6 @@ def from_survey_entity(entity: SurveyEntity) -> SurveyModel:
     )
 
 
-def to_answer_entity(model: AnswerModel | None) -> AnswerEntity | None:
-    if model is None:
-        return None
-    return AnswerEntity(
-        id=model.id,
-        subject=model.subject,
-        object=model.object,
-        survey=model.survey,
-        survey_date=model.survey_date,
-        completed_at=model.completed_at,
-        question1=model.question1,
-        answer1=model.answer1,
-        question2=model.question2,
-        answer2=model.answer2,
-        question3=model.question3,
-        answer3=model.answer3,
-        question4=model.question4,
-        answer4=model.answer4,
-        question5=model.question5,
-        answer5=model.answer5,
-    )
-
-
 def from_answer_entity(entity: AnswerEntity) -> AnswerModel:
     return AnswerModel(
         id=entity.id,
@@ -170,20 +128,6 @@ def from_answer_entity(entity: AnswerEntity) -> AnswerModel:
     )
 
 
-def to_shift_entity(model: ShiftModel | None) -> ShiftEntity | None:
-    if model is None:
-        return None
-    return ShiftEntity(
-        id=model.id,
-        assistant_id=model.assistant_id,
-        doctor_name=model.doctor_name,
-        date=model.date,
-        type=model.type,
-        assistant_name=model.assistant_name,
-        manual=model.manual,
-    )
-
-
 def from_shift_entity(entity: ShiftEntity) -> ShiftModel:
     return ShiftModel(
         id=entity.id,
@@ -196,16 +140,6 @@ def from_shift_entity(entity: ShiftEntity) -> ShiftModel:
     )
 
 
-def to_cabinet_entity(model: CabinetModel | None) -> CabinetEntity | None:
-    if model is None:
-        return None
-    return CabinetEntity(
-        id=model.id,
-        name=model.name,
-        is_active=model.is_active,
-    )
-
-
 def from_cabinet_entity(entity: CabinetEntity) -> CabinetModel:
     return CabinetModel(
         id=entity.id,
@@ -214,17 +148,6 @@ def from_cabinet_entity(entity: CabinetEntity) -> CabinetModel:
     )
 
 
-def to_instrument_entity(model: InstrumentModel | None) -> InstrumentEntity | None:
-    if model is None:
-        return None
-    return InstrumentEntity(
-        id=model.id,
-        name=model.name,
-        cabinet_id=model.cabinet_id,
-        is_active=model.is_active,
-    )
-
-
 def from_instrument_entity(entity: InstrumentEntity) -> InstrumentModel:
     return InstrumentModel(
         id=entity.id,
@@ -234,21 +157,6 @@ def from_instrument_entity(entity: InstrumentEntity) -> InstrumentModel:
     )
 
 
-def to_instrument_move_entity(model: InstrumentMoveModel | None) -> InstrumentMoveEntity | None:
-    if model is None:
-        return None
-    return InstrumentMoveEntity(
-        id=model.id,
-        instrument_id=model.instrument_id,
-        from_cabinet_id=model.from_cabinet_id,
-        to_cabinet_id=model.to_cabinet_id,
-        before_photo_id=model.before_photo_id,
-        after_photo_id=model.after_photo_id,
-        moved_by_chat_id=model.moved_by_chat_id,
-        moved_at=model.moved_at,
-    )
-
-
 def from_instrument_move_entity(entity: InstrumentMoveEntity) -> InstrumentMoveModel:
     return InstrumentMoveModel(
         id=entity.id,
@@ -0,0 +1,108 @@
+"""Compares the two ways repositories turn answer rows into entities.
+
+Run it with ``python -m app.infrastructure.db.mapping_benchmark [rows]``. It
+needs no server: the rows live in an in-memory SQLite table.
+
+* ``orm``: ``select(AnswerModel)`` hydrates ORM instances, which are then
+  copied into a plain ``@dataclass`` (the old read path).
+* ``columns``: ``select(*ANSWER_COLUMNS)`` rows go straight into the slotted
+  ``Answer`` entity (the current read path).
+
+For each path it prints, per 10k rows, the time, the allocated blocks and
+bytes still held by the entities, and the peak traced memory while building
+them (``tracemalloc``).
+"""
+
+import datetime as dt
+import sys
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from typing import Callable
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.domain.entities import Answer
+from app.infrastructure.db.mappers import ANSWER_COLUMNS, rows_to_entities
+from app.infrastructure.db.models import Answer as AnswerModel
+
+
+PlainAnswer = make_dataclass("PlainAnswer", [(field.name, field.type) for field in fields(Answer)])
+FIELD_NAMES = tuple(field.name for field in fields(Answer))
+
+
+def _fill(session: Session, rows: int) -> None:
+    completed_at = dt.datetime(2024, 1, 1, 12, 0, tzinfo=dt.timezone.utc)
+    session.execute(
+        insert(AnswerModel),
+        [
+            {
+                "id": index + 1,
+                "subject": f"subject {index % 40}",
+                "object": f"object {index % 300}",
+                "survey": "Ассистент",
+                "survey_date": dt.date(2024, 1, 1) + dt.timedelta(days=index % 365),
+                "completed_at": completed_at,
+                **{f"question{i}": f"Question {i}" for i in range(1, 6)},
+                **{f"answer{i}": str(index % 5 + 1) for i in range(1, 6)},
+            }
+            for index in range(rows)
+        ],
+    )
+    session.commit()
+
+
+def _orm_path(session: Session) -> list:
+    models = session.execute(select(AnswerModel)).scalars().all()
+    return [PlainAnswer(**{name: getattr(model, name) for name in FIELD_NAMES}) for model in models]
+
+
+def _columns_path(session: Session) -> list:
+    return rows_to_entities(Answer, session.execute(select(*ANSWER_COLUMNS)).all())
+
+
+def _measure(
+    session: Session, path: Callable[[Session], list], rows: int
+) -> tuple[float, int, int, int]:
+    session.expunge_all()
+    started = time.perf_counter()
+    path(session)
+    elapsed = time.perf_counter() - started
+
+    session.expunge_all()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        entities = path(session)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del entities
+
+    scale = 10_000 / rows
+    return elapsed * scale, int(blocks * scale), int(size * scale), int(peak * scale)
+
+
+def main(rows: int = 10_000) -> None:
+    engine = create_engine("sqlite://")
+    AnswerModel.__table__.create(engine)
+    with Session(engine) as session:
+        _fill(session, rows)
+        print(f"{rows} answer rows, figures per 10k rows")
+        for name, path in (("orm", _orm_path), ("columns", _columns_path)):
+            path(session)  # warm up statement caches
+            elapsed, blocks, size, peak = _measure(session, path, rows)
+            print(
+                f"{name:>8}: {elapsed * 1000:8.1f} ms  {blocks:>9} blocks"
+                f"  {size / 1024:>7.0f} KiB held  {peak / 1024:>7.0f} KiB peak"
+            )
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
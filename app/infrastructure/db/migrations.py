@@ -0,0 +1,194 @@
+from dataclasses import dataclass
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.logger import setup_logger
+
+
+logger = setup_logger("migrations", "migrations.log")
+
+# Arbitrary constant so that concurrently starting replicas migrate one at a time.
+MIGRATIONS_LOCK_ID = 7_240_311
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: tuple[str, ...]
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        name="indexes for hot lookups",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS ix_workers_chat_id ON workers (chat_id)",
+            "CREATE INDEX IF NOT EXISTS ix_workers_full_name ON workers (full_name)",
+            "CREATE INDEX IF NOT EXISTS ix_surveys_speciality ON surveys (speciality)",
+            "CREATE INDEX IF NOT EXISTS ix_pairs_subject_status_id "
+            "ON pairs (subject, status, id)",
+            "CREATE INDEX IF NOT EXISTS ix_pairs_status_date ON pairs (status, date)",
+            "CREATE INDEX IF NOT EXISTS ix_shifts_date_type_assistant_id "
+            "ON shifts (date, type, assistant_id)",
+            "CREATE INDEX IF NOT EXISTS ix_instruments_cabinet_id_name "
+            "ON instruments (cabinet_id, name)",
+            "CREATE INDEX IF NOT EXISTS ix_instrument_moves_instrument_id_id "
+            "ON instrument_moves (instrument_id, id DESC)",
+        ),
+    ),
+    Migration(
+        version=2,
+        name="native date and timestamp columns",
+        statements=(
+            "ALTER TABLE pairs ALTER COLUMN date TYPE DATE "
+            "USING to_date(NULLIF(btrim(date), ''), 'DD.MM.YYYY')",
+            "ALTER TABLE shifts ALTER COLUMN date TYPE DATE "
+            "USING to_date(NULLIF(btrim(date), ''), 'DD.MM.YYYY')",
+            "ALTER TABLE answers ALTER COLUMN survey_date TYPE DATE "
+            "USING to_date(NULLIF(btrim(survey_date), ''), 'DD.MM.YYYY')",
+            # completed_at was written as str(datetime.now()) in Moscow local time.
+            "ALTER TABLE answers ALTER COLUMN completed_at TYPE TIMESTAMPTZ "
+            "USING NULLIF(btrim(completed_at), '')::timestamp AT TIME ZONE 'Europe/Moscow'",
+            "ALTER TABLE instrument_moves ALTER COLUMN moved_at TYPE TIMESTAMPTZ "
+            "USING to_timestamp(NULLIF(btrim(moved_at), ''), 'DD.MM.YYYY HH24:MI:SS')"
+            "::timestamp AT TIME ZONE 'Europe/Moscow'",
+            "CREATE INDEX IF NOT EXISTS ix_answers_survey_date ON answers (survey_date)",
+        ),
+    ),
+    Migration(
+        version=3,
+        name="unique worker full name for upserts",
+        statements=(
+            # Older syncs could insert a name twice. Keep the earliest row,
+            # fill its blanks from the copies (latest first), move shift
+            # bookings over, then drop the copies. Pairs refer to names.
+            "UPDATE workers SET "
+            + ", ".join(
+                f"{column} = COALESCE({column}, (SELECT d.{column} FROM workers d "
+                f"WHERE d.full_name = workers.full_name AND d.{column} IS NOT NULL "
+                "ORDER BY d.id DESC LIMIT 1))"
+                for column in ("file_id", "chat_id", "speciality", "phone")
+            )
+            + " WHERE id IN (SELECT min(id) FROM workers WHERE full_name IS NOT NULL "
+            "GROUP BY full_name HAVING count(*) > 1)",
+            "UPDATE shifts SET assistant_id = ("
+            "SELECT min(k.id) FROM workers d JOIN workers k ON k.full_name = d.full_name "
+            "WHERE d.id = shifts.assistant_id) "
+            "WHERE assistant_id IN ("
+            "SELECT d.id FROM workers d JOIN workers k ON k.full_name = d.full_name AND k.id < d.id)",
+            "DELETE FROM workers WHERE id IN ("
+            "SELECT d.id FROM workers d JOIN workers k ON k.full_name = d.full_name AND k.id < d.id)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_workers_full_name ON workers (full_name)",
+            "DROP INDEX IF EXISTS ix_workers_full_name",
+        ),
+    ),
+    Migration(
+        version=4,
+        name="one booked shift per assistant, date and type",
+        statements=(
+            # Release bookings left over from old races, keeping the earliest one.
+            "UPDATE shifts SET assistant_id = NULL, assistant_name = NULL "
+            "WHERE assistant_id IS NOT NULL AND id NOT IN ("
+            "SELECT min(id) FROM shifts WHERE assistant_id IS NOT NULL "
+            "GROUP BY assistant_id, date, type)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_shifts_assistant_date_type "
+            "ON shifts (assistant_id, date, type) WHERE assistant_id IS NOT NULL",
+        ),
+    ),
+    Migration(
+        version=5,
+        name="persistent FSM states",
+        statements=(
+            "CREATE TABLE IF NOT EXISTS fsm_states ("
+            "key VARCHAR(255) PRIMARY KEY, "
+            "chat_id BIGINT NOT NULL, "
+            "state VARCHAR(255), "
+            "data JSONB, "
+            "updated_at TIMESTAMPTZ NOT NULL, "
+            "expires_at TIMESTAMPTZ NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS ix_fsm_states_expires_at ON fsm_states (expires_at)",
+        ),
+    ),
+    Migration(
+        version=6,
+        name="survey dispatch outbox",
+        statements=(
+            "CREATE TABLE IF NOT EXISTS survey_outbox ("
+            "id BIGSERIAL PRIMARY KEY, "
+            "pair_id BIGINT NOT NULL UNIQUE, "
+            "status VARCHAR(15) NOT NULL, "
+            "attempts INTEGER NOT NULL, "
+            "next_attempt_at TIMESTAMPTZ NOT NULL, "
+            "last_error TEXT, "
+            "created_at TIMESTAMPTZ NOT NULL, "
+            "sent_at TIMESTAMPTZ)",
+            "CREATE INDEX IF NOT EXISTS ix_survey_outbox_status_next_attempt_at "
+            "ON survey_outbox (status, next_attempt_at)",
+        ),
+    ),
+    Migration(
+        version=7,
+        name="one scheduled slot per doctor, date and type",
+        statements=(
+            "UPDATE shifts SET manual = false WHERE manual IS NULL",
+            # Repeated schedule loads could insert a slot twice. Drop the free
+            # copies, keeping a booked one or else the earliest; copies booked
+            # by different assistants stay, as manual bookings.
+            "DELETE FROM shifts s USING shifts k "
+            "WHERE NOT s.manual AND NOT k.manual AND s.assistant_id IS NULL "
+            "AND k.doctor_name = s.doctor_name AND k.date = s.date AND k.type = s.type "
+            "AND (k.assistant_id IS NOT NULL OR k.id < s.id)",
+            "UPDATE shifts s SET manual = true "
+            "WHERE NOT s.manual AND EXISTS (SELECT 1 FROM shifts k WHERE NOT k.manual "
+            "AND k.doctor_name = s.doctor_name AND k.date = s.date AND k.type = s.type "
+            "AND k.id < s.id)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_shifts_doctor_date_type "
+            "ON shifts (doctor_name, date, type) WHERE NOT manual",
+        ),
+    ),
+)
+
+
+async def apply_migrations(conn: AsyncConnection, metadata: MetaData) -> list[int]:
+    """Create missing tables and bring an existing schema up to the latest version.
+
+    A database created from scratch already matches the models, so its
+    migrations are only recorded, not executed.
+    """
+    await conn.execute(
+        text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATIONS_LOCK_ID}
+    )
+
+    is_fresh = not await conn.run_sync(
+        lambda sync_conn: inspect(sync_conn).has_table("workers")
+    )
+    await conn.run_sync(metadata.create_all)
+    await conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, "
+            "name TEXT NOT NULL, "
+            "applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        )
+    )
+
+    result = await conn.execute(text("SELECT version FROM schema_migrations"))
+    applied_versions = set(result.scalars().all())
+
+    applied: list[int] = []
+    for migration in MIGRATIONS:
+        if migration.version in applied_versions:
+            continue
+        if not is_fresh:
+            for statement in migration.statements:
+                await conn.exec_driver_sql(statement)
+            logger.info("Applied migration %s: %s", migration.version, migration.name)
+        await conn.execute(
+            text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+            {"version": migration.version, "name": migration.name},
+        )
+        applied.append(migration.version)
+
+    return applied
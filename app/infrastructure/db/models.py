@@ -1,25 +1,23 @@
-import os
-
-from dotenv import load_dotenv
-from sqlalchemy import BigInteger, String, Text, Column, Boolean, select
-from sqlalchemy.ext.asyncio import AsyncAttrs, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-
-
-load_dotenv()
-
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "5432")
-DB_NAME = os.getenv("DB_NAME")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-
-
-engine = create_async_engine(
-    f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Index,
+    Integer,
+    JSON,
+    String,
+    Text,
+    select,
+    text,
 )
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncAttrs
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
-async_session = async_sessionmaker(engine)
+from app.infrastructure.db.engine import async_session, get_engine
+from app.infrastructure.db.migrations import apply_migrations
 
 
 class Base(AsyncAttrs, DeclarativeBase):
@@ -35,6 +33,10 @@ class AdminUser(Base):
 
 class Worker(Base):
     __tablename__ = "workers"
+    __table_args__ = (
+        Index("ix_workers_chat_id", "chat_id"),
+        Index("uq_workers_full_name", "full_name", unique=True),
+    )
     id = Column(BigInteger, primary_key=True)
     full_name = Column(Text)
     file_id = Column(String(255))
@@ -45,17 +47,22 @@ class Worker(Base):
 
 class Pair(Base):
     __tablename__ = "pairs"
+    __table_args__ = (
+        Index("ix_pairs_subject_status_id", "subject", "status", "id"),
+        Index("ix_pairs_status_date", "status", "date"),
+    )
     id = Column(BigInteger, primary_key=True)
     subject = Column(Text)
     object = Column(Text)
     survey = Column(Text)
     weekday = Column(String(31))
-    date = Column(String(31))
+    date = Column(Date)
     status = Column(String(15), default="ready")
 
 
 class Survey(Base):
     __tablename__ = "surveys"
+    __table_args__ = (Index("ix_surveys_speciality", "speciality"),)
     id = Column(BigInteger, primary_key=True)
     speciality = Column(String(511))
     question1 = Column(Text)
@@ -72,12 +79,13 @@ class Survey(Base):
 
 class Answer(Base):
     __tablename__ = "answers"
+    __table_args__ = (Index("ix_answers_survey_date", "survey_date"),)
     id = Column(BigInteger, primary_key=True)
     subject = Column(Text)
     object = Column(Text)
     survey = Column(Text)
-    survey_date = Column(String(31))
-    completed_at = Column(String(63))
+    survey_date = Column(Date)
+    completed_at = Column(DateTime(timezone=True))
     question1 = Column(Text)
     answer1 = Column(Text)
     question2 = Column(Text)
@@ -92,10 +100,31 @@ class Answer(Base):
 
 class Shift(Base):
     __tablename__ = "shifts"
+    __table_args__ = (
+        Index("ix_shifts_date_type_assistant_id", "date", "type", "assistant_id"),
+        Index(
+            "uq_shifts_assistant_date_type",
+            "assistant_id",
+            "date",
+            "type",
+            unique=True,
+            postgresql_where=text("assistant_id IS NOT NULL"),
+        ),
+        # One scheduled slot per doctor, date and type; manual bookings are
+        # extra rows and may repeat a doctor.
+        Index(
+            "uq_shifts_doctor_date_type",
+            "doctor_name",
+            "date",
+            "type",
+            unique=True,
+            postgresql_where=text("NOT manual"),
+        ),
+    )
     id = Column(BigInteger, primary_key=True)
     assistant_id = Column(BigInteger)
     doctor_name = Column(Text)
-    date = Column(String(31))
+    date = Column(Date)
     type = Column(String(10))
     assistant_name = Column(Text, nullable=True)
     manual = Column(Boolean, default=False)
@@ -110,6 +139,7 @@ class Cabinet(Base):
 
 class Instrument(Base):
     __tablename__ = "instruments"
+    __table_args__ = (Index("ix_instruments_cabinet_id_name", "cabinet_id", "name"),)
     id = Column(BigInteger, primary_key=True)
     name = Column(Text)
     cabinet_id = Column(BigInteger)
@@ -118,6 +148,9 @@ class Instrument(Base):
 
 class InstrumentMove(Base):
     __tablename__ = "instrument_moves"
+    __table_args__ = (
+        Index("ix_instrument_moves_instrument_id_id", "instrument_id", text("id DESC")),
+    )
     id = Column(BigInteger, primary_key=True)
     instrument_id = Column(BigInteger)
     from_cabinet_id = Column(BigInteger)
@@ -125,12 +158,38 @@ class InstrumentMove(Base):
     before_photo_id = Column(String(255))
     after_photo_id = Column(String(255))
     moved_by_chat_id = Column(String(31))
-    moved_at = Column(String(63))
+    moved_at = Column(DateTime(timezone=True))
+
+
+class FsmState(Base):
+    __tablename__ = "fsm_states"
+    __table_args__ = (Index("ix_fsm_states_expires_at", "expires_at"),)
+    key = Column(String(255), primary_key=True)
+    chat_id = Column(BigInteger, nullable=False)
+    state = Column(String(255))
+    data = Column(JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql"))
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class SurveyOutbox(Base):
+    __tablename__ = "survey_outbox"
+    __table_args__ = (
+        Index("ix_survey_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+    id = Column(BigInteger, primary_key=True)
+    pair_id = Column(BigInteger, unique=True, nullable=False)
+    status = Column(String(15), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    sent_at = Column(DateTime(timezone=True))
 
 
 async def async_main():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    async with get_engine().begin() as conn:
+        await apply_migrations(conn, Base.metadata)
 
     async with async_session() as session:
         result = await session.execute(
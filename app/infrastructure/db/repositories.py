@@ -1,4 +1,29 @@
-from sqlalchemy import select, update, delete
+import datetime as dt
+from typing import AsyncIterator, Iterable, Sequence
+
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    DateTime,
+    MetaData,
+    String,
+    Text,
+    and_,
+    case,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 
 from app.domain.entities import AdminUser as AdminUserEntity
 from app.domain.entities import Worker as WorkerEntity
@@ -9,6 +34,7 @@ from app.domain.entities import Shift as ShiftEntity
 from app.domain.entities import Cabinet as CabinetEntity
 from app.domain.entities import Instrument as InstrumentEntity
 from app.domain.entities import InstrumentMove as InstrumentMoveEntity
+from app.domain.entities import OutboxEntry as OutboxEntryEntity
 from app.domain.repositories import (
     AdminRepository,
     WorkerRepository,
@@ -19,26 +45,28 @@ from app.domain.repositories import (
     CabinetRepository,
     InstrumentRepository,
     InstrumentMoveRepository,
+    SurveyOutboxRepository,
 )
 from app.infrastructure.db.mappers import (
+    ADMIN_COLUMNS,
+    ANSWER_COLUMNS,
+    CABINET_COLUMNS,
+    INSTRUMENT_COLUMNS,
+    INSTRUMENT_MOVE_COLUMNS,
+    OUTBOX_COLUMNS,
+    PAIR_COLUMNS,
+    SHIFT_COLUMNS,
+    SURVEY_COLUMNS,
+    WORKER_COLUMNS,
     from_admin_entity,
     from_answer_entity,
-    from_cabinet_entity,
-    from_instrument_entity,
     from_instrument_move_entity,
     from_pair_entity,
     from_shift_entity,
     from_survey_entity,
     from_worker_entity,
-    to_admin_entity,
-    to_answer_entity,
-    to_cabinet_entity,
-    to_instrument_entity,
-    to_instrument_move_entity,
-    to_pair_entity,
-    to_shift_entity,
-    to_survey_entity,
-    to_worker_entity,
+    row_to_entity,
+    rows_to_entities,
 )
 from app.infrastructure.db.models import (
     AdminUser as AdminUserModel,
@@ -49,33 +77,44 @@ from app.infrastructure.db.models import (
     Pair as PairModel,
     Shift as ShiftModel,
     Survey as SurveyModel,
+    SurveyOutbox as SurveyOutboxModel,
     Worker as WorkerModel,
-    async_session,
 )
+from app.infrastructure.db.bulk import copy_records, report_throughput, supports_copy
+from app.infrastructure.db.unit_of_work import session_scope
+
+
+# Session-local staging table COPY loads shifts into before they are merged.
+SHIFTS_LOAD_TABLE = ShiftModel.__table__.to_metadata(MetaData(), name="shifts_load")
 
 
 class SqlAlchemyAdminRepository(AdminRepository):
     async def list_all(self):
-        async with async_session() as session:
+        async with session_scope() as session:
             result = await session.execute(
-                select(AdminUserModel).order_by(AdminUserModel.chat_id)
+                select(*ADMIN_COLUMNS).order_by(AdminUserModel.chat_id)
             )
-            return [to_admin_entity(item) for item in result.scalars().all()]
+            return rows_to_entities(AdminUserEntity, result.all())
 
     async def get_by_chat_id(self, chat_id: str) -> AdminUserEntity | None:
-        async with async_session() as session:
-            stmt = select(AdminUserModel).where(AdminUserModel.chat_id == chat_id)
+        async with session_scope() as session:
+            stmt = select(*ADMIN_COLUMNS).where(AdminUserModel.chat_id == chat_id)
             result = await session.execute(stmt)
-            return to_admin_entity(result.scalar_one_or_none())
+            return row_to_entity(AdminUserEntity, result.one_or_none())
 
     async def exists(self, chat_id: str) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             stmt = select(AdminUserModel.id).where(AdminUserModel.chat_id == chat_id)
             result = await session.execute(stmt)
             return result.scalar_one_or_none() is not None
 
+    async def list_chat_ids(self) -> set[str]:
+        async with session_scope() as session:
+            result = await session.execute(select(AdminUserModel.chat_id))
+            return set(result.scalars().all())
+
     async def add(self, admin: AdminUserEntity) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             stmt = select(AdminUserModel.id).where(
                 AdminUserModel.chat_id == admin.chat_id
             )
@@ -87,7 +126,7 @@ class SqlAlchemyAdminRepository(AdminRepository):
             return True
 
     async def delete_by_chat_id(self, chat_id: str) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             stmt = select(AdminUserModel).where(AdminUserModel.chat_id == chat_id)
             result = await session.execute(stmt)
             admin = result.scalar_one_or_none()
@@ -100,43 +139,53 @@ class SqlAlchemyAdminRepository(AdminRepository):
 
 class SqlAlchemyWorkerRepository(WorkerRepository):
     async def get_by_fullname(self, full_name: str) -> WorkerEntity | None:
-        async with async_session() as session:
-            stmt = select(WorkerModel).where(WorkerModel.full_name == full_name)
+        async with session_scope() as session:
+            stmt = select(*WORKER_COLUMNS).where(WorkerModel.full_name == full_name)
+            result = await session.execute(stmt)
+            return row_to_entity(WorkerEntity, result.one_or_none())
+
+    async def get_many_by_fullnames(self, full_names: Iterable[str]) -> dict[str, WorkerEntity]:
+        full_names = set(full_names)
+        if not full_names:
+            return {}
+        async with session_scope() as session:
+            stmt = select(*WORKER_COLUMNS).where(WorkerModel.full_name.in_(full_names))
             result = await session.execute(stmt)
-            return to_worker_entity(result.scalar_one_or_none())
+            workers = rows_to_entities(WorkerEntity, result.all())
+            return {worker.full_name: worker for worker in workers}
 
     async def get_by_chat_id(self, chat_id: int) -> WorkerEntity | None:
-        async with async_session() as session:
-            stmt = select(WorkerModel).where(WorkerModel.chat_id == str(chat_id))
+        async with session_scope() as session:
+            stmt = select(*WORKER_COLUMNS).where(WorkerModel.chat_id == str(chat_id))
             result = await session.execute(stmt)
-            return to_worker_entity(result.scalar_one_or_none())
+            return row_to_entity(WorkerEntity, result.one_or_none())
 
     async def get_by_id(self, worker_id: int) -> WorkerEntity | None:
-        async with async_session() as session:
-            stmt = select(WorkerModel).where(WorkerModel.id == worker_id)
+        async with session_scope() as session:
+            stmt = select(*WORKER_COLUMNS).where(WorkerModel.id == worker_id)
             result = await session.execute(stmt)
-            return to_worker_entity(result.scalar_one_or_none())
+            return row_to_entity(WorkerEntity, result.one_or_none())
 
     async def list_all(self):
-        async with async_session() as session:
-            result = await session.execute(select(WorkerModel))
-            return [to_worker_entity(item) for item in result.scalars().all()]
+        async with session_scope() as session:
+            result = await session.execute(select(*WORKER_COLUMNS))
+            return rows_to_entities(WorkerEntity, result.all())
 
     async def list_unregistered(self):
-        async with async_session() as session:
-            stmt = select(WorkerModel).where(
+        async with session_scope() as session:
+            stmt = select(*WORKER_COLUMNS).where(
                 (WorkerModel.chat_id.is_(None)) | (WorkerModel.chat_id == "")
             )
             result = await session.execute(stmt)
-            return [to_worker_entity(item) for item in result.scalars().all()]
+            return rows_to_entities(WorkerEntity, result.all())
 
     async def add(self, worker: WorkerEntity) -> None:
-        async with async_session() as session:
+        async with session_scope() as session:
             session.add(from_worker_entity(worker))
             await session.commit()
 
     async def set_chat_id(self, worker_id: int, chat_id: str) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             existing_stmt = select(WorkerModel).where(WorkerModel.chat_id == chat_id)
             result = await session.execute(existing_stmt)
             if result.scalar_one_or_none():
@@ -152,55 +201,151 @@ class SqlAlchemyWorkerRepository(WorkerRepository):
             return True
 
     async def set_file_id(self, worker_id: int, file_id: str) -> None:
-        async with async_session() as session:
+        async with session_scope() as session:
             worker = await session.get(WorkerModel, worker_id)
             if worker:
                 worker.file_id = file_id
                 await session.commit()
 
+    async def upsert_many(self, workers: Sequence[WorkerEntity]) -> tuple[int, int]:
+        rows = {}
+        for worker in workers:
+            rows.setdefault(
+                worker.full_name,
+                {
+                    "full_name": worker.full_name,
+                    "file_id": worker.file_id or None,
+                    "chat_id": worker.chat_id or None,
+                    "speciality": worker.speciality,
+                    "phone": worker.phone,
+                },
+            )
+        if not rows:
+            return 0, 0
+
+        stmt = pg_insert(WorkerModel).values(list(rows.values()))
+        excluded = stmt.excluded
+
+        # Mirrors set_chat_id/set_file_id: only fill blanks, never steal a chat id.
+        fill_chat_id = and_(
+            or_(WorkerModel.chat_id.is_(None), WorkerModel.chat_id == ""),
+            excluded.chat_id.is_not(None),
+            text(
+                "NOT EXISTS (SELECT 1 FROM workers AS taken"
+                " WHERE taken.chat_id = excluded.chat_id)"
+            ),
+        )
+        fill_file_id = and_(
+            or_(WorkerModel.file_id.is_(None), WorkerModel.file_id == ""),
+            excluded.file_id.is_not(None),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[WorkerModel.full_name],
+            set_={
+                "chat_id": case((fill_chat_id, excluded.chat_id), else_=WorkerModel.chat_id),
+                "file_id": case((fill_file_id, excluded.file_id), else_=WorkerModel.file_id),
+            },
+            where=or_(fill_chat_id, fill_file_id),
+        ).returning(literal_column("xmax = 0").label("inserted"))
+
+        async with session_scope() as session:
+            result = await session.execute(stmt)
+            inserted = result.scalars().all()
+            await session.commit()
+
+        created = sum(1 for flag in inserted if flag)
+        return created, len(inserted) - created
+
 
 class SqlAlchemySurveyRepository(SurveyRepository):
     async def get_by_name(self, name: str) -> SurveyEntity | None:
-        async with async_session() as session:
-            stmt = select(SurveyModel).where(SurveyModel.speciality == name)
+        async with session_scope() as session:
+            stmt = select(*SURVEY_COLUMNS).where(SurveyModel.speciality == name)
+            result = await session.execute(stmt)
+            return row_to_entity(SurveyEntity, result.one_or_none())
+
+    async def get_by_id(self, survey_id: int) -> SurveyEntity | None:
+        async with session_scope() as session:
+            stmt = select(*SURVEY_COLUMNS).where(SurveyModel.id == survey_id)
+            result = await session.execute(stmt)
+            return row_to_entity(SurveyEntity, result.one_or_none())
+
+    async def get_many_by_names(self, names: Iterable[str]) -> dict[str, SurveyEntity]:
+        names = set(names)
+        if not names:
+            return {}
+        async with session_scope() as session:
+            stmt = select(*SURVEY_COLUMNS).where(SurveyModel.speciality.in_(names))
             result = await session.execute(stmt)
-            return to_survey_entity(result.scalar_one_or_none())
+            surveys = rows_to_entities(SurveyEntity, result.all())
+            return {survey.speciality: survey for survey in surveys}
+
+    async def list_all(self):
+        async with session_scope() as session:
+            result = await session.execute(select(*SURVEY_COLUMNS).order_by(SurveyModel.id))
+            return rows_to_entities(SurveyEntity, result.all())
 
     async def clear_all(self) -> None:
-        async with async_session() as session:
+        async with session_scope() as session:
             await session.execute(delete(SurveyModel))
             await session.commit()
 
     async def add(self, survey: SurveyEntity) -> None:
-        async with async_session() as session:
+        async with session_scope() as session:
             session.add(from_survey_entity(survey))
             await session.commit()
 
+    async def replace_all(self, surveys: Sequence[SurveyEntity]) -> None:
+        async with session_scope() as session:
+            await session.execute(delete(SurveyModel))
+            if surveys:
+                await session.execute(
+                    insert(SurveyModel),
+                    [
+                        {column.key: getattr(survey, column.key) for column in SURVEY_COLUMNS}
+                        for survey in surveys
+                    ],
+                )
+            await session.commit()
+
 
 class SqlAlchemyPairRepository(PairRepository):
-    async def list_ready_by_date(self, date: str):
-        async with async_session() as session:
+    async def get_by_id(self, pair_id: int) -> PairEntity | None:
+        async with session_scope() as session:
+            result = await session.execute(select(*PAIR_COLUMNS).where(PairModel.id == pair_id))
+            return row_to_entity(PairEntity, result.one_or_none())
+
+    async def get_many_by_ids(self, pair_ids: Iterable[int]) -> dict[int, PairEntity]:
+        pair_ids = set(pair_ids)
+        if not pair_ids:
+            return {}
+        async with session_scope() as session:
+            result = await session.execute(select(*PAIR_COLUMNS).where(PairModel.id.in_(pair_ids)))
+            return {pair.id: pair for pair in rows_to_entities(PairEntity, result.all())}
+
+    async def list_ready_by_date(self, date: dt.date):
+        async with session_scope() as session:
             stmt = (
-                select(PairModel)
+                select(*PAIR_COLUMNS)
                 .where(PairModel.status == "ready", PairModel.date <= date)
                 .order_by(PairModel.id)
             )
             result = await session.execute(stmt)
-            return [to_pair_entity(item) for item in result.scalars().all()]
+            return rows_to_entities(PairEntity, result.all())
 
     async def next_ready_for_subject(self, subject: str) -> PairEntity | None:
-        async with async_session() as session:
+        async with session_scope() as session:
             stmt = (
-                select(PairModel)
+                select(*PAIR_COLUMNS)
                 .where(PairModel.subject == subject, PairModel.status == "ready")
                 .order_by(PairModel.id)
                 .limit(1)
             )
             result = await session.execute(stmt)
-            return to_pair_entity(result.scalar_one_or_none())
+            return row_to_entity(PairEntity, result.one_or_none())
 
     async def update_status(self, pair_id: int, status: str) -> None:
-        async with async_session() as session:
+        async with session_scope() as session:
             stmt = (
                 update(PairModel)
                 .where(PairModel.id == pair_id)
@@ -209,8 +354,28 @@ class SqlAlchemyPairRepository(PairRepository):
             await session.execute(stmt)
             await session.commit()
 
+    async def claim_ready(self, pair_id: int) -> bool:
+        """Move a pair from "ready" to "in_progress"; False if it was not ready."""
+        async with session_scope() as session:
+            result = await session.execute(
+                update(PairModel)
+                .where(PairModel.id == pair_id, PairModel.status == "ready")
+                .values(status="in_progress")
+            )
+            await session.commit()
+            return result.rowcount > 0
+
+    async def update_status_many(self, pair_ids: Sequence[int], status: str) -> None:
+        if not pair_ids:
+            return
+        async with session_scope() as session:
+            await session.execute(
+                update(PairModel).where(PairModel.id.in_(pair_ids)).values(status=status)
+            )
+            await session.commit()
+
     async def reset_incomplete(self) -> None:
-        async with async_session() as session:
+        async with session_scope() as session:
             stmt = (
                 update(PairModel)
                 .where(PairModel.status == "in_progress")
@@ -220,49 +385,204 @@ class SqlAlchemyPairRepository(PairRepository):
             await session.commit()
 
     async def add(self, pair: PairEntity) -> None:
-        async with async_session() as session:
+        async with session_scope() as session:
             session.add(from_pair_entity(pair))
             await session.commit()
 
     async def clear_all(self) -> None:
-        async with async_session() as session:
+        async with session_scope() as session:
             await session.execute(delete(PairModel))
             await session.commit()
 
 
+class SqlAlchemySurveyOutboxRepository(SurveyOutboxRepository):
+    async def enqueue(self, pair_ids: Sequence[int]) -> None:
+        """Queue a send per pair; a pair already pending keeps its entry.
+
+        An entry that was sent or gave up earlier starts over, since the
+        pair only comes back here after being reset to "ready".
+        """
+        if not pair_ids:
+            return
+        stmt = pg_insert(SurveyOutboxModel).values(
+            [
+                {
+                    "pair_id": pair_id,
+                    "status": "pending",
+                    "attempts": 0,
+                    "next_attempt_at": func.now(),
+                    "created_at": func.now(),
+                }
+                for pair_id in pair_ids
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SurveyOutboxModel.pair_id],
+            set_={
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": stmt.excluded.next_attempt_at,
+                "last_error": None,
+                "sent_at": None,
+            },
+            where=SurveyOutboxModel.status != "pending",
+        )
+        async with session_scope() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    async def claim_due(self, limit: int, lease: float) -> list[OutboxEntryEntity]:
+        """Take up to ``limit`` due entries, counting an attempt for each.
+
+        Claimed entries are not due again for ``lease`` seconds, so another
+        replica skips them; an entry whose sender died is retried then.
+        """
+        due = (
+            select(SurveyOutboxModel.id)
+            .where(
+                SurveyOutboxModel.status == "pending",
+                SurveyOutboxModel.next_attempt_at <= func.now(),
+            )
+            .order_by(SurveyOutboxModel.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(SurveyOutboxModel)
+            .where(SurveyOutboxModel.id.in_(due))
+            .values(
+                attempts=SurveyOutboxModel.attempts + 1,
+                next_attempt_at=func.now() + dt.timedelta(seconds=lease),
+            )
+            .returning(*OUTBOX_COLUMNS)
+        )
+        async with session_scope() as session:
+            result = await session.execute(stmt)
+            entries = rows_to_entities(OutboxEntryEntity, result.all())
+            await session.commit()
+            return entries
+
+    async def mark_done(self, entry_id: int, status: str, error: str | None = None) -> None:
+        async with session_scope() as session:
+            await session.execute(
+                update(SurveyOutboxModel)
+                .where(SurveyOutboxModel.id == entry_id)
+                .values(
+                    status=status,
+                    last_error=error,
+                    sent_at=func.now() if status == "sent" else None,
+                )
+            )
+            await session.commit()
+
+    async def retry_later(self, entry_id: int, error: str, delay: float) -> None:
+        async with session_scope() as session:
+            await session.execute(
+                update(SurveyOutboxModel)
+                .where(SurveyOutboxModel.id == entry_id)
+                .values(
+                    last_error=error,
+                    next_attempt_at=func.now() + dt.timedelta(seconds=delay),
+                )
+            )
+            await session.commit()
+
+
 class SqlAlchemyAnswerRepository(AnswerRepository):
     async def save(self, answer: AnswerEntity) -> None:
-        async with async_session() as session:
+        async with session_scope() as session:
             session.add(from_answer_entity(answer))
             await session.commit()
 
-    async def list_all(self):
-        async with async_session() as session:
-            result = await session.execute(select(AnswerModel))
-            return [to_answer_entity(item) for item in result.scalars().all()]
+    def stream_all(self, batch_size: int = 500) -> AsyncIterator[AnswerEntity]:
+        return self._stream(select(*ANSWER_COLUMNS), batch_size)
+
+    def stream_between(
+        self,
+        start: dt.date,
+        end: dt.date,
+        objects: Iterable[str] | None = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[AnswerEntity]:
+        stmt = select(*ANSWER_COLUMNS).where(
+            AnswerModel.survey_date >= start,
+            AnswerModel.survey_date <= end,
+        )
+        if objects is not None:
+            stmt = stmt.where(AnswerModel.object.in_(list(objects)))
+        return self._stream(stmt, batch_size)
+
+    def stream_for_object(
+        self, object_name: str, batch_size: int = 500
+    ) -> AsyncIterator[AnswerEntity]:
+        stmt = select(*ANSWER_COLUMNS).where(AnswerModel.object == object_name)
+        return self._stream(stmt, batch_size)
+
+    async def _stream(self, stmt, batch_size: int) -> AsyncIterator[AnswerEntity]:
+        # Server-side cursor: at most batch_size rows are held at a time.
+        stmt = stmt.order_by(AnswerModel.id).execution_options(yield_per=batch_size)
+        async with session_scope() as session:
+            result = await session.stream(stmt)
+            async for batch in result.partitions():
+                for row in batch:
+                    yield AnswerEntity(*row)
 
 
 class SqlAlchemyShiftRepository(ShiftRepository):
     async def clear_all(self) -> None:
-        async with async_session() as session:
+        async with session_scope() as session:
             await session.execute(delete(ShiftModel))
             await session.commit()
 
-    async def bulk_insert(self, records: list[tuple[str, str, str]]) -> None:
-        async with async_session() as session:
-            for doctor_name, date, shift_type in records:
-                session.add(
-                    ShiftModel(
-                        doctor_name=doctor_name,
-                        date=date,
-                        type=shift_type,
-                        manual=False,
+    BULK_COLUMNS = ("doctor_name", "date", "type", "manual")
+
+    async def bulk_insert(
+        self,
+        records: list[tuple[str, dt.date, str]],
+        method: str = "copy",
+    ) -> None:
+        rows = [
+            (doctor_name, date, shift_type, False)
+            for doctor_name, date, shift_type in records
+        ]
+        async with session_scope() as session:
+            conn = await session.connection()
+            if method == "copy" and not supports_copy(conn):
+                method = "executemany"
+
+            # Slots already present (uq_shifts_doctor_date_type) are skipped,
+            # so loading the same schedule twice adds nothing.
+            with report_throughput(ShiftModel.__tablename__, method, len(rows)):
+                if method == "copy":
+                    # COPY cannot skip conflicts: load a temp table, then insert.
+                    await conn.exec_driver_sql(
+                        f"CREATE TEMP TABLE {SHIFTS_LOAD_TABLE.name} "
+                        "(LIKE shifts INCLUDING DEFAULTS) ON COMMIT DROP"
                     )
-                )
-            await session.commit()
+                    await copy_records(conn, SHIFTS_LOAD_TABLE, self.BULK_COLUMNS, rows)
+                    await session.execute(
+                        pg_insert(ShiftModel)
+                        .from_select(
+                            self.BULK_COLUMNS,
+                            select(*(SHIFTS_LOAD_TABLE.c[name] for name in self.BULK_COLUMNS)),
+                        )
+                        .on_conflict_do_nothing()
+                    )
+                    await conn.exec_driver_sql(f"DROP TABLE {SHIFTS_LOAD_TABLE.name}")
+                elif method == "executemany":
+                    await session.execute(
+                        pg_insert(ShiftModel).on_conflict_do_nothing(),
+                        [dict(zip(self.BULK_COLUMNS, row)) for row in rows],
+                    )
+                else:
+                    session.add_all(
+                        ShiftModel(**dict(zip(self.BULK_COLUMNS, row))) for row in rows
+                    )
+                    await session.flush()
+                await session.commit()
 
-    async def list_free(self, date: str, shift_type: str) -> list[tuple[int, str]]:
-        async with async_session() as session:
+    async def list_free(self, date: dt.date, shift_type: str) -> list[tuple[int, str]]:
+        async with session_scope() as session:
             result = await session.execute(
                 select(ShiftModel.id, ShiftModel.doctor_name).where(
                     ShiftModel.date == date,
@@ -273,23 +593,25 @@ class SqlAlchemyShiftRepository(ShiftRepository):
             return [(row.id, row.doctor_name) for row in result.all()]
 
     async def get_by_id(self, shift_id: int) -> ShiftEntity | None:
-        async with async_session() as session:
-            shift = await session.get(ShiftModel, shift_id)
-            return to_shift_entity(shift)
+        async with session_scope() as session:
+            result = await session.execute(
+                select(*SHIFT_COLUMNS).where(ShiftModel.id == shift_id)
+            )
+            return row_to_entity(ShiftEntity, result.one_or_none())
 
-    async def get_for_assistant(self, assistant_id: int, date: str, shift_type: str) -> ShiftEntity | None:
-        async with async_session() as session:
+    async def get_for_assistant(self, assistant_id: int, date: dt.date, shift_type: str) -> ShiftEntity | None:
+        async with session_scope() as session:
             result = await session.execute(
-                select(ShiftModel).where(
+                select(*SHIFT_COLUMNS).where(
                     ShiftModel.assistant_id == assistant_id,
                     ShiftModel.date == date,
                     ShiftModel.type == shift_type,
                 )
             )
-            return to_shift_entity(result.scalar_one_or_none())
+            return row_to_entity(ShiftEntity, result.one_or_none())
 
-    async def remove_assistant(self, assistant_id: int, date: str, shift_type: str) -> None:
-        async with async_session() as session:
+    async def remove_assistant(self, assistant_id: int, date: dt.date, shift_type: str) -> None:
+        async with session_scope() as session:
             stmt = (
                 update(ShiftModel)
                 .where(
@@ -302,27 +624,33 @@ class SqlAlchemyShiftRepository(ShiftRepository):
             await session.execute(stmt)
             await session.commit()
 
-    async def add_by_id(self, assistant_id: int, assistant_name: str, shift_id: int) -> bool:
-        async with async_session() as session:
-            shift = await session.get(ShiftModel, shift_id)
-            if not shift or shift.assistant_id is not None:
-                return False
-
-            already_stmt = await session.execute(
-                select(ShiftModel).where(
-                    ShiftModel.assistant_id == assistant_id,
-                    ShiftModel.date == shift.date,
-                    ShiftModel.type == shift.type,
-                )
+    async def add_by_id(
+        self,
+        assistant_id: int,
+        assistant_name: str,
+        shift_id: int,
+        date: dt.date,
+        shift_type: str,
+    ) -> ShiftEntity | None:
+        other = aliased(ShiftModel)
+        stmt = (
+            update(ShiftModel)
+            .where(
+                ShiftModel.id == shift_id,
+                ShiftModel.date == date,
+                ShiftModel.type == shift_type,
+                ShiftModel.assistant_id.is_(None),
+                ~exists().where(
+                    other.assistant_id == assistant_id,
+                    other.date == ShiftModel.date,
+                    other.type == ShiftModel.type,
+                ),
             )
-            if already_stmt.scalar_one_or_none():
-                return False
-
-            shift.assistant_id = assistant_id
-            shift.assistant_name = assistant_name
-            shift.manual = False
-            await session.commit()
-            return True
+            .values(assistant_id=assistant_id, assistant_name=assistant_name, manual=False)
+            .returning(*SHIFT_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        return row_to_entity(ShiftEntity, await self._write_one(stmt))
 
     async def add_manual(
         self,
@@ -330,55 +658,72 @@ class SqlAlchemyShiftRepository(ShiftRepository):
         assistant_name: str,
         doctor_name: str,
         shift_type: str,
-        date: str,
+        date: dt.date,
     ) -> bool:
-        async with async_session() as session:
-            already = await session.execute(
-                select(ShiftModel).where(
-                    ShiftModel.assistant_id == assistant_id,
-                    ShiftModel.date == date,
-                    ShiftModel.type == shift_type,
-                )
-            )
-            if already.scalar_one_or_none():
-                return False
-
-            shift = ShiftModel(
-                assistant_id=assistant_id,
-                assistant_name=assistant_name,
-                doctor_name=doctor_name,
-                type=shift_type,
-                date=date,
-                manual=True,
-            )
-            session.add(shift)
-            await session.commit()
-            return True
-
-    async def add_slot(self, doctor_name: str, date: str, shift_type: str) -> bool:
-        async with async_session() as session:
-            existing = await session.execute(
-                select(ShiftModel.id).where(
-                    ShiftModel.doctor_name == doctor_name,
-                    ShiftModel.date == date,
-                    ShiftModel.type == shift_type,
-                )
+        stmt = (
+            insert(ShiftModel)
+            .from_select(
+                ["assistant_id", "assistant_name", "doctor_name", "type", "date", "manual"],
+                select(
+                    literal(assistant_id, BigInteger),
+                    literal(assistant_name, Text),
+                    literal(doctor_name, Text),
+                    literal(shift_type, String),
+                    literal(date, Date),
+                    literal(True),
+                ).where(
+                    ~exists().where(
+                        ShiftModel.assistant_id == assistant_id,
+                        ShiftModel.date == date,
+                        ShiftModel.type == shift_type,
+                    )
+                ),
             )
-            if existing.scalar_one_or_none():
-                return False
-
-            shift = ShiftModel(
-                doctor_name=doctor_name,
-                date=date,
-                type=shift_type,
-                manual=False,
+            .returning(ShiftModel.id)
+        )
+        return await self._write_one(stmt) is not None
+
+    async def add_slot(self, doctor_name: str, date: dt.date, shift_type: str) -> bool:
+        stmt = (
+            insert(ShiftModel)
+            .from_select(
+                ["doctor_name", "date", "type", "manual"],
+                select(
+                    literal(doctor_name, Text),
+                    literal(date, Date),
+                    literal(shift_type, String),
+                    literal(False),
+                ).where(
+                    ~exists().where(
+                        ShiftModel.doctor_name == doctor_name,
+                        ShiftModel.date == date,
+                        ShiftModel.type == shift_type,
+                    )
+                ),
             )
-            session.add(shift)
+            .returning(ShiftModel.id)
+        )
+        return await self._write_one(stmt) is not None
+
+    async def _write_one(self, stmt):
+        """Run one conditional statement; its RETURNING row, or None if nothing was written.
+
+        The savepoint keeps a lost race (a unique violation on
+        uq_shifts_assistant_date_type or uq_shifts_doctor_date_type) from
+        aborting the caller's unit of work.
+        """
+        async with session_scope() as session:
+            try:
+                async with session.begin_nested():
+                    result = await session.execute(stmt)
+                    row = result.one_or_none()
+            except IntegrityError:
+                return None
             await session.commit()
-            return True
+            return row
 
     async def delete_by_id(self, shift_id: int) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             shift = await session.get(ShiftModel, shift_id)
             if not shift:
                 return False
@@ -386,40 +731,59 @@ class SqlAlchemyShiftRepository(ShiftRepository):
             await session.commit()
             return True
 
-    async def list_by_date(self, date: str):
-        async with async_session() as session:
+    async def list_by_date(self, date: dt.date):
+        async with session_scope() as session:
+            result = await session.execute(
+                select(*SHIFT_COLUMNS).where(ShiftModel.date == date)
+            )
+            return rows_to_entities(ShiftEntity, result.all())
+
+    async def list_assigned_since(self, since: dt.date):
+        async with session_scope() as session:
             result = await session.execute(
-                select(ShiftModel).where(ShiftModel.date == date)
+                select(*SHIFT_COLUMNS).where(
+                    ShiftModel.date >= since,
+                    ShiftModel.assistant_id.is_not(None),
+                )
             )
-            return [to_shift_entity(item) for item in result.scalars().all()]
+            return rows_to_entities(ShiftEntity, result.all())
 
     async def list_all(self):
-        async with async_session() as session:
-            result = await session.execute(select(ShiftModel))
-            return [to_shift_entity(item) for item in result.scalars().all()]
+        async with session_scope() as session:
+            result = await session.execute(select(*SHIFT_COLUMNS))
+            return rows_to_entities(ShiftEntity, result.all())
 
 
 class SqlAlchemyCabinetRepository(CabinetRepository):
     async def list_all(self, include_archived: bool = False):
-        async with async_session() as session:
-            stmt = select(CabinetModel).order_by(CabinetModel.name)
+        async with session_scope() as session:
+            stmt = select(*CABINET_COLUMNS).order_by(CabinetModel.name)
             if not include_archived:
                 stmt = stmt.where(CabinetModel.is_active.is_(True))
             result = await session.execute(stmt)
-            return [to_cabinet_entity(item) for item in result.scalars().all()]
+            return rows_to_entities(CabinetEntity, result.all())
 
     async def get_by_id(self, cabinet_id: int) -> CabinetEntity | None:
-        async with async_session() as session:
-            cabinet = await session.get(CabinetModel, cabinet_id)
-            return to_cabinet_entity(cabinet)
-
-    async def add(self, cabinet: CabinetEntity) -> None:
-        async with async_session() as session:
-            session.add(from_cabinet_entity(cabinet))
+        async with session_scope() as session:
+            result = await session.execute(
+                select(*CABINET_COLUMNS).where(CabinetModel.id == cabinet_id)
+            )
+            return row_to_entity(CabinetEntity, result.one_or_none())
+
+    async def add(self, cabinet: CabinetEntity) -> CabinetEntity:
+        stmt = (
+            insert(CabinetModel)
+            .values(name=cabinet.name, is_active=cabinet.is_active)
+            .returning(*CABINET_COLUMNS)
+        )
+        async with session_scope() as session:
+            result = await session.execute(stmt)
+            created = row_to_entity(CabinetEntity, result.one())
             await session.commit()
+            return created
 
     async def update_name(self, cabinet_id: int, name: str) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             cabinet = await session.get(CabinetModel, cabinet_id)
             if not cabinet:
                 return False
@@ -428,7 +792,7 @@ class SqlAlchemyCabinetRepository(CabinetRepository):
             return True
 
     async def set_active(self, cabinet_id: int, is_active: bool) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             cabinet = await session.get(CabinetModel, cabinet_id)
             if not cabinet:
                 return False
@@ -437,7 +801,7 @@ class SqlAlchemyCabinetRepository(CabinetRepository):
             return True
 
     async def delete(self, cabinet_id: int) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             cabinet = await session.get(CabinetModel, cabinet_id)
             if not cabinet:
                 return False
@@ -446,7 +810,7 @@ class SqlAlchemyCabinetRepository(CabinetRepository):
             return True
 
     async def has_instruments(self, cabinet_id: int) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             result = await session.execute(
                 select(InstrumentModel.id)
                 .where(InstrumentModel.cabinet_id == cabinet_id)
@@ -457,24 +821,34 @@ class SqlAlchemyCabinetRepository(CabinetRepository):
 
 class SqlAlchemyInstrumentRepository(InstrumentRepository):
     async def list_by_cabinet(self, cabinet_id: int, include_archived: bool = False):
-        async with async_session() as session:
+        async with session_scope() as session:
             stmt = (
-                select(InstrumentModel)
+                select(*INSTRUMENT_COLUMNS)
                 .where(InstrumentModel.cabinet_id == cabinet_id)
                 .order_by(InstrumentModel.name)
             )
             if not include_archived:
                 stmt = stmt.where(InstrumentModel.is_active.is_(True))
             result = await session.execute(stmt)
-            return [to_instrument_entity(item) for item in result.scalars().all()]
+            return rows_to_entities(InstrumentEntity, result.all())
+
+    async def list_all(self, include_archived: bool = False):
+        async with session_scope() as session:
+            stmt = select(*INSTRUMENT_COLUMNS).order_by(InstrumentModel.name)
+            if not include_archived:
+                stmt = stmt.where(InstrumentModel.is_active.is_(True))
+            result = await session.execute(stmt)
+            return rows_to_entities(InstrumentEntity, result.all())
 
     async def get_by_id(self, instrument_id: int) -> InstrumentEntity | None:
-        async with async_session() as session:
-            instrument = await session.get(InstrumentModel, instrument_id)
-            return to_instrument_entity(instrument)
+        async with session_scope() as session:
+            result = await session.execute(
+                select(*INSTRUMENT_COLUMNS).where(InstrumentModel.id == instrument_id)
+            )
+            return row_to_entity(InstrumentEntity, result.one_or_none())
 
     async def update_cabinet(self, instrument_id: int, cabinet_id: int) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             instrument = await session.get(InstrumentModel, instrument_id)
             if not instrument:
                 return False
@@ -482,13 +856,24 @@ class SqlAlchemyInstrumentRepository(InstrumentRepository):
             await session.commit()
             return True
 
-    async def add(self, instrument: InstrumentEntity) -> None:
-        async with async_session() as session:
-            session.add(from_instrument_entity(instrument))
+    async def add(self, instrument: InstrumentEntity) -> InstrumentEntity:
+        stmt = (
+            insert(InstrumentModel)
+            .values(
+                name=instrument.name,
+                cabinet_id=instrument.cabinet_id,
+                is_active=instrument.is_active,
+            )
+            .returning(*INSTRUMENT_COLUMNS)
+        )
+        async with session_scope() as session:
+            result = await session.execute(stmt)
+            created = row_to_entity(InstrumentEntity, result.one())
             await session.commit()
+            return created
 
     async def update_name(self, instrument_id: int, name: str) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             instrument = await session.get(InstrumentModel, instrument_id)
             if not instrument:
                 return False
@@ -497,7 +882,7 @@ class SqlAlchemyInstrumentRepository(InstrumentRepository):
             return True
 
     async def set_active(self, instrument_id: int, is_active: bool) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             instrument = await session.get(InstrumentModel, instrument_id)
             if not instrument:
                 return False
@@ -506,7 +891,7 @@ class SqlAlchemyInstrumentRepository(InstrumentRepository):
             return True
 
     async def delete(self, instrument_id: int) -> bool:
-        async with async_session() as session:
+        async with session_scope() as session:
             instrument = await session.get(InstrumentModel, instrument_id)
             if not instrument:
                 return False
@@ -517,30 +902,124 @@ class SqlAlchemyInstrumentRepository(InstrumentRepository):
 
 class SqlAlchemyInstrumentMoveRepository(InstrumentMoveRepository):
     async def add(self, move: InstrumentMoveEntity) -> None:
-        async with async_session() as session:
+        async with session_scope() as session:
             session.add(from_instrument_move_entity(move))
             await session.commit()
 
+    async def transfer(self, move: InstrumentMoveEntity, sterilization_name: str) -> bool:
+        """Move the instrument and record the move, or do nothing.
+
+        The first statement locks the instrument row and fetches everything the
+        rules need; the second updates the cabinet and inserts the move. A
+        concurrent transfer of the same instrument waits on the lock and then
+        sees the new cabinet, so only one of them is recorded.
+        """
+        if move.from_cabinet_id == move.to_cabinet_id:
+            return False
+
+        last_move = (
+            select(InstrumentMoveModel.from_cabinet_id, InstrumentMoveModel.to_cabinet_id)
+            .where(InstrumentMoveModel.instrument_id == move.instrument_id)
+            .order_by(InstrumentMoveModel.id.desc())
+            .limit(1)
+            .subquery()
+        )
+        state_stmt = (
+            select(
+                InstrumentModel.cabinet_id,
+                select(CabinetModel.id)
+                .where(CabinetModel.id == move.to_cabinet_id)
+                .scalar_subquery()
+                .label("target_id"),
+                select(CabinetModel.id)
+                .where(
+                    CabinetModel.is_active.is_(True),
+                    func.lower(func.btrim(CabinetModel.name)) == sterilization_name.casefold(),
+                )
+                .order_by(CabinetModel.name)
+                .limit(1)
+                .scalar_subquery()
+                .label("sterilization_id"),
+                select(last_move.c.from_cabinet_id).scalar_subquery().label("last_from_id"),
+                select(last_move.c.to_cabinet_id).scalar_subquery().label("last_to_id"),
+            )
+            .where(InstrumentModel.id == move.instrument_id)
+            .with_for_update(of=InstrumentModel)
+        )
+
+        async with session_scope() as session:
+            state = (await session.execute(state_stmt)).one_or_none()
+            if not _transfer_allowed(move, state):
+                await session.commit()
+                return False
+
+            moved = (
+                update(InstrumentModel)
+                .where(InstrumentModel.id == move.instrument_id)
+                .values(cabinet_id=move.to_cabinet_id)
+                .returning(InstrumentModel.id)
+                .cte("moved")
+            )
+            record_stmt = insert(InstrumentMoveModel).from_select(
+                [
+                    "instrument_id",
+                    "from_cabinet_id",
+                    "to_cabinet_id",
+                    "before_photo_id",
+                    "after_photo_id",
+                    "moved_by_chat_id",
+                    "moved_at",
+                ],
+                select(
+                    moved.c.id,
+                    literal(move.from_cabinet_id, BigInteger),
+                    literal(move.to_cabinet_id, BigInteger),
+                    literal(move.before_photo_id, String),
+                    literal(move.after_photo_id, String),
+                    literal(move.moved_by_chat_id, String),
+                    literal(move.moved_at, DateTime(timezone=True)),
+                ),
+            )
+            await session.execute(record_stmt)
+            await session.commit()
+            return True
+
     async def list_recent(self, limit: int = 20):
-        async with async_session() as session:
+        async with session_scope() as session:
             result = await session.execute(
-                select(InstrumentMoveModel)
+                select(*INSTRUMENT_MOVE_COLUMNS)
                 .order_by(InstrumentMoveModel.id.desc())
                 .limit(limit)
             )
-            return [to_instrument_move_entity(item) for item in result.scalars().all()]
+            return rows_to_entities(InstrumentMoveEntity, result.all())
 
     async def get_last_for_instrument(self, instrument_id: int):
-        async with async_session() as session:
+        async with session_scope() as session:
             result = await session.execute(
-                select(InstrumentMoveModel)
+                select(*INSTRUMENT_MOVE_COLUMNS)
                 .where(InstrumentMoveModel.instrument_id == instrument_id)
                 .order_by(InstrumentMoveModel.id.desc())
                 .limit(1)
             )
-            return to_instrument_move_entity(result.scalar_one_or_none())
+            return row_to_entity(InstrumentMoveEntity, result.one_or_none())
 
     async def get_by_id(self, move_id: int) -> InstrumentMoveEntity | None:
-        async with async_session() as session:
-            move = await session.get(InstrumentMoveModel, move_id)
-            return to_instrument_move_entity(move)
+        async with session_scope() as session:
+            result = await session.execute(
+                select(*INSTRUMENT_MOVE_COLUMNS).where(InstrumentMoveModel.id == move_id)
+            )
+            return row_to_entity(InstrumentMoveEntity, result.one_or_none())
+
+
+def _transfer_allowed(move: InstrumentMoveEntity, state) -> bool:
+    if state is None or state.cabinet_id != move.from_cabinet_id:
+        return False
+    if state.target_id is None or state.sterilization_id is None:
+        return False
+    if move.from_cabinet_id != state.sterilization_id:
+        # Anything that leaves a regular cabinet goes to sterilization first.
+        return move.to_cabinet_id == state.sterilization_id
+    if state.last_to_id == state.sterilization_id:
+        # From sterilization an instrument returns to where it came from.
+        return state.last_from_id == move.to_cabinet_id
+    return True
@@ -0,0 +1,194 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import AsyncIterator, Awaitable, Callable, ParamSpec, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.infrastructure.db.engine import async_session, get_engine
+
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class UnitOfWork:
+    """One connection and one transaction shared by every repository call in a scope.
+
+    The connection is checked out lazily, so scopes that never touch the
+    database cost nothing. ``commit`` may also run midway: it returns the
+    connection to the pool, and the next repository call starts a new
+    transaction on a fresh checkout.
+    """
+
+    def __init__(self):
+        self._connection: AsyncConnection | None = None
+        self._has_writes = False
+        self._rollback_callbacks: list[Callable[[], None]] = []
+        self._commit_callbacks: list[Callable[[], Awaitable[None]]] = []
+
+    async def connection(self) -> AsyncConnection:
+        if self._connection is None:
+            self._connection = await get_engine().connect()
+            event.listen(self._connection.sync_connection, "after_cursor_execute", self._note_write)
+            await self._connection.begin()
+        return self._connection
+
+    @property
+    def has_writes(self) -> bool:
+        """Whether the open transaction has run an INSERT, UPDATE or DELETE."""
+        return self._has_writes
+
+    def _note_write(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None and (context.isinsert or context.isupdate or context.isdelete):
+            self._has_writes = True
+
+    async def commit(self) -> None:
+        if self._connection is not None:
+            await self._connection.commit()
+            await self.close()
+        # Rows written so far are durable now; only later writes can roll back.
+        self._rollback_callbacks = []
+        callbacks, self._commit_callbacks = self._commit_callbacks, []
+        for callback in callbacks:
+            await callback()
+
+    async def rollback(self) -> None:
+        if self._connection is not None:
+            await self._connection.rollback()
+        self._commit_callbacks = []
+        callbacks, self._rollback_callbacks = self._rollback_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    @asynccontextmanager
+    async def savepoint(self) -> AsyncIterator[None]:
+        """Undo only the writes made inside if they fail; the unit carries on.
+
+        Without it a failed statement aborts the whole Postgres transaction,
+        and every later query in the unit fails too. Do not commit inside.
+        """
+        connection = await self.connection()
+        mark = len(self._rollback_callbacks)
+        try:
+            async with connection.begin_nested():
+                yield
+        except BaseException:
+            callbacks = self._rollback_callbacks[mark:]
+            del self._rollback_callbacks[mark:]
+            for callback in callbacks:
+                callback()
+            raise
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+        self._has_writes = False
+
+    def call_on_rollback(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` if the unit rolls back.
+
+        Caches use this to drop entries filled from rows the unit wrote but
+        never committed.
+        """
+        self._rollback_callbacks.append(callback)
+
+    def call_on_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Await ``callback`` once the unit has committed.
+
+        Used to tell other bot replicas about writes only when they are
+        visible to them.
+        """
+        self._commit_callbacks.append(callback)
+
+
+_current: ContextVar[UnitOfWork | None] = ContextVar("unit_of_work", default=None)
+
+
+def current_unit_of_work() -> UnitOfWork | None:
+    return _current.get()
+
+
+@asynccontextmanager
+async def unit_of_work(join: bool = True) -> AsyncIterator[UnitOfWork]:
+    """Open a unit, or join the one already current when ``join`` is true.
+
+    Concurrent tasks inherit the caller's unit but must not share its
+    connection; they pass ``join=False`` to get their own.
+    """
+    outer = _current.get()
+    if outer is not None and join:
+        yield outer
+        return
+
+    uow = UnitOfWork()
+    token = _current.set(uow)
+    try:
+        yield uow
+        await uow.commit()
+    except BaseException:
+        await uow.rollback()
+        raise
+    finally:
+        _current.reset(token)
+        await uow.close()
+
+
+async def commit_current_writes() -> None:
+    """Commit the current unit only if it has written something.
+
+    A unit that has only read keeps its connection and transaction, so
+    reads on either side of the call share one checkout.
+    """
+    uow = _current.get()
+    if uow is not None and uow.has_writes:
+        await uow.commit()
+
+
+async def commit_current_unit() -> None:
+    """Commit the current unit's work so far, if there is a unit.
+
+    Called before network calls, so no transaction or pooled connection
+    stays open while waiting on another service.
+    """
+    uow = _current.get()
+    if uow is not None:
+        await uow.commit()
+
+
+@asynccontextmanager
+async def savepoint() -> AsyncIterator[None]:
+    """``UnitOfWork.savepoint`` of the current unit; a no-op outside one."""
+    uow = _current.get()
+    if uow is None:
+        yield
+        return
+    async with uow.savepoint():
+        yield
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    uow = _current.get()
+    if uow is None:
+        async with async_session() as session:
+            yield session
+        return
+
+    # Sessions joined to the unit's connection never commit it themselves:
+    # repository commits only flush, the unit commits once on exit.
+    async with async_session(bind=await uow.connection()) as session:
+        yield session
+
+
+def run_in_unit_of_work(
+    func: Callable[P, Awaitable[R]],
+) -> Callable[P, Awaitable[R]]:
+    @wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        async with unit_of_work():
+            return await func(*args, **kwargs)
+
+    return wrapper
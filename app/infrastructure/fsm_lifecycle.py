@@ -0,0 +1,57 @@
+from collections import Counter
+
+from aiogram.fsm.storage.base import BaseStorage
+
+from app.infrastructure.db.fsm_storage import PostgresStorage
+from app.logger import setup_logger
+
+
+logger = setup_logger("fsm", "fsm.log")
+
+NO_STATE_GROUP = "-"
+
+
+def state_group(state: str | None) -> str:
+    return state.split(":", 1)[0] if state else NO_STATE_GROUP
+
+
+class StateLifecycle:
+    """Clears conversations nobody finishes.
+
+    Idleness is read from the storage itself, so every replica sees the
+    same last-write time and nothing is tracked in this process. With
+    ``PostgresStorage``, ``sweep`` deletes the rows not written for
+    ``idle_timeout`` seconds and then the least recently written beyond
+    ``max_states``. Redis keys expire on their own after ``idle_timeout``
+    (see ``create_fsm_storage``); the in-memory storage is never swept.
+    """
+
+    def __init__(self, storage: BaseStorage, idle_timeout: float, max_states: int):
+        self.storage = storage
+        self.idle_timeout = idle_timeout
+        self.max_states = max_states
+        self.evicted: Counter[str] = Counter()
+
+    async def counts(self) -> Counter[str] | None:
+        """Live states per state group (``"-"`` for data without a state),
+        or ``None`` if the storage cannot list them."""
+        if not isinstance(self.storage, PostgresStorage):
+            return None
+        counts: Counter[str] = Counter()
+        for state, count in (await self.storage.state_counts()).items():
+            counts[state_group(state)] += count
+        return counts
+
+    async def sweep(self) -> int:
+        if not isinstance(self.storage, PostgresStorage):
+            return 0
+        deleted = await self.storage.delete_idle(self.idle_timeout, self.max_states)
+        # Counted only once the delete has committed.
+        self.evicted.update(state_group(state) for state in deleted)
+        if deleted:
+            logger.info(
+                "Cleared %s idle FSM states: %s",
+                len(deleted),
+                dict(Counter(state_group(state) for state in deleted)),
+            )
+        return len(deleted)
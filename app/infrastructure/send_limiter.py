@@ -0,0 +1,234 @@
+import asyncio
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import (
+    CopyMessage,
+    EditMessageCaption,
+    EditMessageMedia,
+    EditMessageReplyMarkup,
+    EditMessageText,
+    ForwardMessage,
+    SendDocument,
+    SendMediaGroup,
+    SendMessage,
+    SendPhoto,
+    TelegramMethod,
+)
+from aiogram.methods.base import Response, TelegramType
+
+from app.logger import setup_logger
+
+
+logger = setup_logger("send_limiter", "bot.log")
+
+INTERACTIVE = 0
+BULK = 1
+
+LIMITED_METHODS = (
+    SendMessage,
+    SendPhoto,
+    SendDocument,
+    SendMediaGroup,
+    CopyMessage,
+    ForwardMessage,
+    EditMessageText,
+    EditMessageReplyMarkup,
+    EditMessageCaption,
+    EditMessageMedia,
+)
+
+# Idle per-chat buckets are dropped once there are more than this many.
+MAX_IDLE_CHATS = 1024
+
+_priority: ContextVar[int] = ContextVar("send_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def bulk_sends() -> Iterator[None]:
+    """Queue every send made inside (and in tasks started inside) behind replies."""
+    token = _priority.set(BULK)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@dataclass(slots=True)
+class TokenBucket:
+    rate: float
+    capacity: float
+    tokens: float
+    updated: float
+    paused_until: float = 0.0
+
+    @classmethod
+    def full(cls, rate: float, capacity: float) -> "TokenBucket":
+        return cls(rate=rate, capacity=capacity, tokens=capacity, updated=time.monotonic())
+
+    def wait_time(self, now: float) -> float:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def pause(self, now: float, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+
+    def idle(self, now: float) -> bool:
+        return self.wait_time(now) == 0.0 and self.tokens >= self.capacity
+
+
+@dataclass(slots=True, order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    chat_id: str | None = field(compare=False)
+    granted: asyncio.Future = field(compare=False)
+
+
+class SendLimiter(BaseRequestMiddleware):
+    """Bot session middleware pacing outgoing messages to Telegram's limits.
+
+    Every message send or edit takes a token from a global bucket
+    (``rate`` per second) and one from its chat's bucket (``chat_rate`` per
+    second for private chats, ``group_rate_per_minute`` for groups, both
+    allowing bursts of ``chat_burst``). Waiting sends are granted in
+    priority order: replies to users go first, sends made under
+    ``bulk_sends()`` take what is left, and a throttled chat does not hold
+    back the others. A ``RetryAfter`` from Telegram pauses the
+    chat's bucket for the requested time and the send is retried up to
+    ``max_retries`` times.
+    """
+
+    def __init__(
+        self,
+        rate: float = 30.0,
+        chat_rate: float = 1.0,
+        group_rate_per_minute: float = 20.0,
+        chat_burst: int = 3,
+        max_retries: int = 3,
+    ):
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate_per_minute / 60
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._global = TokenBucket.full(rate, capacity=rate)
+        self._chats: dict[str, TokenBucket] = {}
+        self._waiting: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._pump: asyncio.Task | None = None
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if not isinstance(method, LIMITED_METHODS):
+            return await make_request(bot, method)
+
+        chat_id = getattr(method, "chat_id", None)
+        chat_key = str(chat_id) if chat_id is not None else None
+        attempt = 0
+        while True:
+            await self.acquire(chat_key)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                logger.warning(
+                    "%s to %s hit flood control, retrying in %ss (attempt %s)",
+                    type(method).__name__,
+                    chat_key,
+                    exc.retry_after,
+                    attempt,
+                )
+                bucket = self._chat_bucket(chat_key) if chat_key else self._global
+                bucket.pause(time.monotonic(), exc.retry_after)
+
+    async def acquire(self, chat_id: str | None) -> None:
+        waiter = _Waiter(
+            priority=_priority.get(),
+            seq=next(self._seq),
+            chat_id=chat_id,
+            granted=asyncio.get_running_loop().create_future(),
+        )
+        self._waiting.append(waiter)
+        self._wake.set()
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._run())
+        try:
+            await waiter.granted
+        except asyncio.CancelledError:
+            if waiter in self._waiting:
+                self._waiting.remove(waiter)
+            raise
+
+    async def _run(self) -> None:
+        while self._waiting:
+            self._wake.clear()
+            now = time.monotonic()
+            wait = self._global.wait_time(now)
+            if not wait:
+                wait = self._grant_next(now)
+                if not wait:
+                    continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        self._prune(time.monotonic())
+
+    def _grant_next(self, now: float) -> float:
+        """Grant the first waiter whose chat is free; else how long until one is."""
+        soonest = None
+        for waiter in sorted(self._waiting):
+            bucket = self._chat_bucket(waiter.chat_id) if waiter.chat_id else None
+            wait = bucket.wait_time(now) if bucket is not None else 0.0
+            if wait:
+                soonest = wait if soonest is None else min(soonest, wait)
+                continue
+            self._waiting.remove(waiter)
+            if waiter.granted.done():
+                return 0.0
+            self._global.take()
+            if bucket is not None:
+                bucket.take()
+            waiter.granted.set_result(None)
+            return 0.0
+        return soonest or 0.0
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            rate = self.group_rate if chat_id.startswith("-") else self.chat_rate
+            bucket = TokenBucket.full(rate, capacity=self.chat_burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        if len(self._chats) <= MAX_IDLE_CHATS:
+            return
+        for chat_id in [chat_id for chat_id, bucket in self._chats.items() if bucket.idle(now)]:
+            del self._chats[chat_id]
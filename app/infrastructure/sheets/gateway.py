@@ -7,6 +7,9 @@ from oauth2client.service_account import ServiceAccountCredentials
 from app.config import SheetsSettings
 
 
+STAGING_SUFFIX = " (выгрузка)"
+
+
 class SheetsGateway:
     """Thin wrapper over gspread to isolate IO with Google Sheets."""
 
@@ -44,12 +47,39 @@ class SheetsGateway:
         return worksheet.get_all_values()[1:]
 
     # --- Writers ---
-    def export_answers(self, headers: list[str], rows: Iterable[list[str]]) -> None:
-        worksheet = self._require_answers_sheet(self.settings.answers_sheet)
-        worksheet.clear()
-        worksheet.append_row(headers)
-        if rows:
-            worksheet.append_rows(list(rows), value_input_option="RAW")
+    def start_answers_export(self, headers: list[str]) -> gspread.Worksheet:
+        """Create the staging sheet an answers export is appended to.
+
+        ``finish_answers_export`` swaps it in for the answers sheet once every
+        batch is written, so a failed export leaves the previous one in place.
+        """
+        spreadsheet = self._require_answers_spreadsheet()
+        title = f"{self.settings.answers_sheet}{STAGING_SUFFIX}"
+        try:
+            # Left behind by an export that died midway.
+            spreadsheet.del_worksheet(spreadsheet.worksheet(title))
+        except gspread.WorksheetNotFound:
+            pass
+        staging = spreadsheet.add_worksheet(title, rows=1, cols=len(headers))
+        staging.update(values=[headers], range_name="A1", value_input_option="RAW")
+        return staging
+
+    def append_answers(self, staging: gspread.Worksheet, rows: list[list[str]]) -> None:
+        staging.append_rows(rows, value_input_option="RAW")
+
+    def finish_answers_export(self, staging: gspread.Worksheet) -> None:
+        spreadsheet = self._require_answers_spreadsheet()
+        try:
+            current = spreadsheet.worksheet(self.settings.answers_sheet)
+        except gspread.WorksheetNotFound:
+            current = None
+        if current is not None:
+            staging.update_index(current.index)
+            spreadsheet.del_worksheet(current)
+        staging.update_title(self.settings.answers_sheet)
+
+    def discard_answers_export(self, staging: gspread.Worksheet) -> None:
+        self._require_answers_spreadsheet().del_worksheet(staging)
 
     def export_shifts(self, headers: list[str], rows: Iterable[list[str]]) -> None:
         worksheet = self._require_answers_sheet(self.settings.shift_report_sheet)
@@ -66,6 +96,9 @@ class SheetsGateway:
         return self.spreadsheet.worksheet(name)
 
     def _require_answers_sheet(self, name: str):
+        return self._require_answers_spreadsheet().worksheet(name)
+
+    def _require_answers_spreadsheet(self):
         if not self.answers_spreadsheet:
             raise RuntimeError("Answers spreadsheet is not configured (ANSWERS_TABLE env missing)")
-        return self.answers_spreadsheet.worksheet(name)
\ No newline at end of file
+        return self.answers_spreadsheet
\ No newline at end of file
@@ -0,0 +1,61 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+from aiogram.types import TelegramObject
+
+from app.infrastructure.db.unit_of_work import commit_current_writes, unit_of_work
+
+
+class UnitOfWorkMiddleware(BaseMiddleware):
+    """Runs every update inside one database unit of work."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        async with unit_of_work():
+            return await handler(event, data)
+
+
+class CommitBeforeRequestMiddleware(BaseRequestMiddleware):
+    """Bot session middleware committing the current unit's writes before each API call.
+
+    Whatever a handler wrote before telling the user about it stays written
+    if the Telegram call fails, and no row locks are held across the
+    request, the send limiter's waits included. A unit that has only read
+    is left open, so an update that reads, replies and reads again still
+    makes one checkout. Register it first so it runs outside the limiter.
+
+    Writes made after a reply land in a new transaction. These flows are
+    therefore not atomic as a whole:
+
+    - ``confirm_register``: the chat id is linked before the reply, the
+      photo-waiting state is set after it;
+    - ``handle_worker_photo`` and ``handle_after_photo``: the photo or the
+      transfer is saved before the reply, the state is cleared after it;
+    - ``handle_text_answer``: the answers and the next pair's claim are
+      saved before its first question is sent, that pair's state after;
+    - ``SurveyScheduler._deliver``: the outbox entry is marked sent after
+      the survey went out.
+
+    In the handlers the late write is always FSM state, so this only
+    matters with ``PostgresStorage``; Redis and memory storage were never
+    part of the transaction.
+    """
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        await commit_current_writes()
+        return await make_request(bot, method)
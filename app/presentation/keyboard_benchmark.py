@@ -0,0 +1,93 @@
+"""Times a doctors-list pagination click with and without the keyboard cache.
+
+Run it with ``python -m app.presentation.keyboard_benchmark [workers]``
+(300 workers by default). It needs no server: the workers live in an
+in-memory SQLite table.
+
+* ``db+build``: read the workers table, then build the page markup (no caches).
+* ``build``: build the page markup from an in-memory worker list (worker
+  cache hit, keyboard cache miss).
+* ``cached``: ``KeyboardCache`` hit, neither read nor build.
+
+Every path clicks through all pages in turn; figures are per click.
+"""
+
+import asyncio
+import sys
+import time
+from typing import Awaitable, Callable
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.domain.entities import Worker
+from app.infrastructure.db.mappers import WORKER_COLUMNS, rows_to_entities
+from app.infrastructure.db.models import Worker as WorkerModel
+from app.keyboards import PER_PAGE, build_all_doctors_keyboard
+from app.presentation.keyboard_cache import KeyboardCache
+
+
+ROUNDS = 20
+
+
+def _fill(session: Session, workers: int) -> None:
+    session.execute(
+        insert(WorkerModel),
+        [
+            {
+                "id": index + 1,
+                "full_name": f"Фамилия{index:04d} Имя Отчество",
+                "chat_id": str(100_000 + index),
+                "file_id": "",
+            }
+            for index in range(workers)
+        ],
+    )
+    session.commit()
+
+
+async def _clicks(pages: int, click: Callable[[int], Awaitable[object]]) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for page in range(pages):
+            await click(page)
+    return (time.perf_counter() - started) / (ROUNDS * pages)
+
+
+async def _run(session: Session, workers: int) -> None:
+    pages = (workers + PER_PAGE - 1) // PER_PAGE
+    in_memory = rows_to_entities(Worker, session.execute(select(*WORKER_COLUMNS)).all())
+    cache = KeyboardCache({"workers": lambda: 0})
+
+    async def db_and_build(page: int):
+        rows = session.execute(select(*WORKER_COLUMNS)).all()
+        return build_all_doctors_keyboard(rows_to_entities(Worker, rows), page=page)
+
+    async def build(page: int):
+        return build_all_doctors_keyboard(in_memory, page=page)
+
+    async def cached(page: int):
+        async def build_page():
+            return build_all_doctors_keyboard(in_memory, page=page)
+
+        return await cache.get_or_build("all_doctors", build_page, ("workers",), page=page)
+
+    print(f"{workers} workers, {pages} pages, figures per click")
+    for name, click in (("db+build", db_and_build), ("build", build), ("cached", cached)):
+        await click(0)  # warm up statement caches
+        elapsed = await _clicks(pages, click)
+        print(f"{name:>9}: {elapsed * 1_000_000:9.1f} µs")
+    print(f"keyboard cache hit ratio {cache.stats.hit_ratio:.2%}")
+
+
+def main(workers: int = 300) -> None:
+    engine = create_engine("sqlite://")
+    WorkerModel.__table__.create(engine)
+    with Session(engine) as session:
+        _fill(session, workers)
+        asyncio.run(_run(session, workers))
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Mapping, Sequence
+
+from aiogram.types import InlineKeyboardMarkup
+
+from app.infrastructure.cache.versioned import CacheStats
+
+
+VersionSource = Callable[[], int]
+BuildKeyboard = Callable[[], Awaitable[InlineKeyboardMarkup | None]]
+
+
+class KeyboardCache:
+    """Rendered inline keyboards keyed by (builder, page, view, data version).
+
+    Each builder names the data sources it depends on; their versions are
+    bumped by the write paths of the cached repositories and the instrument
+    catalog, so a lookup under the current versions is always fresh. A hit
+    skips both the data read and the markup construction. ``build`` may
+    return ``None`` for an empty list; that result is cached too.
+    """
+
+    def __init__(self, sources: Mapping[str, VersionSource], max_entries: int = 256):
+        self.sources = dict(sources)
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: OrderedDict[tuple, InlineKeyboardMarkup | None] = OrderedDict()
+
+    def versions(self, depends_on: Sequence[str]) -> tuple[int, ...]:
+        return tuple(self.sources[name]() for name in depends_on)
+
+    async def get_or_build(
+        self,
+        builder: str,
+        build: BuildKeyboard,
+        depends_on: Sequence[str] = (),
+        page: int = 0,
+        view: str = "",
+    ) -> InlineKeyboardMarkup | None:
+        versions = self.versions(depends_on)
+        key = (builder, page, view, versions)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return self._entries[key]
+
+        self.stats.misses += 1
+        markup = await build()
+        # The data may have been written while it was being read.
+        if self.versions(depends_on) == versions:
+            self._drop_stale(builder, versions)
+            self._entries[key] = markup
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return markup
+
+    def clear(self) -> None:
+        self.stats.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def _drop_stale(self, builder: str, versions: tuple[int, ...]) -> None:
+        stale = [
+            key for key in self._entries if key[0] == builder and key[3] != versions
+        ]
+        for key in stale:
+            del self._entries[key]
+        self.stats.invalidations += len(stale)
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import NullPool
+
+from app.infrastructure.db import engine as engine_module
+from app.infrastructure.db.models import Base
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_big_integer(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER primary keys.
+    return "INTEGER"
+
+
+@pytest.fixture
+def database(tmp_path):
+    """A file-backed SQLite database installed as the app's engine.
+
+    NullPool keeps no connection between tests, each of which runs its own
+    event loop with ``asyncio.run``.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+
+    async def create_tables():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_tables())
+    engine_module._engine = engine
+    engine_module.async_session.configure(bind=engine)
+    yield engine
+    engine_module._engine = None
+    asyncio.run(engine.dispose())
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.domain.entities import Worker
+from app.infrastructure.db.cached_repositories import CachedWorkerRepository
+from app.infrastructure.db.unit_of_work import unit_of_work
+
+
+class SlowWorkers:
+    def __init__(self, *workers: Worker):
+        self.workers = list(workers)
+        self.loads = 0
+
+    async def list_all(self):
+        self.loads += 1
+        workers = list(self.workers)
+        await asyncio.sleep(0.01)
+        return workers
+
+    async def add(self, worker):
+        self.workers.append(worker)
+
+
+def worker(worker_id: int, name: str) -> Worker:
+    return Worker(id=worker_id, full_name=name, file_id="", chat_id="")
+
+
+def test_concurrent_misses_load_once():
+    inner = SlowWorkers(worker(1, "Анна"))
+    repo = CachedWorkerRepository(inner)
+
+    async def main():
+        return await asyncio.gather(*(repo.get_by_id(1) for _ in range(10)))
+
+    assert [found.full_name for found in asyncio.run(main())] == ["Анна"] * 10
+    assert inner.loads == 1
+    assert repo.stats.misses == 10
+
+
+def test_load_racing_a_write_is_not_kept():
+    inner = SlowWorkers(worker(1, "Анна"))
+    repo = CachedWorkerRepository(inner)
+
+    async def main():
+        lookup = asyncio.create_task(repo.get_by_fullname("Борис"))
+        await asyncio.sleep(0)
+        await repo.add(worker(2, "Борис"))
+        assert await lookup is None
+        return await repo.get_by_fullname("Борис")
+
+    assert asyncio.run(main()).id == 2
+    assert inner.loads == 2
+
+
+def test_rolled_back_write_drops_the_reloaded_copy(database):
+    inner = SlowWorkers(worker(1, "Анна"))
+    repo = CachedWorkerRepository(inner)
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            async with unit_of_work():
+                await repo.add(worker(2, "Борис"))
+                assert await repo.get_by_fullname("Борис") is not None
+                raise RuntimeError
+        inner.workers.pop()
+        return await repo.get_by_fullname("Борис")
+
+    assert asyncio.run(main()) is None
+    assert inner.loads == 2
@@ -0,0 +1,45 @@
+import asyncio
+
+from app.application.use_cases.instrument_catalog import InstrumentCatalog
+from app.domain.entities import Cabinet, Instrument
+
+
+class SlowTable:
+    def __init__(self, *rows):
+        self.rows = list(rows)
+        self.loads = 0
+
+    async def list_all(self, include_archived: bool = False):
+        self.loads += 1
+        rows = list(self.rows)
+        await asyncio.sleep(0.01)
+        return rows
+
+
+def test_concurrent_misses_load_the_catalog_once():
+    cabinets = SlowTable(Cabinet(id=1, name="Стерилизационная"))
+    instruments = SlowTable(Instrument(id=1, name="Зонд", cabinet_id=1))
+    catalog = InstrumentCatalog(cabinets, instruments)
+
+    async def main():
+        return await asyncio.gather(*(catalog.instrument_names() for _ in range(10)))
+
+    assert asyncio.run(main()) == [{1: "Зонд"}] * 10
+    assert (cabinets.loads, instruments.loads) == (1, 1)
+
+
+def test_write_during_a_load_discards_it():
+    cabinets = SlowTable(Cabinet(id=1, name="Стерилизационная"))
+    instruments = SlowTable()
+    catalog = InstrumentCatalog(cabinets, instruments)
+
+    async def main():
+        lookup = asyncio.create_task(catalog.cabinet_names())
+        await asyncio.sleep(0)
+        cabinets.rows.append(Cabinet(id=2, name="Хирургия"))
+        catalog.put_cabinet(Cabinet(id=2, name="Хирургия"))
+        assert await lookup == {1: "Стерилизационная"}
+        return await catalog.cabinet_names()
+
+    assert asyncio.run(main()) == {1: "Стерилизационная", 2: "Хирургия"}
+    assert cabinets.loads == 2
@@ -0,0 +1,120 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+from fakeredis import TcpFakeServer
+from redis.exceptions import RedisError
+
+from app.infrastructure.cache.backend import ReplicaInvalidation
+from app.infrastructure.cache.redis_backend import RedisCacheBackend
+from app.infrastructure.db.unit_of_work import unit_of_work
+
+
+@pytest.fixture
+def redis_url():
+    server = TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    yield f"redis://{host}:{port}/0"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def hung_redis_url():
+    """A server that accepts connections and never answers."""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    accepted = []
+    stop = threading.Event()
+
+    def accept():
+        listener.settimeout(0.1)
+        while not stop.is_set():
+            try:
+                accepted.append(listener.accept()[0])
+            except OSError:
+                pass
+
+    threading.Thread(target=accept, daemon=True).start()
+    host, port = listener.getsockname()
+    yield f"redis://{host}:{port}/0"
+    stop.set()
+    for connection in accepted:
+        connection.close()
+    listener.close()
+
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_invalidate_reaches_other_replicas_only(redis_url):
+    async def main():
+        first, second = RedisCacheBackend(redis_url), RedisCacheBackend(redis_url)
+        dropped = []
+        first.subscribe("workers", lambda: dropped.append("first"))
+        second.subscribe("workers", lambda: dropped.append("second"))
+        second.subscribe("surveys", lambda: dropped.append("second surveys"))
+        await first.start()
+        await second.start()
+        try:
+            await first.invalidate("workers")
+            await wait_for(lambda: dropped)
+            await asyncio.sleep(0.1)
+        finally:
+            await first.close()
+            await second.close()
+        return dropped
+
+    assert asyncio.run(main()) == ["second"]
+
+
+def test_announce_publishes_after_the_unit_commits(redis_url):
+    async def main():
+        first, second = RedisCacheBackend(redis_url), RedisCacheBackend(redis_url)
+        dropped = []
+        announcer = ReplicaInvalidation(first, "admins", lambda: None)
+        ReplicaInvalidation(second, "admins", lambda: dropped.append("admins"))
+        await first.start()
+        await second.start()
+        try:
+            async with unit_of_work():
+                announcer.announce()
+                await asyncio.sleep(0.1)
+                assert dropped == []
+            await wait_for(lambda: dropped)
+        finally:
+            await first.close()
+            await second.close()
+        return dropped
+
+    assert asyncio.run(main()) == ["admins"]
+
+
+def test_hung_server_does_not_hold_the_commit(hung_redis_url):
+    async def main():
+        backend = RedisCacheBackend(hung_redis_url, timeout=0.2)
+        announcer = ReplicaInvalidation(backend, "shifts", lambda: None)
+        try:
+            started = time.monotonic()
+            with pytest.raises(RedisError):
+                await backend.invalidate("shifts")
+            assert time.monotonic() - started < 5
+
+            started = time.monotonic()
+            async with unit_of_work():
+                announcer.announce()
+            assert time.monotonic() - started < 0.1
+            # The failed publish is logged and dropped, not raised.
+            await wait_for(lambda: not announcer._pending, timeout=5)
+        finally:
+            await backend.close()
+
+    asyncio.run(main())
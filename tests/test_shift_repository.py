@@ -0,0 +1,52 @@
+import asyncio
+import datetime as dt
+
+from app.infrastructure.db.engine import async_session
+from app.infrastructure.db.models import Shift
+from app.infrastructure.db.repositories import SqlAlchemyShiftRepository
+
+TODAY = dt.date(2026, 3, 2)
+
+
+async def add_slots() -> None:
+    async with async_session() as session:
+        session.add_all(
+            [
+                Shift(id=1, doctor_name="Doctor A", date=TODAY, type="morning", manual=False),
+                Shift(id=2, doctor_name="Doctor B", date=TODAY, type="morning", manual=False),
+                Shift(id=3, doctor_name="Doctor A", date=TODAY, type="evening", manual=False),
+            ]
+        )
+        await session.commit()
+
+
+def test_add_by_id_books_only_a_free_shift_in_the_window(database):
+    repo = SqlAlchemyShiftRepository()
+
+    async def main():
+        await add_slots()
+        wrong_window = await repo.add_by_id(10, "Assistant", 3, TODAY, "morning")
+        wrong_day = await repo.add_by_id(10, "Assistant", 1, TODAY - dt.timedelta(days=1), "morning")
+        booked = await repo.add_by_id(10, "Assistant", 1, TODAY, "morning")
+        taken = await repo.add_by_id(11, "Other", 1, TODAY, "morning")
+        second = await repo.add_by_id(10, "Assistant", 2, TODAY, "morning")
+        return wrong_window, wrong_day, booked, taken, second
+
+    wrong_window, wrong_day, booked, taken, second = asyncio.run(main())
+    assert wrong_window is None and wrong_day is None
+    assert booked.id == 1 and booked.doctor_name == "Doctor A" and booked.assistant_id == 10
+    assert taken is None
+    assert second is None
+
+
+def test_add_slot_adds_a_slot_once(database):
+    repo = SqlAlchemyShiftRepository()
+
+    async def main():
+        await add_slots()
+        return (
+            await repo.add_slot("Doctor B", TODAY, "evening"),
+            await repo.add_slot("Doctor B", TODAY, "evening"),
+        )
+
+    assert asyncio.run(main()) == (True, False)
@@ -0,0 +1,55 @@
+import asyncio
+import datetime as dt
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from app.domain.entities import Pair
+from app.handlers.survey_handlers import SurveyState, create_survey_router
+from app.infrastructure.db.repositories import SqlAlchemyPairRepository
+from app.infrastructure.db.unit_of_work import unit_of_work
+from tests.test_unit_of_work import add_pairs, statuses
+
+
+def get_handler(router, name):
+    return next(h.callback for h in router.message.handlers if h.callback.__name__ == name)
+
+
+def test_last_answer_survives_a_failed_save(database):
+    repo = SqlAlchemyPairRepository()
+    pair = Pair(id=1, subject="A", object="B", survey="S", weekday="", date=dt.date(2026, 1, 1))
+
+    async def failing_save(*args):
+        await repo.update_status(1, "in_progress")
+        raise RuntimeError("insert failed")
+
+    survey_service = MagicMock()
+    survey_service.get_pair = AsyncMock(return_value=pair)
+    survey_service.get_survey_by_id = AsyncMock(return_value=SimpleNamespace(id=7))
+    survey_service.save_answers = AsyncMock(side_effect=failing_save)
+    survey_service.mark_pair_status = AsyncMock()
+    survey_service.take_next_pair = AsyncMock(return_value=None)
+    handler = get_handler(create_survey_router(survey_service), "handle_text_answer")
+
+    message = MagicMock(text="fine", answer=AsyncMock())
+    message.from_user = SimpleNamespace(id=42, username="a")
+    state = FSMContext(MemoryStorage(), StorageKey(bot_id=1, chat_id=42, user_id=42))
+
+    async def main():
+        await add_pairs(1, 2)
+        await state.set_state(SurveyState.answers)
+        await state.update_data(pair_id=1, survey_id=7, answers=["5", "4", "3", "2"])
+        async with unit_of_work():
+            await handler(message, state)
+            # The unit is still usable after the failed write.
+            await repo.update_status(2, "done")
+        return await statuses()
+
+    assert asyncio.run(main()) == {1: "ready", 2: "done"}
+    survey_service.mark_pair_status.assert_not_awaited()
+    survey_service.take_next_pair.assert_awaited_once_with("A")
+    message.answer.assert_awaited_once()
+    assert asyncio.run(state.get_state()) is None
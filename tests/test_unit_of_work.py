@@ -0,0 +1,76 @@
+import asyncio
+import datetime as dt
+
+import pytest
+from sqlalchemy import select
+
+from app.infrastructure.db.engine import async_session
+from app.infrastructure.db.models import Pair
+from app.infrastructure.db.repositories import SqlAlchemyPairRepository
+from app.infrastructure.db.unit_of_work import commit_current_writes, savepoint, unit_of_work
+
+
+async def add_pairs(*ids: int) -> None:
+    async with async_session() as session:
+        session.add_all(
+            Pair(id=pair_id, subject="A", object="B", survey="S", date=dt.date(2026, 1, 1))
+            for pair_id in ids
+        )
+        await session.commit()
+
+
+async def statuses() -> dict[int, str]:
+    async with async_session() as session:
+        result = await session.execute(select(Pair.id, Pair.status))
+        return dict(result.all())
+
+
+def test_failed_savepoint_keeps_the_rest_of_the_unit(database):
+    repo = SqlAlchemyPairRepository()
+    rolled_back = []
+
+    async def main():
+        await add_pairs(1, 2, 3)
+        async with unit_of_work() as uow:
+            await repo.update_status(1, "done")
+            uow.call_on_rollback(lambda: rolled_back.append("outer"))
+            with pytest.raises(RuntimeError):
+                async with savepoint():
+                    await repo.update_status(2, "done")
+                    uow.call_on_rollback(lambda: rolled_back.append("inner"))
+                    raise RuntimeError
+            await repo.update_status(3, "done")
+        return await statuses()
+
+    assert asyncio.run(main()) == {1: "done", 2: "ready", 3: "done"}
+    assert rolled_back == ["inner"]
+
+
+def test_savepoint_outside_a_unit_is_a_no_op(database):
+    async def main():
+        await add_pairs(1)
+        async with savepoint():
+            await SqlAlchemyPairRepository().update_status(1, "done")
+        return await statuses()
+
+    assert asyncio.run(main()) == {1: "done"}
+
+
+def test_commit_before_a_send_only_when_the_unit_wrote(database):
+    repo = SqlAlchemyPairRepository()
+
+    async def main():
+        await add_pairs(1)
+        async with unit_of_work() as uow:
+            await repo.get_by_id(1)
+            connection = await uow.connection()
+            await commit_current_writes()
+            assert await uow.connection() is connection
+
+            await repo.update_status(1, "done")
+            await commit_current_writes()
+            assert await uow.connection() is not connection
+            assert not uow.has_writes
+            assert await statuses() == {1: "done"}
+
+    asyncio.run(main())